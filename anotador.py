@@ -0,0 +1,368 @@
+"""Anotación de partidas PGN con evaluaciones de motor (sin interfaz gráfica).
+
+Responsabilidades:
+- Leer un PGN en streaming y reproducir cada partida
+- Evaluar cada posición en un conjunto de procesos con un `MotorUCI` propio
+  (el motor se arranca una vez por proceso, no una vez por posición)
+- Reutilizar una caché persistente de análisis por posición (SQLite)
+- Escribir el PGN anotado ([%eval] y marcas ?!, ?, ??) en el orden original
+- Guardar puntos de control para reanudar un trabajo interrumpido
+
+Uso:
+    python anotador.py partidas.pgn anotadas.pgn --motor stockfish --tiempo 100
+    python anotador.py partidas.pgn anotadas.pgn --profundidad 14 --procesos 4
+"""
+from typing import Optional, List, Dict, Tuple, Deque
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from multiprocessing import util
+import argparse
+import json
+import os
+import sqlite3
+
+try:
+    import chess
+    import chess.pgn
+except Exception:
+    chess = None
+
+RUTA_CACHE_ANALISIS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "analisis.sqlite")
+
+# Pérdida (en centipeones, para el bando que mueve) a partir de la cual se marca la jugada
+UMBRAL_IMPRECISION = 50
+UMBRAL_ERROR = 100
+UMBRAL_ERROR_GRAVE = 300
+# Las evaluaciones se acotan para que un mate no cuente como pérdida infinita
+LIMITE_CP = 1000
+
+# Partidas escritas entre dos puntos de control
+PARTIDAS_POR_PUNTO_CONTROL = 20
+
+Evaluacion = Tuple[Optional[int], Optional[int]]
+
+
+class CacheAnalisis:
+    """Evaluaciones por posición (EPD) y límite de análisis, guardadas en SQLite."""
+
+    def __init__(self, ruta: Optional[str] = RUTA_CACHE_ANALISIS):
+        self.ruta = ruta or ":memory:"
+        if ruta:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        self.conexion = sqlite3.connect(self.ruta)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute(
+            "CREATE TABLE IF NOT EXISTS analisis ("
+            " epd TEXT NOT NULL, limite TEXT NOT NULL, cp INTEGER, mate INTEGER,"
+            " PRIMARY KEY (epd, limite)) WITHOUT ROWID"
+        )
+        self.conexion.commit()
+
+    def buscar(self, epd: str, limite: str) -> Optional[Evaluacion]:
+        fila = self.conexion.execute(
+            "SELECT cp, mate FROM analisis WHERE epd = ? AND limite = ?", (epd, limite)
+        ).fetchone()
+        return (fila[0], fila[1]) if fila else None
+
+    def guardar(self, evaluaciones: Dict[str, Evaluacion], limite: str):
+        with self.conexion:
+            self.conexion.executemany(
+                "INSERT OR REPLACE INTO analisis VALUES (?, ?, ?, ?)",
+                [(epd, limite, cp, mate) for epd, (cp, mate) in evaluaciones.items()],
+            )
+
+    def cerrar(self):
+        self.conexion.close()
+
+
+# Motor UCI de cada proceso de trabajo (se arranca una sola vez por proceso)
+_motor_proceso = None
+
+
+def _analizar_posiciones(ruta_motor: str, tiempo_ms: int, profundidad: Optional[int],
+                         epds: List[str]) -> List[Optional[Evaluacion]]:
+    """Tarea de un proceso de trabajo: evalúa una lista de posiciones."""
+    global _motor_proceso
+    if _motor_proceso is None:
+        from reglas import MotorUCI
+        _motor_proceso = MotorUCI(ruta_motor, tiempo_ms=tiempo_ms)
+    return [_motor_proceso.analizar(epd, profundidad) for epd in epds]
+
+
+def _cerrar_motor_proceso():
+    global _motor_proceso
+    if _motor_proceso is not None:
+        _motor_proceso.cerrar()
+        _motor_proceso = None
+
+
+def _iniciar_proceso():
+    """Inicializador de cada proceso de trabajo: cierra su motor UCI al salir."""
+    util.Finalize(None, _cerrar_motor_proceso, exitpriority=10)
+
+
+def _evaluacion_final(board) -> Optional[Evaluacion]:
+    """Evaluación de una posición terminada sin consultar al motor."""
+    if board.is_checkmate():
+        return None, 0
+    if board.is_stalemate() or board.is_insufficient_material():
+        return 0, None
+    return None
+
+
+def _centipeones(evaluacion: Optional[Evaluacion]) -> Optional[int]:
+    """Evaluación acotada en centipeones (blancas), con el mate como ±LIMITE_CP."""
+    if evaluacion is None:
+        return None
+    cp, mate = evaluacion
+    if mate is not None:
+        if mate == 0:
+            # Mate ya dado: `mate` no indica el bando; lo resuelve quien llama
+            return None
+        return LIMITE_CP if mate > 0 else -LIMITE_CP
+    return max(-LIMITE_CP, min(LIMITE_CP, cp))
+
+
+def _comentario_eval(evaluacion: Evaluacion) -> str:
+    cp, mate = evaluacion
+    if mate is not None:
+        return f"[%eval #{mate}]"
+    return f"[%eval {cp / 100:.2f}]"
+
+
+def anotar_partida(game, evaluaciones: List[Optional[Evaluacion]]):
+    """Añade [%eval] y marcas de error a la línea principal de `game`.
+
+    `evaluaciones[i]` es la evaluación (blancas) de la posición tras i jugadas.
+    """
+    nodo = game
+    ply = 0
+    while nodo.variations:
+        siguiente = nodo.variations[0]
+        antes = evaluaciones[ply]
+        despues = evaluaciones[ply + 1]
+        if despues is not None:
+            siguiente.comment = (_comentario_eval(despues) + " " + siguiente.comment).strip()
+        cp_antes, cp_despues = _centipeones(antes), _centipeones(despues)
+        if despues is not None and despues[1] == 0:
+            # El bando que mueve acaba de dar mate
+            cp_despues = LIMITE_CP if nodo.board().turn == chess.WHITE else -LIMITE_CP
+        if cp_antes is not None and cp_despues is not None:
+            perdida = cp_antes - cp_despues if nodo.board().turn == chess.WHITE else cp_despues - cp_antes
+            if perdida >= UMBRAL_ERROR_GRAVE:
+                siguiente.nags.add(chess.pgn.NAG_BLUNDER)
+            elif perdida >= UMBRAL_ERROR:
+                siguiente.nags.add(chess.pgn.NAG_MISTAKE)
+            elif perdida >= UMBRAL_IMPRECISION:
+                siguiente.nags.add(chess.pgn.NAG_DUBIOUS_MOVE)
+        nodo = siguiente
+        ply += 1
+
+
+class AnotadorPGN:
+    """Tubería lectura → reproducción → análisis en paralelo → escritura ordenada.
+
+    Se mantiene una ventana acotada de partidas en curso; una partida se
+    escribe cuando todas sus posiciones están evaluadas y todas las anteriores
+    ya se han escrito, así que la salida conserva el orden de la entrada.
+    """
+
+    def __init__(
+        self,
+        motor: str = "stockfish",
+        tiempo_ms: int = 100,
+        profundidad: Optional[int] = None,
+        procesos: Optional[int] = None,
+        ruta_cache: Optional[str] = RUTA_CACHE_ANALISIS,
+    ):
+        """Prepara el anotador.
+
+        Args:
+            motor: Nombre (stockfish, lc0) o ruta del motor UCI
+            tiempo_ms: Tiempo por posición si no se indica profundidad
+            profundidad: Profundidad fija por posición (más reproducible que el tiempo)
+            procesos: Procesos de análisis (por defecto, núcleos)
+            ruta_cache: Caché SQLite de análisis; None para una caché en memoria
+        """
+        if os.path.isfile(motor):
+            self.ruta_motor = motor
+        else:
+            from reglas import _ruta_motor_por_defecto
+            self.ruta_motor = _ruta_motor_por_defecto(motor)
+        self.tiempo_ms = tiempo_ms
+        self.profundidad = profundidad
+        self.procesos = procesos or os.cpu_count() or 1
+        self.limite = f"d{profundidad}" if profundidad else f"t{tiempo_ms}"
+        self.cache = CacheAnalisis(ruta_cache)
+
+    def _leer_estado(self, ruta_estado: str) -> Dict:
+        if os.path.isfile(ruta_estado):
+            try:
+                with open(ruta_estado, encoding="utf-8") as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"Advertencia: no se pudo leer el punto de control: {e}")
+        return {}
+
+    @staticmethod
+    def _guardar_estado(ruta_estado: str, estado: Dict):
+        temporal = ruta_estado + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(estado, f)
+        os.replace(temporal, ruta_estado)
+
+    def anotar(self, entrada: str, salida: str, reanudar: bool = True) -> int:
+        """Anota todas las partidas de `entrada` en `salida`; devuelve cuántas se escribieron.
+
+        Con `reanudar`, continúa desde el último punto de control
+        (`salida`.estado) si corresponde a la misma entrada.
+        """
+        if chess is None:
+            print("python-chess no está instalado")
+            return 0
+        if not self.ruta_motor:
+            print("No se encontró el motor UCI para anotar")
+            return 0
+
+        ruta_estado = salida + ".estado"
+        estado = self._leer_estado(ruta_estado) if reanudar else {}
+        if estado.get("entrada") != os.path.abspath(entrada):
+            estado = {}
+        elif not os.path.isfile(salida) or os.path.getsize(salida) < estado.get("bytes", 0):
+            # Las partidas del punto de control ya no están en la salida: empezar de cero
+            print(f"Advertencia: {salida} no contiene lo anotado hasta el punto de control; se empieza de nuevo")
+            estado = {}
+        hechas = estado.get("partidas", 0)
+
+        archivo_salida = open(salida, "r+b" if estado else "wb")
+        # Descartar lo escrito después del último punto de control
+        archivo_salida.truncate(estado.get("bytes", 0))
+        archivo_salida.seek(0, os.SEEK_END)
+
+        pendientes: Deque[Tuple] = deque()
+        # Posiciones enviadas a algún proceso y aún sin resultado: epd -> (futuro, índice)
+        en_vuelo: Dict[str, Tuple[Future, int]] = {}
+        escritas = 0
+        try:
+            with open(entrada, encoding="utf-8", errors="replace") as archivo_entrada, \
+                    ProcessPoolExecutor(max_workers=self.procesos, initializer=_iniciar_proceso) as ejecutor:
+                for _ in range(hechas):
+                    if not chess.pgn.skip_game(archivo_entrada):
+                        break
+                agotada = False
+                while not agotada or pendientes:
+                    # Llenar la ventana de partidas en curso
+                    while not agotada and len(pendientes) < self.procesos * 2:
+                        game = chess.pgn.read_game(archivo_entrada)
+                        if game is None:
+                            agotada = True
+                            break
+                        pendientes.append(self._preparar(game, ejecutor, en_vuelo))
+                    if not pendientes:
+                        break
+                    # Escribir en orden todas las partidas completas de la cabeza
+                    while pendientes and all(f.done() for f, _ in pendientes[0][3].values()):
+                        game, epds, evaluaciones, referencias = pendientes.popleft()
+                        self._completar(epds, evaluaciones, referencias, en_vuelo)
+                        anotar_partida(game, evaluaciones)
+                        archivo_salida.write((str(game) + "\n\n").encode("utf-8"))
+                        escritas += 1
+                        if (hechas + escritas) % PARTIDAS_POR_PUNTO_CONTROL == 0:
+                            archivo_salida.flush()
+                            self._guardar_estado(ruta_estado, {
+                                "entrada": os.path.abspath(entrada),
+                                "partidas": hechas + escritas,
+                                "bytes": archivo_salida.tell(),
+                            })
+                    if pendientes:
+                        futuros = {f for f, _ in pendientes[0][3].values() if not f.done()}
+                        if futuros:
+                            wait(futuros, return_when=FIRST_COMPLETED)
+        finally:
+            archivo_salida.close()
+        # Trabajo terminado: el punto de control ya no hace falta
+        if os.path.isfile(ruta_estado):
+            os.remove(ruta_estado)
+        return escritas
+
+    def _preparar(self, game, ejecutor, en_vuelo: Dict[str, Tuple[Future, int]]) -> Tuple:
+        """Reproduce la partida, resuelve lo que está en caché y envía el resto a analizar.
+
+        Returns:
+            (game, epds, evaluaciones, referencias) donde `referencias` asocia cada
+            ply pendiente con (futuro, índice en el resultado del futuro)
+        """
+        board = game.board()
+        epds = [board.epd()]
+        for move in game.mainline_moves():
+            board.push(move)
+            epds.append(board.epd())
+        final = _evaluacion_final(board)
+
+        evaluaciones: List[Optional[Evaluacion]] = []
+        referencias: Dict[int, Tuple[Future, int]] = {}
+        faltan: List[int] = []
+        epds_faltan = set()
+        for i, epd in enumerate(epds):
+            evaluacion = final if i == len(epds) - 1 and final is not None else self.cache.buscar(epd, self.limite)
+            evaluaciones.append(evaluacion)
+            if evaluacion is not None:
+                continue
+            if epd in en_vuelo:
+                # La misma posición ya se está analizando para otra partida
+                referencias[i] = en_vuelo[epd]
+            elif epd not in epds_faltan:
+                faltan.append(i)
+                epds_faltan.add(epd)
+        if faltan:
+            futuro = ejecutor.submit(
+                _analizar_posiciones, self.ruta_motor, self.tiempo_ms, self.profundidad,
+                [epds[i] for i in faltan],
+            )
+            for indice, i in enumerate(faltan):
+                en_vuelo[epds[i]] = referencias[i] = (futuro, indice)
+            for i, epd in enumerate(epds):
+                if evaluaciones[i] is None and i not in referencias:
+                    referencias[i] = en_vuelo[epd]
+        return game, epds, evaluaciones, referencias
+
+    def _completar(self, epds: List[str], evaluaciones: List[Optional[Evaluacion]],
+                   referencias: Dict[int, Tuple[Future, int]], en_vuelo: Dict[str, Tuple[Future, int]]):
+        """Copia los resultados de los procesos a la partida y a la caché."""
+        nuevas: Dict[str, Evaluacion] = {}
+        for i, (futuro, indice) in referencias.items():
+            evaluacion = futuro.result()[indice]
+            evaluaciones[i] = evaluacion
+            if en_vuelo.get(epds[i]) == (futuro, indice):
+                del en_vuelo[epds[i]]
+                if evaluacion is not None:
+                    nuevas[epds[i]] = evaluacion
+        if nuevas:
+            self.cache.guardar(nuevas, self.limite)
+
+    def cerrar(self):
+        self.cache.cerrar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Anotar partidas PGN con evaluaciones de motor")
+    parser.add_argument("entrada", help="PGN de entrada")
+    parser.add_argument("salida", help="PGN anotado de salida")
+    parser.add_argument("--motor", default="stockfish", help="Nombre o ruta del motor UCI")
+    parser.add_argument("--tiempo", type=int, default=100, help="Milisegundos por posición")
+    parser.add_argument("--profundidad", type=int, default=None, help="Profundidad fija por posición")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos de análisis (por defecto, núcleos)")
+    parser.add_argument("--cache", default=RUTA_CACHE_ANALISIS, help="Caché SQLite de análisis")
+    parser.add_argument("--desde-cero", action="store_true", help="Ignorar el punto de control previo")
+    args = parser.parse_args()
+
+    anotador = AnotadorPGN(args.motor, args.tiempo, args.profundidad, args.procesos, args.cache)
+    try:
+        total = anotador.anotar(args.entrada, args.salida, reanudar=not args.desde_cero)
+        print(f"{total} partidas anotadas en {args.salida}")
+    finally:
+        anotador.cerrar()
+
+
+if __name__ == "__main__":
+    main()
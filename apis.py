@@ -4,71 +4,600 @@ Módulo para integración con APIs externas de ajedrez.
 Proporciona funciones para consumir:
 - Chess.com API: perfiles, estadísticas, juegos
 - Chess-API.com: análisis de posiciones, mejores movimientos
+
+Todas las peticiones pasan por un pool de sesiones HTTP compartido
+(keep-alive, gzip, límite de conexiones por host y timeouts configurables).
+Las respuestas de Chess.com se guardan en una caché persistente (SQLite)
+con TTL y peticiones condicionales (ETag / Last-Modified).
 """
+import asyncio
+import calendar
+import codecs
+import os
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from collections import deque
+from typing import Optional, Tuple, Union, Dict, List, Iterable, Iterator, Any, Callable
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 
+# Configuración por defecto del pool HTTP
+TIMEOUT_CONEXION = 5.0    # segundos para establecer la conexión TCP/TLS
+TIMEOUT_LECTURA = 10.0    # segundos de espera de la respuesta
+CONEXIONES_POR_HOST = 10  # conexiones keep-alive reutilizables por host
+HOSTS_EN_POOL = 10        # hosts distintos con pool propio
+USER_AGENT = "Ajedrez/2.0 (python-requests)"
+TTL_CACHE = 300.0         # segundos durante los que una respuesta se sirve sin red
+RUTA_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "http.sqlite")
+RUTA_ESTADO_DESCARGAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "descargas.json")
+
+
+class PoolSesiones:
+    """Pool de conexiones HTTP compartido por los clientes de APIs.
+
+    Un único `HTTPAdapter` mantiene las conexiones keep-alive abiertas por host,
+    de modo que solo la primera petición a cada host paga el handshake TCP/TLS.
+    Cada hilo usa su propia `requests.Session` montada sobre ese adaptador
+    (las sesiones no son seguras entre hilos; el pool de urllib3 sí).
+    Por defecto nunca hay más de `conexiones_por_host` conexiones a un host:
+    una petición que no encuentra conexión libre espera a que se libere una.
+    """
+
+    def __init__(
+        self,
+        conexiones_por_host: int = CONEXIONES_POR_HOST,
+        hosts: int = HOSTS_EN_POOL,
+        timeout: Union[float, Tuple[float, float]] = (TIMEOUT_CONEXION, TIMEOUT_LECTURA),
+        reintentos: int = 2,
+        bloquear_si_lleno: bool = True,
+    ):
+        """Configura el pool.
+
+        Args:
+            conexiones_por_host: Máximo de conexiones abiertas por host
+            hosts: Número de hosts con pool de conexiones propio
+            timeout: Timeout por defecto (segundos o tupla conexión/lectura)
+            reintentos: Reintentos de GET ante errores 5xx o de conexión
+            bloquear_si_lleno: Si es True, espera a que quede una conexión
+                libre; si es False, abre conexiones extra de un solo uso
+                (el límite por host deja de aplicarse)
+        """
+        self.timeout = timeout
+        self._adaptador = HTTPAdapter(
+            pool_connections=hosts,
+            pool_maxsize=conexiones_por_host,
+            pool_block=bloquear_si_lleno,
+            max_retries=Retry(
+                total=reintentos,
+                backoff_factor=0.3,
+                status_forcelist=(500, 502, 503, 504),
+                allowed_methods=frozenset(["GET"]),
+                raise_on_status=False,
+                # Los 429 los gestiona cada cliente (ver ChessComAPIAsync)
+                respect_retry_after_header=False,
+            ),
+        )
+        self._local = threading.local()
+        # Todas las sesiones creadas (una por hilo), para poder cerrarlas
+        self._sesiones: List[requests.Session] = []
+        self._cerrojo = threading.Lock()
+
+    def sesion(self) -> requests.Session:
+        """Devuelve la sesión del hilo actual (creada la primera vez)."""
+        sesion = getattr(self._local, "sesion", None)
+        if sesion is None:
+            sesion = requests.Session()
+            sesion.mount("http://", self._adaptador)
+            sesion.mount("https://", self._adaptador)
+            sesion.headers.update({
+                "User-Agent": USER_AGENT,
+                "Accept": "application/json",
+                "Accept-Encoding": "gzip, deflate",
+                "Connection": "keep-alive",
+            })
+            self._local.sesion = sesion
+            with self._cerrojo:
+                self._sesiones.append(sesion)
+        return sesion
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return self.sesion().get(url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return self.sesion().post(url, **kwargs)
+
+    def cerrar(self):
+        """Cierra las conexiones abiertas del pool y las sesiones de todos los hilos."""
+        self._adaptador.close()
+        with self._cerrojo:
+            sesiones, self._sesiones = self._sesiones, []
+        for sesion in sesiones:
+            sesion.close()
+        # Los hilos que vuelvan a usar el pool crean una sesión nueva
+        self._local = threading.local()
+
+
+class CacheHTTP:
+    """Caché persistente de respuestas JSON por URL.
+
+    Dentro del TTL la respuesta se sirve desde disco sin tocar la red. Pasado
+    el TTL se envía una petición condicional con If-None-Match /
+    If-Modified-Since; un 304 solo renueva la entrada, sin descargar el cuerpo.
+    """
+
+    def __init__(self, ruta: Optional[str] = RUTA_CACHE, ttl: float = TTL_CACHE):
+        """Abre (o crea) la caché.
+
+        Args:
+            ruta: Archivo SQLite; None para una caché solo en memoria
+            ttl: Segundos durante los que una entrada se considera fresca
+        """
+        self.ruta = ruta or ":memory:"
+        self.ttl = ttl
+        if ruta:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conexion = sqlite3.connect(self.ruta, check_same_thread=False)
+        self._conexion.execute(
+            "CREATE TABLE IF NOT EXISTS respuestas ("
+            " url TEXT PRIMARY KEY, cuerpo TEXT NOT NULL, etag TEXT,"
+            " last_modified TEXT, guardado REAL NOT NULL)"
+        )
+        self._conexion.commit()
+
+    def buscar(self, url: str) -> Optional[Tuple[str, Optional[str], Optional[str], float]]:
+        """Devuelve (cuerpo, etag, last_modified, guardado) o None."""
+        with self._lock:
+            return self._conexion.execute(
+                "SELECT cuerpo, etag, last_modified, guardado FROM respuestas WHERE url = ?", (url,)
+            ).fetchone()
+
+    def guardar(self, url: str, cuerpo: str, etag: Optional[str], last_modified: Optional[str]):
+        with self._lock:
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO respuestas VALUES (?, ?, ?, ?, ?)",
+                (url, cuerpo, etag, last_modified, time.time()),
+            )
+            self._conexion.commit()
+
+    def renovar(self, url: str):
+        """Marca como fresca una entrada validada por el servidor (304)."""
+        with self._lock:
+            self._conexion.execute("UPDATE respuestas SET guardado = ? WHERE url = ?", (time.time(), url))
+            self._conexion.commit()
+
+    def limpiar(self):
+        with self._lock:
+            self._conexion.execute("DELETE FROM respuestas")
+            self._conexion.commit()
+
+    def obtener(self, pool: "PoolSesiones", url: str) -> Tuple[int, Any, Dict[str, str]]:
+        """GET a través de la caché.
+
+        Returns:
+            (código, json, cabeceras). Las respuestas servidas desde la caché
+            o validadas con 304 se devuelven con código 200.
+        """
+        entrada = self.buscar(url)
+        cabeceras = {}
+        if entrada:
+            cuerpo, etag, last_modified, guardado = entrada
+            if time.time() - guardado < self.ttl:
+                return 200, json.loads(cuerpo), {}
+            if etag:
+                cabeceras["If-None-Match"] = etag
+            if last_modified:
+                cabeceras["If-Modified-Since"] = last_modified
+
+        response = pool.get(url, headers=cabeceras)
+        if response.status_code == 304 and entrada:
+            self.renovar(url)
+            return 200, json.loads(entrada[0]), dict(response.headers)
+        if response.status_code == 200:
+            self.guardar(url, response.text, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            return 200, response.json(), dict(response.headers)
+        return response.status_code, None, dict(response.headers)
+
+    def cerrar(self):
+        with self._lock:
+            self._conexion.close()
+
+
+# Pool compartido por las instancias globales
+pool_http = PoolSesiones()
+
+
+def iterar_array_json(fragmentos: Iterable[bytes], clave: str) -> Iterator[Any]:
+    """Recorre uno a uno los elementos del array `clave` de un JSON recibido por trozos.
+
+    Solo mantiene en memoria el elemento que se está decodificando, de modo que
+    un archivo mensual con miles de partidas no se carga entero.
+    """
+    decodificador = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    fragmentos = iter(fragmentos)
+    buffer = ""
+    fin = False
+
+    def leer_mas() -> bool:
+        nonlocal buffer, fin
+        try:
+            buffer += utf8.decode(next(fragmentos))
+        except StopIteration:
+            buffer += utf8.decode(b"", final=True)
+            fin = True
+        return not fin
+
+    # Localizar el inicio del array: "clave": [
+    marcador = f'"{clave}"'
+    while True:
+        inicio = buffer.find(marcador)
+        corchete = buffer.find("[", inicio + len(marcador)) if inicio >= 0 else -1
+        if corchete >= 0:
+            buffer = buffer[corchete + 1:]
+            break
+        if not leer_mas():
+            return
+
+    while True:
+        pos = 0
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        if pos >= len(buffer):
+            buffer = ""
+            if not leer_mas():
+                return
+            continue
+        try:
+            elemento, fin_elemento = decodificador.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # Elemento incompleto: pedir más datos (o abandonar si no quedan)
+            if not leer_mas():
+                return
+            continue
+        if fin_elemento == len(buffer) and not fin:
+            # Un número al final del trozo puede seguir en el siguiente ("4" + "2")
+            leer_mas()
+            continue
+        yield elemento
+        buffer = buffer[fin_elemento:]
+
+
+class DescargadorPartidas:
+    """Descarga partidas de Chess.com recorriendo los archivos mensuales.
+
+    - `iterar_partidas` va del mes más reciente hacia atrás y se detiene en
+      cuanto alcanza el número pedido o la fecha límite, sin descargar el resto
+      del historial.
+    - `partidas_nuevas` reanuda desde el último mes y partida ya vistos
+      (estado guardado en disco) y solo pide lo que falta.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, pool: Optional[PoolSesiones] = None,
+                 ruta_estado: Optional[str] = RUTA_ESTADO_DESCARGAS):
+        """Crea el descargador.
+
+        Args:
+            base_url: URL base alternativa (p. ej. un servidor HTTP local de pruebas)
+            pool: Pool de sesiones a usar (por defecto, el compartido `pool_http`)
+            ruta_estado: Archivo JSON con el progreso por jugador; None para no persistirlo
+        """
+        self.base_url = base_url or ChessComAPI.BASE_URL
+        self.pool = pool or pool_http
+        self.ruta_estado = ruta_estado
+        self.estado: Dict[str, Dict] = {}
+        if ruta_estado and os.path.isfile(ruta_estado):
+            try:
+                with open(ruta_estado, encoding="utf-8") as f:
+                    self.estado = json.load(f)
+            except Exception as e:
+                print(f"Advertencia: no se pudo leer el estado de descargas: {e}")
+
+    def archivos(self, username: str) -> List[str]:
+        """Devuelve las URL de los archivos mensuales, del más antiguo al más reciente."""
+        response = self.pool.get(f"{self.base_url}/player/{username.lower()}/games/archives")
+        if response.status_code != 200:
+            return []
+        return response.json().get("archives", [])
+
+    def _partidas_mes(self, url: str) -> Iterator[Dict]:
+        """Partidas de un mes en orden cronológico, decodificadas en streaming."""
+        response = self.pool.get(url, stream=True)
+        try:
+            if response.status_code != 200:
+                print(f"Advertencia: archivo mensual {url} no disponible ({response.status_code})")
+                return
+            yield from iterar_array_json(response.iter_content(chunk_size=65536), "games")
+        finally:
+            response.close()
+
+    def iterar_partidas(self, username: str, limite: Optional[int] = None,
+                        desde: Optional[float] = None) -> Iterator[Dict]:
+        """Partidas de la más reciente a la más antigua.
+
+        Args:
+            username: Jugador de Chess.com
+            limite: Número máximo de partidas a devolver
+            desde: Marca de tiempo (epoch) mínima de `end_time`
+        """
+        return self.recorrer_archivos(self.archivos(username), limite, desde)
+
+    def recorrer_archivos(self, archivos: List[str], limite: Optional[int] = None,
+                          desde: Optional[float] = None) -> Iterator[Dict]:
+        """Como `iterar_partidas`, pero con la lista de archivos mensuales ya obtenida."""
+        restantes = limite
+        for url in reversed(archivos):
+            if restantes is not None and restantes <= 0:
+                return
+            if desde is not None and _fin_de_mes(url) < desde:
+                return
+            # Dentro del mes las partidas llegan en orden cronológico: solo se
+            # conservan las `restantes` más recientes
+            recientes = deque(maxlen=restantes)
+            for partida in self._partidas_mes(url):
+                if desde is None or partida.get("end_time", 0) >= desde:
+                    recientes.append(partida)
+            for partida in reversed(recientes):
+                yield partida
+            if restantes is not None:
+                restantes -= len(recientes)
+
+    def partidas_nuevas(self, username: str) -> Iterator[Dict]:
+        """Partidas terminadas desde la última llamada, en orden cronológico.
+
+        Solo se descargan los meses a partir del último procesado; el progreso
+        se guarda al terminar cada mes.
+        """
+        clave = username.lower()
+        progreso = self.estado.get(clave, {})
+        ultimo_mes = progreso.get("ultimo_mes")
+        ultimo_end_time = progreso.get("ultimo_end_time", 0)
+
+        archivos = self.archivos(username)
+        if ultimo_mes in archivos:
+            archivos = archivos[archivos.index(ultimo_mes):]
+        for url in archivos:
+            for partida in self._partidas_mes(url):
+                end_time = partida.get("end_time", 0)
+                if end_time <= ultimo_end_time:
+                    continue
+                ultimo_end_time = end_time
+                yield partida
+            self.estado[clave] = {"ultimo_mes": url, "ultimo_end_time": ultimo_end_time}
+            self._guardar_estado()
+
+    def descargar_mes(self, url: str) -> Tuple[int, Optional[List[Dict]], Dict[str, str]]:
+        """Descarga completa de un mes: (código HTTP, partidas o None, cabeceras).
+
+        A diferencia de `_partidas_mes`, no oculta los errores: quien la llama
+        decide si reintenta (p. ej. ante un 429 con Retry-After).
+        """
+        response = self.pool.get(url, stream=True)
+        try:
+            if response.status_code != 200:
+                return response.status_code, None, dict(response.headers)
+            partidas = list(iterar_array_json(response.iter_content(chunk_size=65536), "games"))
+            return 200, partidas, dict(response.headers)
+        finally:
+            response.close()
+
+    def _guardar_estado(self):
+        if not self.ruta_estado:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.ruta_estado), exist_ok=True)
+            temporal = self.ruta_estado + ".tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump(self.estado, f)
+            os.replace(temporal, self.ruta_estado)
+        except Exception as e:
+            print(f"Advertencia: no se pudo guardar el estado de descargas: {e}")
+
+
+def _fin_de_mes(url_archivo: str) -> float:
+    """Marca de tiempo (UTC) del final del mes de una URL .../games/AAAA/MM."""
+    try:
+        anio, mes = (int(p) for p in url_archivo.rstrip("/").split("/")[-2:])
+    except ValueError:
+        return float("inf")
+    anio_sig, mes_sig = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+    return float(calendar.timegm((anio_sig, mes_sig, 1, 0, 0, 0)))
+
+
 class ChessComAPI:
     """Cliente para la API de Chess.com (gratuita, sin autenticación)."""
 
     BASE_URL = "https://api.chess.com/pub"
 
+    def __init__(self, base_url: Optional[str] = None, pool: Optional[PoolSesiones] = None,
+                 cache: Union[CacheHTTP, Callable[[], CacheHTTP], None] = None):
+        """Crea el cliente.
+
+        Args:
+            base_url: URL base alternativa (p. ej. un servidor HTTP local de pruebas)
+            pool: Pool de sesiones a usar (por defecto, el compartido `pool_http`)
+            cache: Caché de respuestas, o función que la crea en la primera
+                petición (p. ej. `obtener_cache`); None para pedir siempre a la red
+        """
+        self.base_url = base_url or self.BASE_URL
+        self.pool = pool or pool_http
+        self.cache = cache
+        self.descargador = DescargadorPartidas(base_url=self.base_url, pool=self.pool)
+
+    def _obtener_json(self, url):
+        """GET de un recurso JSON (a través de la caché si existe); None si falla."""
+        if callable(self.cache):
+            self.cache = self.cache()
+        if self.cache:
+            codigo, datos, _ = self.cache.obtener(self.pool, url)
+            return datos if codigo == 200 else None
+        response = self.pool.get(url)
+        if response.status_code == 200:
+            return response.json()
+        return None
+
     def obtener_perfil_jugador(self, username):
         """Obtiene el perfil de un jugador."""
-        url = f"{self.BASE_URL}/player/{username}"
+        url = f"{self.base_url}/player/{username}"
         try:
-            response = requests.get(url)
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return None
+            return self._obtener_json(url)
         except Exception as e:
             print(f"Error obteniendo perfil: {e}")
             return None
 
     def obtener_estadisticas_jugador(self, username):
         """Obtiene estadísticas de un jugador."""
-        url = f"{self.BASE_URL}/player/{username}/stats"
+        url = f"{self.base_url}/player/{username}/stats"
         try:
-            response = requests.get(url)
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return None
+            return self._obtener_json(url)
         except Exception as e:
             print(f"Error obteniendo estadísticas: {e}")
             return None
 
     def obtener_juegos_recientes(self, username, limit=10):
-        """Obtiene los juegos recientes de un jugador."""
-        url = f"{self.BASE_URL}/player/{username}/games"
+        """Obtiene los juegos recientes de un jugador (del más reciente al más antiguo).
+
+        Recorre los archivos mensuales desde el último y se detiene al reunir
+        `limit` partidas, en lugar de descargar el historial completo.
+        """
         try:
-            response = requests.get(url)
-            if response.status_code == 200:
-                games = response.json().get('games', [])
-                return games[:limit]
-            else:
-                return []
+            return list(self.descargador.iterar_partidas(username, limite=limit))
         except Exception as e:
             print(f"Error obteniendo juegos: {e}")
             return []
 
+class _Vuelo:
+    """Petición en curso compartida por todos los que piden la misma clave."""
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+
+
 class ChessAPICom:
-    """Cliente para Chess-API.com (gratuita, análisis con Stockfish)."""
+    """Cliente para Chess-API.com (gratuita, análisis con Stockfish).
+
+    Las peticiones idénticas simultáneas (misma FEN, profundidad y variantes)
+    se agrupan en una sola llamada remota. Opcionalmente, si la respuesta
+    tarda más que el percentil de latencia configurado, se lanza en paralelo
+    una búsqueda local de cobertura y se devuelve la primera que llegue; si
+    la llamada remota falla antes de ese plazo, se usa directamente la local.
+    """
 
     BASE_URL = "https://chess-api.com/v1"
 
-    def analizar_posicion(self, fen, depth=12, variants=1):
-        """Analiza una posición FEN y devuelve el mejor movimiento."""
+    def __init__(self, base_url: Optional[str] = None, pool: Optional[PoolSesiones] = None,
+                 percentil_cobertura: float = 0.95, espera_cobertura_inicial: float = 2.0):
+        """Crea el cliente.
+
+        Args:
+            base_url: URL base alternativa (p. ej. un servidor HTTP local de pruebas)
+            pool: Pool de sesiones a usar (por defecto, el compartido `pool_http`)
+            percentil_cobertura: Percentil de latencia a partir del cual se lanza la cobertura
+            espera_cobertura_inicial: Espera (s) antes de cubrir mientras no hay muestras suficientes
+        """
+        self.base_url = base_url or self.BASE_URL
+        self.pool = pool or pool_http
+        self.percentil_cobertura = percentil_cobertura
+        self.espera_cobertura_inicial = espera_cobertura_inicial
+        self._latencias: deque = deque(maxlen=200)
+        self._en_vuelo: Dict[Tuple[str, int, int], _Vuelo] = {}
+        self._lock = threading.Lock()
+        self._ejecutor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="chess-api")
+
+    def analizar_posicion(self, fen, depth=12, variants=1,
+                          respaldo: Optional[Callable[[str], Optional[Dict]]] = None):
+        """Analiza una posición FEN y devuelve el mejor movimiento.
+
+        Args:
+            respaldo: Función local `respaldo(fen) -> {"move": ...}` que se
+                lanza si la llamada remota supera el percentil de latencia
+                o falla antes (error HTTP o de conexión)
+        """
+        clave = (fen, depth, variants)
+        with self._lock:
+            vuelo = self._en_vuelo.get(clave)
+            lider = vuelo is None
+            if lider:
+                vuelo = _Vuelo()
+                self._en_vuelo[clave] = vuelo
+        if not lider:
+            vuelo.evento.wait()
+            return vuelo.resultado
+
+        try:
+            vuelo.resultado = self._analizar_con_cobertura(fen, depth, variants, respaldo)
+        finally:
+            with self._lock:
+                del self._en_vuelo[clave]
+            vuelo.evento.set()
+        return vuelo.resultado
+
+    def espera_cobertura(self) -> float:
+        """Segundos de espera antes de lanzar la cobertura (percentil de latencias)."""
+        with self._lock:
+            muestras = sorted(self._latencias)
+        if len(muestras) < 5:
+            return self.espera_cobertura_inicial
+        return muestras[int(self.percentil_cobertura * (len(muestras) - 1))]
+
+    def _analizar_con_cobertura(self, fen, depth, variants, respaldo):
+        if respaldo is None:
+            return self._analizar_remoto(fen, depth, variants)
+        futuro_remoto = self._ejecutor.submit(self._analizar_remoto, fen, depth, variants)
+        try:
+            resultado = futuro_remoto.result(timeout=self.espera_cobertura())
+        except FuturesTimeoutError:
+            pass
+        else:
+            if resultado:
+                return resultado
+            # La API falló antes de tiempo (error HTTP o de conexión): cubrir en local
+            try:
+                return respaldo(fen)
+            except Exception as e:
+                print(f"Error en análisis de cobertura: {e}")
+                return None
+
+        # La API va lenta: competir con la búsqueda local y quedarse con la primera
+        futuro_local = self._ejecutor.submit(respaldo, fen)
+        pendientes = {futuro_remoto, futuro_local}
+        while pendientes:
+            hechos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in hechos:
+                try:
+                    resultado = futuro.result()
+                except Exception as e:
+                    print(f"Error en análisis de cobertura: {e}")
+                    resultado = None
+                if resultado:
+                    return resultado
+        return None
+
+    def _analizar_remoto(self, fen, depth, variants):
         data = {
             "fen": fen,
             "depth": depth,
             "variants": variants
         }
         try:
-            response = requests.post(self.BASE_URL, json=data, timeout=10)
+            inicio = time.monotonic()
+            response = self.pool.post(self.base_url, json=data)
             if response.status_code == 200:
                 result = response.json()
+                with self._lock:
+                    self._latencias.append(time.monotonic() - inicio)
                 return result
             else:
                 print(f"Error en análisis: {response.status_code}")
@@ -77,6 +606,192 @@ class ChessAPICom:
             print(f"Error analizando posición: {e}")
             return None
 
+class LimitadorTasa:
+    """Cubeta de tokens para asyncio: `tasa` peticiones/segundo con ráfagas de `capacidad`."""
+
+    def __init__(self, tasa: float, capacidad: Optional[int] = None):
+        self.tasa = tasa
+        self.capacidad = capacidad or max(1, int(tasa))
+        self._tokens = float(self.capacidad)
+        self._ultimo = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def adquirir(self):
+        """Espera hasta disponer de un token."""
+        async with self._lock:
+            while True:
+                ahora = time.monotonic()
+                self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultimo) * self.tasa)
+                self._ultimo = ahora
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.tasa)
+
+    def pausar(self, segundos: float):
+        """Vacía la cubeta para que nadie pida nada durante `segundos` (tras un 429)."""
+        self._tokens = min(self._tokens, -segundos * self.tasa)
+
+
+class ChessComAPIAsync:
+    """Cliente asyncio para descargar en lote datos de muchos jugadores de Chess.com.
+
+    No es E/S asíncrona: cada petición es una llamada bloqueante de
+    `requests` que se ejecuta en un ejecutor de hilos acotado (sin
+    dependencias nuevas). asyncio solo coordina la concurrencia máxima, el
+    limitador de tasa compartido y los reintentos con espera exponencial
+    ante respuestas 429.
+
+    Los juegos recientes se obtienen como en `ChessComAPI`: lista de
+    archivos mensuales y descarga de los meses más recientes con
+    `DescargadorPartidas`. Cada mes es una petición más: pasa por el
+    limitador y se reintenta ante 429 como las demás.
+    """
+
+    def __init__(
+        self,
+        concurrencia: int = 16,
+        peticiones_por_segundo: float = 10.0,
+        reintentos_429: int = 5,
+        base_url: Optional[str] = None,
+        pool: Optional[PoolSesiones] = None,
+        cache: Optional[CacheHTTP] = None,
+    ):
+        """Configura el cliente.
+
+        Args:
+            concurrencia: Peticiones simultáneas como máximo
+            peticiones_por_segundo: Tasa sostenida permitida por el limitador
+            reintentos_429: Reintentos ante "Too Many Requests" antes de rendirse
+            base_url: URL base alternativa (p. ej. un servidor HTTP local de pruebas)
+            pool: Pool de sesiones (por defecto, uno propio con `concurrencia` conexiones)
+            cache: Caché de respuestas; None para pedir siempre a la red
+        """
+        self.base_url = base_url or ChessComAPI.BASE_URL
+        self.concurrencia = concurrencia
+        self.peticiones_por_segundo = peticiones_por_segundo
+        self.reintentos_429 = reintentos_429
+        self.pool = pool or PoolSesiones(conexiones_por_host=concurrencia)
+        self.cache = cache
+        self.descargador = DescargadorPartidas(self.base_url, pool=self.pool, ruta_estado=None)
+
+    def _peticion(self, url: str) -> Tuple[int, Any, Dict[str, str]]:
+        """GET bloqueante (se ejecuta en el ejecutor de hilos)."""
+        if self.cache:
+            return self.cache.obtener(self.pool, url)
+        response = self.pool.get(url)
+        datos = response.json() if response.status_code == 200 else None
+        return response.status_code, datos, dict(response.headers)
+
+    async def _obtener_json(self, url: str, semaforo: asyncio.Semaphore, limitador: LimitadorTasa,
+                            ejecutor: ThreadPoolExecutor,
+                            peticion: Optional[Callable[[str], Tuple[int, Any, Dict[str, str]]]] = None) -> Any:
+        """GET con concurrencia acotada, limitador de tasa y espera ante 429.
+
+        `peticion(url) -> (código, datos, cabeceras)` es la llamada bloqueante
+        (por defecto, `_peticion`). Devuelve los datos, o None si no hay 200.
+        """
+        loop = asyncio.get_running_loop()
+        peticion = peticion or self._peticion
+        for intento in range(self.reintentos_429 + 1):
+            async with semaforo:
+                await limitador.adquirir()
+                try:
+                    codigo, datos, cabeceras = await loop.run_in_executor(ejecutor, peticion, url)
+                except Exception as e:
+                    print(f"Error obteniendo {url}: {e}")
+                    return None
+            if codigo == 200:
+                return datos
+            if codigo != 429:
+                return None
+            # Respetar Retry-After si existe; si no, espera exponencial con jitter
+            try:
+                espera = float(cabeceras.get("Retry-After", ""))
+            except ValueError:
+                espera = 0.5 * (2 ** intento) + random.uniform(0, 0.25)
+            limitador.pausar(espera)
+            await asyncio.sleep(espera)
+        print(f"Demasiadas respuestas 429 para {url}")
+        return None
+
+    async def _obtener_juegos(self, username: str, limit: int, semaforo: asyncio.Semaphore,
+                              limitador: LimitadorTasa, ejecutor: ThreadPoolExecutor) -> Tuple[List[Dict], bool]:
+        """Juegos recientes (del más reciente al más antiguo) recorriendo los archivos mensuales.
+
+        Devuelve (juegos, completos): `completos` es False si algún mes no se
+        pudo descargar y la lista puede quedarse corta.
+        """
+        url = f"{self.base_url}/player/{username.lower()}/games/archives"
+        archivos = await self._obtener_json(url, semaforo, limitador, ejecutor)
+        if archivos is None:
+            return [], False
+        juegos: List[Dict] = []
+        for url_mes in reversed(archivos.get("archives", [])):
+            if len(juegos) >= limit:
+                break
+            partidas = await self._obtener_json(url_mes, semaforo, limitador, ejecutor,
+                                                peticion=self.descargador.descargar_mes)
+            if partidas is None:
+                # Saltar el mes daría una lista de "recientes" con un hueco
+                print(f"Error obteniendo el archivo mensual {url_mes}: juegos de {username} incompletos")
+                return juegos, False
+            # Dentro del mes las partidas llegan en orden cronológico
+            juegos.extend(reversed(partidas[-(limit - len(juegos)):]))
+        return juegos, True
+
+    async def obtener_jugadores(self, usernames: Iterable[str], limit: int = 10) -> Dict[str, Dict]:
+        """Descarga perfil, estadísticas y juegos de todos los jugadores indicados.
+
+        Returns:
+            {username: {"perfil": dict|None, "estadisticas": dict|None, "juegos": list,
+                        "juegos_completos": bool}}
+        """
+        semaforo = asyncio.Semaphore(self.concurrencia)
+        limitador = LimitadorTasa(self.peticiones_por_segundo)
+        usernames = list(dict.fromkeys(usernames))
+
+        with ThreadPoolExecutor(max_workers=self.concurrencia) as ejecutor:
+            async def jugador(username: str):
+                perfil, estadisticas, (juegos, completos) = await asyncio.gather(
+                    self._obtener_json(f"{self.base_url}/player/{username}", semaforo, limitador, ejecutor),
+                    self._obtener_json(f"{self.base_url}/player/{username}/stats", semaforo, limitador, ejecutor),
+                    self._obtener_juegos(username, limit, semaforo, limitador, ejecutor),
+                )
+                return username, {
+                    "perfil": perfil,
+                    "estadisticas": estadisticas,
+                    "juegos": juegos,
+                    "juegos_completos": completos,
+                }
+
+            resultados = await asyncio.gather(*(jugador(u) for u in usernames))
+        return dict(resultados)
+
+    def obtener_jugadores_sincrono(self, usernames: Iterable[str], limit: int = 10) -> Dict[str, Dict]:
+        """Versión bloqueante de `obtener_jugadores` para código sin bucle asyncio."""
+        return asyncio.run(self.obtener_jugadores(usernames, limit=limit))
+
+
+# Caché compartida; se abre en la primera petición, así importar el módulo no toca el disco
+_cache_http: Optional[CacheHTTP] = None
+_cerrojo_cache = threading.Lock()
+
+
+def obtener_cache() -> CacheHTTP:
+    """Devuelve la caché HTTP compartida, creándola la primera vez."""
+    global _cache_http
+    with _cerrojo_cache:
+        if _cache_http is None:
+            try:
+                _cache_http = CacheHTTP()
+            except Exception as e:
+                # Sin permisos de escritura (u otro fallo de disco): caché solo en memoria
+                print(f"Advertencia: caché HTTP en memoria ({e})")
+                _cache_http = CacheHTTP(ruta=None)
+        return _cache_http
+
+
 # Instancias globales
-chess_com = ChessComAPI()
+chess_com = ChessComAPI(cache=obtener_cache)
 chess_api = ChessAPICom()
\ No newline at end of file
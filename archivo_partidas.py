@@ -0,0 +1,251 @@
+"""Archivo de partidas de solo lectura mapeado en memoria (mmap).
+
+Responsabilidades:
+- Escribir partidas codificadas (ver `codificacion_partidas`) en un archivo
+  de datos de solo anexado, más un índice de desplazamientos de tamaño fijo
+- Abrir el archivo al instante con `mmap` (no se lee nada hasta que se usa)
+- Dar acceso aleatorio y sin copias a los bytes de jugadas de cualquier partida
+
+Formato:
+    <ruta>      cabecera MAGIA_DATOS y, a continuación, las jugadas de cada partida
+    <ruta>.idx  cabecera MAGIA_INDICE y una entrada de 16 bytes por partida:
+                desplazamiento (u64), longitud (u32), resultado (u8), relleno
+
+Uso:
+    python archivo_partidas.py crear <archivo> partidas.pgn [otro.pgn ...] [--durable]
+    python archivo_partidas.py info <archivo>
+"""
+from typing import Optional, List, Tuple, Iterator, Iterable
+import mmap
+import os
+import struct
+
+from codificacion_partidas import codificar_san, decodificar_uci
+
+MAGIA_DATOS = b"AJPD\x01\x00\x00\x00"
+MAGIA_INDICE = b"AJPI\x01\x00\x00\x00"
+_ENTRADA = struct.Struct("<QIB3x")
+
+RESULTADOS = ("*", "1-0", "0-1", "1/2-1/2")
+
+
+# Entradas de índice acumuladas antes de volcarlas (tras los datos que describen)
+INDICE_PENDIENTE_MAXIMO = 64 * 1024
+
+
+def _ruta_indice(ruta: str) -> str:
+    return ruta + ".idx"
+
+
+def _entradas_validas(entrada, cantidad: int, tamano_datos: int) -> int:
+    """Número de entradas del índice cuyas jugadas están completas en los datos.
+
+    Tras una caída el índice puede tener entradas finales que apuntan más
+    allá del final de los datos; los desplazamientos son crecientes, así que
+    basta con mirar desde el final.
+    """
+    while cantidad:
+        desplazamiento, longitud, _ = entrada(cantidad - 1)
+        if desplazamiento + longitud <= tamano_datos:
+            break
+        cantidad -= 1
+    return cantidad
+
+
+class EscritorArchivo:
+    """Añade partidas al final de un archivo (lo crea si no existe).
+
+    Las entradas del índice se acumulan y solo se escriben después de volcar
+    los datos que describen (con `os.fsync` si `durable`). Al abrir se
+    descartan las entradas que apunten más allá del final de los datos, de
+    modo que una caída del proceso (o del equipo, con `durable`) solo pierde
+    las últimas partidas.
+    """
+
+    def __init__(self, ruta: str, durable: bool = False):
+        """Abre o crea el archivo.
+
+        Args:
+            ruta: Ruta del archivo de datos (el índice es `<ruta>.idx`)
+            durable: Sincronizar con el disco en cada volcado, no solo con el sistema operativo
+
+        Raises:
+            ValueError: Si hay datos pero falta el índice (los datos no
+                marcan dónde acaba cada partida, así que no se puede rehacer)
+        """
+        self.ruta = ruta
+        self.durable = durable
+        ruta_indice = _ruta_indice(ruta)
+        nuevo = not os.path.exists(ruta) or os.path.getsize(ruta) == 0
+        if not nuevo and not os.path.exists(ruta_indice):
+            raise ValueError(f"Falta el índice {ruta_indice}: no se puede añadir a {ruta}")
+        self._datos = open(ruta, "ab")
+        self._indice = open(ruta_indice, "ab")
+        self._pendiente = bytearray()
+        if nuevo:
+            self._datos.write(MAGIA_DATOS)
+            self._indice.truncate(0)
+            self._indice.write(MAGIA_INDICE)
+        else:
+            self._recortar_indice(ruta_indice)
+        self._desplazamiento = self._datos.tell()
+
+    def _recortar_indice(self, ruta_indice: str):
+        """Descarta entradas a medio escribir o que apuntan a datos que no llegaron al disco."""
+        cantidad = (self._indice.tell() - len(MAGIA_INDICE)) // _ENTRADA.size
+        with open(ruta_indice, "rb") as f:
+            def entrada(i: int) -> Tuple[int, int, int]:
+                f.seek(len(MAGIA_INDICE) + i * _ENTRADA.size)
+                return _ENTRADA.unpack(f.read(_ENTRADA.size))
+            cantidad = _entradas_validas(entrada, max(cantidad, 0), self._datos.tell())
+        tamano = len(MAGIA_INDICE) + cantidad * _ENTRADA.size
+        if tamano != self._indice.tell():
+            self._indice.truncate(tamano)
+
+    def anadir(self, jugadas: bytes, resultado: str = "*"):
+        """Añade una partida ya codificada (bytes de `codificacion_partidas`)."""
+        codigo = RESULTADOS.index(resultado) if resultado in RESULTADOS else 0
+        self._datos.write(jugadas)
+        self._pendiente += _ENTRADA.pack(self._desplazamiento, len(jugadas), codigo)
+        self._desplazamiento += len(jugadas)
+        if len(self._pendiente) >= INDICE_PENDIENTE_MAXIMO:
+            self.volcar()
+
+    def volcar(self):
+        """Escribe los datos y, después, las entradas de índice pendientes."""
+        self._datos.flush()
+        if self.durable:
+            os.fsync(self._datos.fileno())
+        if self._pendiente:
+            self._indice.write(self._pendiente)
+            self._pendiente.clear()
+        self._indice.flush()
+        if self.durable:
+            os.fsync(self._indice.fileno())
+
+    def anadir_pgn(self, partidas: Iterable[Tuple[dict, str]]) -> int:
+        """Codifica y añade pares (cabeceras, jugadas) de `base_partidas.iterar_pgn`.
+
+        Las partidas que no empiezan en la posición inicial o que no se pueden
+        reproducir se omiten. Devuelve cuántas se añadieron.
+        """
+        total = 0
+        for cabeceras, movetext in partidas:
+            if "FEN" in cabeceras:
+                continue
+            codificadas = codificar_san(movetext)
+            if codificadas is not None:
+                self.anadir(codificadas, cabeceras.get("Result", "*"))
+                total += 1
+        return total
+
+    def cerrar(self):
+        self.volcar()
+        self._datos.close()
+        self._indice.close()
+
+
+class ArchivoPartidas:
+    """Lector de un archivo de partidas mediante `mmap`.
+
+    Abrirlo solo mapea los dos archivos; el sistema operativo carga las
+    páginas bajo demanda, de modo que el coste de abrir no depende del número
+    de partidas y recorrerlo solo toca las páginas usadas.
+    """
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._datos, self._vista = self._mapear(ruta, MAGIA_DATOS)
+        self._indice, _ = self._mapear(_ruta_indice(ruta), MAGIA_INDICE)
+        tamano = len(self._indice) if self._indice is not None else len(MAGIA_INDICE)
+        self._cantidad = (tamano - len(MAGIA_INDICE)) // _ENTRADA.size
+        # Ignorar entradas finales sin sus datos (escritura interrumpida)
+        tamano_datos = len(self._datos) if self._datos is not None else 0
+        self._cantidad = _entradas_validas(
+            lambda i: _ENTRADA.unpack_from(self._indice, len(MAGIA_INDICE) + i * _ENTRADA.size),
+            self._cantidad, tamano_datos,
+        )
+        if self._datos is not None and hasattr(mmap, "MADV_RANDOM"):
+            # El acceso típico es aleatorio: no leer por adelantado páginas vecinas
+            self._datos.madvise(mmap.MADV_RANDOM)
+
+    @staticmethod
+    def _mapear(ruta: str, magia: bytes) -> Tuple[Optional[mmap.mmap], Optional[memoryview]]:
+        with open(ruta, "rb") as f:
+            if os.fstat(f.fileno()).st_size <= len(magia):
+                return None, None
+            mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapa[:len(magia)] != magia:
+            mapa.close()
+            raise ValueError(f"{ruta} no es un archivo de partidas válido")
+        return mapa, memoryview(mapa)
+
+    def contar(self) -> int:
+        return self._cantidad
+
+    def _entrada(self, i: int) -> Tuple[int, int, int]:
+        if not 0 <= i < self._cantidad:
+            raise IndexError(i)
+        return _ENTRADA.unpack_from(self._indice, len(MAGIA_INDICE) + i * _ENTRADA.size)
+
+    def jugadas(self, i: int) -> memoryview:
+        """Bytes de jugadas de la partida i, sin copiar (vista sobre el mapa)."""
+        desplazamiento, longitud, _ = self._entrada(i)
+        return self._vista[desplazamiento:desplazamiento + longitud]
+
+    def resultado(self, i: int) -> str:
+        return RESULTADOS[self._entrada(i)[2]]
+
+    def jugadas_uci(self, i: int) -> List[str]:
+        return decodificar_uci(self.jugadas(i))
+
+    def iterar(self, desde: int = 0, hasta: Optional[int] = None) -> Iterator[Tuple[memoryview, str]]:
+        """Recorre (jugadas, resultado) de las partidas [desde, hasta) en orden."""
+        hasta = self._cantidad if hasta is None else min(hasta, self._cantidad)
+        for i in range(desde, hasta):
+            desplazamiento, longitud, resultado = _ENTRADA.unpack_from(
+                self._indice, len(MAGIA_INDICE) + i * _ENTRADA.size
+            )
+            yield self._vista[desplazamiento:desplazamiento + longitud], RESULTADOS[resultado]
+
+    def cerrar(self):
+        """Cierra los mapas; falla con BufferError si quedan vistas de `jugadas` vivas."""
+        if self._vista is not None:
+            self._vista.release()
+        for mapa in (self._datos, self._indice):
+            if mapa is not None:
+                mapa.close()
+        self._datos = self._indice = self._vista = None
+        self._cantidad = 0
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Archivo de partidas mapeado en memoria")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_crear = sub.add_parser("crear", help="Añadir partidas PGN al archivo")
+    p_crear.add_argument("archivo")
+    p_crear.add_argument("pgn", nargs="+")
+    p_crear.add_argument("--durable", action="store_true", help="Sincronizar con el disco (fsync) al volcar")
+    p_info = sub.add_parser("info", help="Resumen del archivo")
+    p_info.add_argument("archivo")
+    args = parser.parse_args()
+
+    if args.comando == "crear":
+        from base_partidas import iterar_pgn
+        escritor = EscritorArchivo(args.archivo, durable=args.durable)
+        try:
+            for ruta in args.pgn:
+                print(f"{ruta}: {escritor.anadir_pgn(iterar_pgn(ruta))} partidas añadidas")
+        finally:
+            escritor.cerrar()
+    archivo = ArchivoPartidas(args.archivo)
+    try:
+        plies = sum(len(jugadas) // 2 for jugadas, _ in archivo.iterar())
+        print(f"{archivo.contar()} partidas, {plies} jugadas, {os.path.getsize(args.archivo)} bytes")
+    finally:
+        archivo.cerrar()
+
+
+if __name__ == "__main__":
+    main()
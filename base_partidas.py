@@ -0,0 +1,422 @@
+"""Base de datos local de partidas (SQLite) con ingesta masiva de PGN.
+
+Responsabilidades:
+- Guardar partidas con sus cabeceras principales e índices por jugador,
+  fecha, ECO y resultado para consultar el historial sin conexión
+- Leer PGN en streaming para ingerir millones de partidas sin reproducirlas
+- Guardar las jugadas en binario compacto (2 bytes por jugada, ver
+  `codificacion_partidas`) en una segunda pasada (`compactar`), o ya en la
+  ingesta con `codificar=True`, y devolverlas como texto SAN al consultar
+- Insertar por lotes dentro de transacciones, sin duplicar partidas (por URL
+  o por la huella de cabeceras y jugadas)
+- Ingerir directamente las partidas descargadas de Chess.com
+- Guardar las partidas terminadas en local y mantener al día el índice de
+  posiciones (ver `indice_posiciones`)
+
+Uso:
+    python base_partidas.py ingerir partidas.pgn [otro.pgn ...] [--codificar]
+    python base_partidas.py compactar
+    python base_partidas.py descargar <usuario_chess_com>
+    python base_partidas.py jugador <nombre> [--limite 20]
+    python base_partidas.py explorar "<fen>"
+"""
+from typing import Optional, Dict, List, Tuple, Iterable, Iterator, Union, TextIO
+import hashlib
+import os
+import re
+import sqlite3
+
+from codificacion_partidas import codificar_san, a_movetext
+from indice_posiciones import IndicePosiciones
+
+RUTA_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos", "partidas.sqlite")
+TAMANO_LOTE = 5000
+
+# Cabecera PGN: [Clave "Valor"]
+_PATRON_CABECERA = re.compile(r'^\[(\w+)\s+"(.*)"\]\s*$')
+
+_INDICES = {
+    "idx_partidas_blancas": "partidas(blancas, fecha)",
+    "idx_partidas_negras": "partidas(negras, fecha)",
+    "idx_partidas_fecha": "partidas(fecha)",
+    "idx_partidas_eco": "partidas(eco)",
+    "idx_partidas_resultado": "partidas(resultado)",
+}
+
+
+def iterar_pgn(fuente: Union[str, TextIO, Iterable[str]]) -> Iterator[Tuple[Dict[str, str], str]]:
+    """Recorre un PGN y devuelve (cabeceras, texto_de_jugadas) por partida.
+
+    Solo separa cabeceras y jugadas línea a línea, sin reproducir la partida,
+    por lo que es mucho más rápido que `chess.pgn.read_game` para ingesta.
+
+    Args:
+        fuente: Ruta a un archivo .pgn, archivo abierto o iterable de líneas
+    """
+    if isinstance(fuente, str):
+        with open(fuente, encoding="utf-8", errors="replace") as f:
+            yield from iterar_pgn(f)
+        return
+
+    cabeceras: Dict[str, str] = {}
+    jugadas: List[str] = []
+    for linea in fuente:
+        linea = linea.strip()
+        if not linea:
+            continue
+        coincidencia = _PATRON_CABECERA.match(linea) if linea.startswith("[") else None
+        if coincidencia:
+            if jugadas:
+                # Empieza una partida nueva: emitir la anterior
+                yield cabeceras, " ".join(jugadas)
+                cabeceras, jugadas = {}, []
+            cabeceras[coincidencia.group(1)] = coincidencia.group(2)
+        else:
+            jugadas.append(linea)
+    if cabeceras or jugadas:
+        yield cabeceras, " ".join(jugadas)
+
+
+def _entero(valor: Optional[str]) -> Optional[int]:
+    try:
+        return int(valor) if valor else None
+    except ValueError:
+        return None
+
+
+def _clave_partida(cabeceras: Dict[str, str], jugadas: str) -> bytes:
+    """Huella de cabeceras y jugadas para no guardar dos veces la misma partida.
+
+    A diferencia de la URL, nunca es nula: también sirve para partidas de un
+    PGN o jugadas en local.
+    """
+    huella = hashlib.blake2b(digest_size=16)
+    for clave, valor in sorted(cabeceras.items()):
+        huella.update(f"{clave}\x1f{valor}\x1e".encode("utf-8"))
+    huella.update(" ".join(jugadas.split()).encode("utf-8"))
+    return huella.digest()
+
+
+def _movetext_local(movimientos: List[Tuple[Tuple[int, int], Tuple[int, int]]], resultado: str) -> str:
+    """Convierte movimientos del tablero interno (y=0 es la fila 1) en texto SAN.
+
+    El tablero interno no conoce el enroque ni la coronación: la partida se
+    corta en la primera jugada que python-chess no acepte.
+    """
+    import chess
+    board = chess.Board()
+    partes: List[str] = []
+    for (x1, y1), (x2, y2) in movimientos:
+        move = chess.Move(chess.square(x1, y1), chess.square(x2, y2))
+        if move not in board.legal_moves:
+            break
+        if board.turn == chess.WHITE:
+            partes.append(f"{board.fullmove_number}.")
+        partes.append(board.san(move))
+        board.push(move)
+    partes.append(resultado)
+    return " ".join(partes)
+
+
+class BasePartidas:
+    """Almacén SQLite de partidas.
+
+    Las inserciones se agrupan en lotes de `tamano_lote` dentro de una
+    transacción; las partidas con el mismo enlace (`url`) o con las mismas
+    cabeceras y jugadas (`clave`) no se duplican.
+    """
+
+    def __init__(self, ruta: Optional[str] = RUTA_BASE, tamano_lote: int = TAMANO_LOTE, indexar: bool = True,
+                 codificar: bool = False):
+        """Abre (o crea) la base.
+
+        Args:
+            ruta: Archivo SQLite; None para una base en memoria
+            tamano_lote: Partidas por transacción durante la ingesta
+            indexar: Actualizar el índice de posiciones tras cada ingesta
+            codificar: Pasar las jugadas a binario durante la ingesta (reproduce
+                cada partida); si no, quedan como texto hasta `compactar`
+        """
+        self.ruta = ruta or ":memory:"
+        self.tamano_lote = tamano_lote
+        if ruta:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        self.conexion = sqlite3.connect(self.ruta)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self.conexion.execute(
+            "CREATE TABLE IF NOT EXISTS partidas ("
+            " id INTEGER PRIMARY KEY,"
+            " url TEXT UNIQUE,"
+            " blancas TEXT COLLATE NOCASE,"
+            " negras TEXT COLLATE NOCASE,"
+            " elo_blancas INTEGER,"
+            " elo_negras INTEGER,"
+            " resultado TEXT,"
+            " fecha TEXT,"
+            " eco TEXT,"
+            " evento TEXT,"
+            " control_tiempo TEXT,"
+            " jugadas BLOB,"
+            " fen TEXT,"
+            " clave BLOB)"
+        )
+        self._migrar()
+        self._crear_indices()
+        self.conexion.commit()
+        self.indexar = indexar
+        self.codificar = codificar
+        self.indice = IndicePosiciones(self.conexion)
+
+    def _migrar(self):
+        """Añade a una base anterior las columnas que le faltan."""
+        columnas = {fila[1] for fila in self.conexion.execute("PRAGMA table_info(partidas)")}
+        for columna, tipo in (("fen", "TEXT"), ("clave", "BLOB")):
+            if columna not in columnas:
+                self.conexion.execute(f"ALTER TABLE partidas ADD COLUMN {columna} {tipo}")
+        # Fuera de _INDICES: evita duplicados, así que no se borra durante la carga inicial
+        self.conexion.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_partidas_clave ON partidas(clave)")
+
+    def _crear_indices(self):
+        for nombre, definicion in _INDICES.items():
+            self.conexion.execute(f"CREATE INDEX IF NOT EXISTS {nombre} ON {definicion}")
+
+    def _borrar_indices(self):
+        for nombre in _INDICES:
+            self.conexion.execute(f"DROP INDEX IF EXISTS {nombre}")
+
+    def contar(self) -> int:
+        return self.conexion.execute("SELECT COUNT(*) FROM partidas").fetchone()[0]
+
+    def _fila(self, cabeceras: Dict[str, str], jugadas: str) -> Tuple:
+        # Chess.com usa la cabecera Link y Lichess la cabecera Site para la URL de la partida
+        url = cabeceras.get("Link")
+        if not url and cabeceras.get("Site", "").startswith("http"):
+            url = cabeceras["Site"]
+        fen = cabeceras.get("FEN")
+        # Solo con `codificar`: partidas desde la posición inicial en binario; el resto
+        # (FEN propia, variantes, jugadas ilegales) se conserva como texto
+        codificadas = codificar_san(jugadas) if self.codificar and not fen else None
+        return (
+            url,
+            cabeceras.get("White"),
+            cabeceras.get("Black"),
+            _entero(cabeceras.get("WhiteElo")),
+            _entero(cabeceras.get("BlackElo")),
+            cabeceras.get("Result"),
+            cabeceras.get("UTCDate") or cabeceras.get("Date"),
+            cabeceras.get("ECO"),
+            cabeceras.get("Event"),
+            cabeceras.get("TimeControl"),
+            codificadas if codificadas is not None else jugadas,
+            fen,
+            _clave_partida(cabeceras, jugadas),
+        )
+
+    def ingerir(self, partidas: Iterable[Tuple[Dict[str, str], str]]) -> int:
+        """Inserta (cabeceras, jugadas) por lotes; devuelve cuántas partidas nuevas entraron.
+
+        Si la base está vacía, los índices se eliminan durante la carga y se
+        reconstruyen al final (mucho más rápido que mantenerlos fila a fila).
+        """
+        carga_inicial = self.contar() == 0
+        if carga_inicial:
+            self._borrar_indices()
+        antes = self.conexion.total_changes
+        sql = (
+            "INSERT OR IGNORE INTO partidas (url, blancas, negras, elo_blancas, elo_negras,"
+            " resultado, fecha, eco, evento, control_tiempo, jugadas, fen, clave)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+        )
+        lote: List[Tuple] = []
+        try:
+            for cabeceras, jugadas in partidas:
+                lote.append(self._fila(cabeceras, jugadas))
+                if len(lote) >= self.tamano_lote:
+                    with self.conexion:
+                        self.conexion.executemany(sql, lote)
+                    lote = []
+            if lote:
+                with self.conexion:
+                    self.conexion.executemany(sql, lote)
+        finally:
+            if carga_inicial:
+                with self.conexion:
+                    self._crear_indices()
+        nuevas = self.conexion.total_changes - antes
+        if self.indexar and nuevas:
+            self.indice.indexar_pendientes()
+        return nuevas
+
+    def compactar(self) -> int:
+        """Segunda pasada: pasa a binario las jugadas guardadas como texto.
+
+        Las partidas con FEN propia, de variantes o con jugadas ilegales siguen
+        como texto. Devuelve cuántas se compactaron.
+        """
+        ultimo = 0
+        total = 0
+        while True:
+            filas = self.conexion.execute(
+                "SELECT id, jugadas FROM partidas"
+                " WHERE id > ? AND fen IS NULL AND typeof(jugadas) = 'text' ORDER BY id LIMIT ?",
+                (ultimo, self.tamano_lote),
+            ).fetchall()
+            if not filas:
+                return total
+            cambios = []
+            for partida_id, jugadas in filas:
+                codificadas = codificar_san(jugadas)
+                if codificadas is not None:
+                    cambios.append((codificadas, partida_id))
+                ultimo = partida_id
+            with self.conexion:
+                self.conexion.executemany("UPDATE partidas SET jugadas = ? WHERE id = ?", cambios)
+            total += len(cambios)
+
+    def ingerir_pgn(self, fuente: Union[str, TextIO, Iterable[str]]) -> int:
+        """Ingiere un archivo PGN completo en streaming."""
+        return self.ingerir(iterar_pgn(fuente))
+
+    def ingerir_chess_com(self, partidas: Iterable[Dict]) -> int:
+        """Ingiere partidas tal como las devuelve la API de Chess.com (campo 'pgn')."""
+        def pares():
+            for partida in partidas:
+                pgn = partida.get("pgn")
+                if not pgn:
+                    continue
+                for cabeceras, jugadas in iterar_pgn(pgn.splitlines()):
+                    if partida.get("url"):
+                        cabeceras.setdefault("Link", partida["url"])
+                    yield cabeceras, jugadas
+        return self.ingerir(pares())
+
+    def guardar_partida_local(
+        self,
+        movimientos: List[Tuple[Tuple[int, int], Tuple[int, int]]],
+        resultado: str = "*",
+        blancas: str = "Blancas",
+        negras: str = "Negras",
+        evento: str = "Partida local",
+    ) -> int:
+        """Guarda una partida jugada en el tablero interno y la indexa.
+
+        Args:
+            movimientos: `Tablero.historial_movimientos` ((x, y) origen, (x, y) destino)
+            resultado: "1-0", "0-1", "1/2-1/2" o "*"
+        """
+        import datetime
+        ahora = datetime.datetime.now()
+        cabeceras = {
+            "Event": evento,
+            "White": blancas,
+            "Black": negras,
+            "Result": resultado,
+            "Date": ahora.strftime("%Y.%m.%d"),
+            # La hora distingue dos partidas iguales jugadas el mismo día (ver `_clave_partida`)
+            "Time": ahora.strftime("%H:%M:%S"),
+        }
+        return self.ingerir([(cabeceras, _movetext_local(movimientos, resultado))])
+
+    def explorar(self, fen: str) -> List[Dict]:
+        """Estadísticas de las jugadas jugadas desde una posición (ver `IndicePosiciones`)."""
+        return self.indice.estadisticas(fen)
+
+    def partidas_de_jugador(
+        self,
+        nombre: str,
+        limite: Optional[int] = 50,
+        desde: Optional[str] = None,
+        hasta: Optional[str] = None,
+        eco: Optional[str] = None,
+        resultado: Optional[str] = None,
+    ) -> List[Dict]:
+        """Historial de un jugador (con ambos colores), de la más reciente a la más antigua.
+
+        Args:
+            nombre: Nombre del jugador (sin distinguir mayúsculas)
+            desde, hasta: Fechas en formato PGN (AAAA.MM.DD), inclusivas
+            eco: Código ECO exacto (p. ej. "C50")
+            resultado: "1-0", "0-1" o "1/2-1/2"
+        """
+        filtros = ""
+        parametros: List = []
+        if desde:
+            filtros += " AND fecha >= ?"
+            parametros.append(desde)
+        if hasta:
+            filtros += " AND fecha <= ?"
+            parametros.append(hasta)
+        if eco:
+            filtros += " AND eco = ?"
+            parametros.append(eco)
+        if resultado:
+            filtros += " AND resultado = ?"
+            parametros.append(resultado)
+        # UNION ALL para que cada rama use su índice (blancas / negras)
+        sql = (
+            f"SELECT * FROM (SELECT * FROM partidas WHERE blancas = ?{filtros}"
+            f" UNION ALL SELECT * FROM partidas WHERE negras = ?{filtros})"
+            " ORDER BY fecha DESC, id DESC"
+        )
+        parametros = [nombre] + parametros + [nombre] + parametros
+        if limite:
+            sql += " LIMIT ?"
+            parametros.append(limite)
+        cursor = self.conexion.execute(sql, parametros)
+        columnas = [c[0] for c in cursor.description]
+        partidas = [dict(zip(columnas, fila)) for fila in cursor]
+        for partida in partidas:
+            if isinstance(partida["jugadas"], bytes):
+                partida["jugadas"] = a_movetext(partida["jugadas"], partida["resultado"])
+        return partidas
+
+    def cerrar(self):
+        self.conexion.close()
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Base de datos local de partidas")
+    parser.add_argument("--base", default=RUTA_BASE, help="Archivo SQLite")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_ingerir = sub.add_parser("ingerir", help="Ingerir archivos PGN")
+    p_ingerir.add_argument("archivos", nargs="+")
+    p_ingerir.add_argument("--codificar", action="store_true",
+                           help="Pasar las jugadas a binario durante la ingesta (más lenta)")
+    sub.add_parser("compactar", help="Pasar a binario las jugadas guardadas como texto")
+    p_descargar = sub.add_parser("descargar", help="Descargar e ingerir partidas nuevas de Chess.com")
+    p_descargar.add_argument("usuario")
+    p_jugador = sub.add_parser("jugador", help="Consultar el historial de un jugador")
+    p_jugador.add_argument("nombre")
+    p_jugador.add_argument("--limite", type=int, default=20)
+    p_explorar = sub.add_parser("explorar", help="Jugadas y resultados desde una posición (FEN)")
+    p_explorar.add_argument("fen")
+    args = parser.parse_args()
+
+    base = BasePartidas(args.base, codificar=getattr(args, "codificar", False))
+    try:
+        if args.comando == "ingerir":
+            for archivo in args.archivos:
+                nuevas = base.ingerir_pgn(archivo)
+                print(f"{archivo}: {nuevas} partidas nuevas")
+        elif args.comando == "compactar":
+            print(f"{base.compactar()} partidas compactadas")
+        elif args.comando == "descargar":
+            from apis import DescargadorPartidas
+            nuevas = base.ingerir_chess_com(DescargadorPartidas().partidas_nuevas(args.usuario))
+            print(f"{args.usuario}: {nuevas} partidas nuevas")
+        elif args.comando == "jugador":
+            for p in base.partidas_de_jugador(args.nombre, limite=args.limite):
+                print(f"{p['fecha']}  {p['blancas']} - {p['negras']}  {p['resultado']}  {p['eco'] or ''}")
+        elif args.comando == "explorar":
+            for e in base.explorar(args.fen):
+                puntuacion = f"{e['puntuacion']:.0%}" if e["puntuacion"] is not None else "-"
+                print(f"{e['jugada']:6} {e['partidas']:8}  +{e['victorias_blancas']} ={e['tablas']} -{e['victorias_negras']}  {puntuacion}")
+        print(f"Total en la base: {base.contar()} partidas")
+    finally:
+        base.cerrar()
+
+
+if __name__ == "__main__":
+    main()
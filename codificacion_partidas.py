@@ -0,0 +1,135 @@
+"""Codificación binaria compacta de jugadas.
+
+Responsabilidades:
+- Representar cada jugada con una palabra de 16 bits (little-endian):
+  bits 0-5 casilla de origen, bits 6-11 casilla de destino y
+  bits 12-14 pieza de coronación (0 ninguna, 1 caballo, 2 alfil, 3 torre, 4 dama)
+- Convertir entre esa forma y los movimientos del tablero interno
+  ((x, y), (x, y)), la notación UCI y el texto SAN de un PGN
+- Decodificar sin reproducir la partida (no hace falta un tablero)
+
+Las casillas se numeran como en python-chess: a1 = 0, b1 = 1, ..., h8 = 63,
+es decir, casilla = y * 8 + x con y=0 en la fila 1.
+"""
+from typing import Optional, List, Tuple, Iterable
+from array import array
+import re
+import sys
+
+try:
+    import chess
+except Exception:
+    chess = None
+
+Movimiento = Tuple[Tuple[int, int], Tuple[int, int]]
+
+_LETRAS_CORONACION = " nbrq"
+_INVERTIR_BYTES = sys.byteorder == "big"
+
+# Comentarios, NAGs, números de jugada y resultados del texto PGN
+_PATRON_RUIDO = re.compile(r"\{[^}]*\}|;[^\n]*|\$\d+|\d+\.(\.\.)?|1-0|0-1|1/2-1/2|\*")
+
+
+def jugadas_san(movetext: str) -> List[str]:
+    """Extrae las jugadas SAN de la línea principal de un texto PGN."""
+    texto = _PATRON_RUIDO.sub(" ", movetext)
+    # Eliminar variantes (paréntesis, posiblemente anidados)
+    while "(" in texto:
+        nuevo = re.sub(r"\([^()]*\)", " ", texto)
+        if nuevo == texto:
+            break
+        texto = nuevo
+    return [t.rstrip("!?") for t in texto.split() if t.rstrip("!?")]
+
+
+def _a_bytes(palabras: array) -> bytes:
+    if _INVERTIR_BYTES:
+        palabras.byteswap()
+    return palabras.tobytes()
+
+
+def _desde_bytes(datos: bytes) -> array:
+    palabras = array("H")
+    palabras.frombytes(datos)
+    if _INVERTIR_BYTES:
+        palabras.byteswap()
+    return palabras
+
+
+def codificar_movimientos(movimientos: Iterable[Movimiento]) -> bytes:
+    """Codifica movimientos del tablero interno (`Tablero.historial_movimientos`)."""
+    return _a_bytes(array("H", ((y1 * 8 + x1) | (y2 * 8 + x2) << 6 for (x1, y1), (x2, y2) in movimientos)))
+
+
+def decodificar_movimientos(datos: bytes) -> List[Movimiento]:
+    """Inversa de `codificar_movimientos` (la coronación se descarta)."""
+    return [
+        ((p & 7, (p >> 3) & 7), ((p >> 6) & 7, (p >> 9) & 7))
+        for p in _desde_bytes(datos)
+    ]
+
+
+def codificar_uci(jugadas: Iterable[str]) -> bytes:
+    """Codifica jugadas UCI/LAN (e2e4, e7e8q)."""
+    palabras = array("H")
+    for uci in jugadas:
+        origen = (ord(uci[0]) - 97) + (ord(uci[1]) - 49) * 8
+        destino = (ord(uci[2]) - 97) + (ord(uci[3]) - 49) * 8
+        coronacion = _LETRAS_CORONACION.index(uci[4]) if len(uci) > 4 else 0
+        palabras.append(origen | destino << 6 | coronacion << 12)
+    return _a_bytes(palabras)
+
+
+def decodificar_uci(datos: bytes) -> List[str]:
+    """Inversa de `codificar_uci`."""
+    resultado = []
+    for p in _desde_bytes(datos):
+        origen, destino, coronacion = p & 63, (p >> 6) & 63, p >> 12
+        uci = chr(97 + (origen & 7)) + chr(49 + (origen >> 3)) + chr(97 + (destino & 7)) + chr(49 + (destino >> 3))
+        resultado.append(uci + _LETRAS_CORONACION[coronacion] if coronacion else uci)
+    return resultado
+
+
+def codificar_san(movetext: str, fen: Optional[str] = None) -> Optional[bytes]:
+    """Codifica el texto de jugadas de un PGN reproduciéndolo con python-chess.
+
+    Returns:
+        Los bytes codificados, o None si alguna jugada no es legal (variantes,
+        partidas corruptas) o python-chess no está disponible
+    """
+    if chess is None:
+        return None
+    board = chess.Board(fen) if fen else chess.Board()
+    palabras = array("H")
+    try:
+        for san in jugadas_san(movetext):
+            move = board.parse_san(san)
+            palabras.append(move.from_square | move.to_square << 6 | ((move.promotion or 1) - 1) << 12)
+            board.push(move)
+    except ValueError:
+        return None
+    return _a_bytes(palabras)
+
+
+def jugadas_chess(datos: bytes) -> List["chess.Move"]:
+    """Decodifica a objetos `chess.Move` (sin comprobar legalidad)."""
+    return [
+        chess.Move(p & 63, (p >> 6) & 63, (p >> 12) + 1 if p >> 12 else None)
+        for p in _desde_bytes(datos)
+    ]
+
+
+def a_movetext(datos: bytes, resultado: Optional[str] = None, fen: Optional[str] = None) -> str:
+    """Reconstruye el texto SAN de un PGN ("1. e4 e5 2. Nf3 ...")."""
+    board = chess.Board(fen) if fen else chess.Board()
+    partes: List[str] = []
+    for move in jugadas_chess(datos):
+        if board.turn == chess.WHITE:
+            partes.append(f"{board.fullmove_number}.")
+        elif not partes:
+            partes.append(f"{board.fullmove_number}...")
+        partes.append(board.san(move))
+        board.push(move)
+    if resultado:
+        partes.append(resultado)
+    return " ".join(partes)
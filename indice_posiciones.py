@@ -0,0 +1,197 @@
+"""Índice de posiciones sobre la base de partidas (explorador de aperturas).
+
+Responsabilidades:
+- Reproducir las partidas guardadas y registrar cada posición alcanzada
+  (clave Zobrist) con la partida, el ply y la jugada siguiente
+- Mantener estadísticas agregadas por (posición, jugada): número de partidas
+  y resultados, para responder en milisegundos sin recorrer las partidas
+- Indexar de forma incremental solo las partidas nuevas
+
+La clave de posición solo tiene en cuenta la colocación de las piezas y el
+turno (sin enroques ni peón al paso), de modo que coincide con la FEN que
+genera `reglas.tablero_a_fen`.
+"""
+from typing import Optional, Dict, List, Tuple, Iterator, Union
+import sqlite3
+
+try:
+    import chess
+    import chess.polyglot
+except Exception:
+    chess = None
+
+from codificacion_partidas import jugadas_san, jugadas_chess
+
+# Plies por partida que se indexan (suficiente para un explorador de aperturas)
+MAX_PLIES_INDICE = 60
+
+_hasher = chess.polyglot.ZobristHasher(chess.polyglot.POLYGLOT_RANDOM_ARRAY) if chess else None
+
+
+def clave_posicion(board) -> int:
+    """Clave Zobrist de colocación + turno, como entero con signo de 64 bits (SQLite)."""
+    clave = _hasher.hash_board(board) ^ _hasher.hash_turn(board)
+    return clave - (1 << 64) if clave >= (1 << 63) else clave
+
+
+def _puntos_resultado(resultado: Optional[str]) -> Tuple[int, int, int]:
+    """(victorias_blancas, tablas, victorias_negras) de un resultado PGN."""
+    if resultado == "1-0":
+        return 1, 0, 0
+    if resultado == "0-1":
+        return 0, 0, 1
+    if resultado == "1/2-1/2":
+        return 0, 1, 0
+    return 0, 0, 0
+
+
+class IndicePosiciones:
+    """Índice posición → (partida, ply, jugada) sobre la tabla `partidas`."""
+
+    def __init__(self, conexion: sqlite3.Connection, max_plies: Optional[int] = MAX_PLIES_INDICE):
+        """Crea las tablas del índice en la conexión dada.
+
+        Args:
+            conexion: Conexión SQLite que contiene la tabla `partidas`
+            max_plies: Plies indexados por partida (None para indexar la partida entera)
+        """
+        self.conexion = conexion
+        self.max_plies = max_plies
+        with self.conexion:
+            # WITHOUT ROWID: las filas quedan ordenadas por clave y una consulta
+            # es un único recorrido de rango
+            self.conexion.execute(
+                "CREATE TABLE IF NOT EXISTS posiciones ("
+                " clave INTEGER NOT NULL, partida_id INTEGER NOT NULL, ply INTEGER NOT NULL,"
+                " jugada TEXT,"
+                " PRIMARY KEY (clave, partida_id, ply)) WITHOUT ROWID"
+            )
+            self.conexion.execute(
+                "CREATE TABLE IF NOT EXISTS estadisticas_posicion ("
+                " clave INTEGER NOT NULL, jugada TEXT NOT NULL,"
+                " partidas INTEGER NOT NULL, victorias_blancas INTEGER NOT NULL,"
+                " tablas INTEGER NOT NULL, victorias_negras INTEGER NOT NULL,"
+                " PRIMARY KEY (clave, jugada)) WITHOUT ROWID"
+            )
+            self.conexion.execute(
+                "CREATE TABLE IF NOT EXISTS meta_indice (clave TEXT PRIMARY KEY, valor INTEGER)"
+            )
+
+    def ultimo_indexado(self) -> int:
+        fila = self.conexion.execute("SELECT valor FROM meta_indice WHERE clave = 'ultimo_id'").fetchone()
+        return fila[0] if fila else 0
+
+    @staticmethod
+    def _jugadas(jugadas: Union[bytes, str], board) -> Iterator:
+        """Jugadas de la partida: decodificación directa si está en binario, SAN si es texto.
+
+        Una jugada de texto ilegal o ilegible lanza ValueError.
+        """
+        if isinstance(jugadas, bytes):
+            yield from jugadas_chess(jugadas)
+            return
+        for san in jugadas_san(jugadas):
+            yield board.parse_san(san)
+
+    def _recorrer(self, jugadas: Union[bytes, str]) -> Iterator[Tuple[int, int, Optional[str]]]:
+        """(clave, ply, jugada_uci_siguiente) de cada posición de la partida.
+
+        Cada posición se da solo después de interpretar la jugada que sale de
+        ella: una partida ilegible desde la primera jugada no aporta nada y una
+        que falla más adelante se corta ahí, sin posición final.
+        """
+        board = chess.Board()
+        ply = 0
+        try:
+            for move in self._jugadas(jugadas, board):
+                if self.max_plies is not None and ply >= self.max_plies:
+                    return
+                yield clave_posicion(board), ply, move.uci()
+                board.push(move)
+                ply += 1
+        except ValueError:
+            return
+        if self.max_plies is None or ply < self.max_plies:
+            # Posición final (sin jugada siguiente)
+            yield clave_posicion(board), ply, None
+
+    def indexar_pendientes(self, tamano_lote: int = 2000) -> int:
+        """Indexa las partidas con id mayor que el último indexado; devuelve cuántas."""
+        if chess is None:
+            return 0
+        ultimo = self.ultimo_indexado()
+        total = 0
+        while True:
+            filas = self.conexion.execute(
+                "SELECT id, resultado, jugadas, fen FROM partidas WHERE id > ? ORDER BY id LIMIT ?",
+                (ultimo, tamano_lote),
+            ).fetchall()
+            if not filas:
+                return total
+            posiciones: List[Tuple] = []
+            agregados: Dict[Tuple[int, str], List[int]] = {}
+            for partida_id, resultado, jugadas, fen in filas:
+                ultimo = partida_id
+                if fen:
+                    # Empieza desde otra posición: las claves se calculan desde la inicial
+                    continue
+                blancas, tablas, negras = _puntos_resultado(resultado)
+                for clave, ply, jugada in self._recorrer(jugadas or ""):
+                    posiciones.append((clave, partida_id, ply, jugada))
+                    if jugada is None:
+                        continue
+                    acumulado = agregados.setdefault((clave, jugada), [0, 0, 0, 0])
+                    acumulado[0] += 1
+                    acumulado[1] += blancas
+                    acumulado[2] += tablas
+                    acumulado[3] += negras
+            with self.conexion:
+                self.conexion.executemany("INSERT OR IGNORE INTO posiciones VALUES (?, ?, ?, ?)", posiciones)
+                self.conexion.executemany(
+                    "INSERT INTO estadisticas_posicion VALUES (?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (clave, jugada) DO UPDATE SET"
+                    " partidas = partidas + excluded.partidas,"
+                    " victorias_blancas = victorias_blancas + excluded.victorias_blancas,"
+                    " tablas = tablas + excluded.tablas,"
+                    " victorias_negras = victorias_negras + excluded.victorias_negras",
+                    [(c, j, *v) for (c, j), v in agregados.items()],
+                )
+                self.conexion.execute(
+                    "INSERT OR REPLACE INTO meta_indice VALUES ('ultimo_id', ?)", (ultimo,)
+                )
+            total += len(filas)
+
+    def estadisticas(self, fen: str) -> List[Dict]:
+        """Jugadas jugadas desde la posición, con frecuencia y resultados.
+
+        Returns:
+            Lista ordenada por frecuencia de dicts con 'jugada' (UCI),
+            'partidas', 'victorias_blancas', 'tablas', 'victorias_negras' y
+            'puntuacion' (puntos del bando que mueve, 0..1)
+        """
+        board = chess.Board(fen)
+        filas = self.conexion.execute(
+            "SELECT jugada, partidas, victorias_blancas, tablas, victorias_negras"
+            " FROM estadisticas_posicion WHERE clave = ? ORDER BY partidas DESC",
+            (clave_posicion(board),),
+        ).fetchall()
+        resultado = []
+        for jugada, partidas, blancas, tablas, negras in filas:
+            propias = blancas if board.turn == chess.WHITE else negras
+            decididas = blancas + tablas + negras
+            resultado.append({
+                "jugada": jugada,
+                "partidas": partidas,
+                "victorias_blancas": blancas,
+                "tablas": tablas,
+                "victorias_negras": negras,
+                "puntuacion": (propias + tablas / 2) / decididas if decididas else None,
+            })
+        return resultado
+
+    def partidas_con_posicion(self, fen: str, limite: int = 50) -> List[Tuple[int, int, Optional[str]]]:
+        """(partida_id, ply, jugada_siguiente) de las partidas que alcanzaron la posición."""
+        return self.conexion.execute(
+            "SELECT partida_id, ply, jugada FROM posiciones WHERE clave = ? LIMIT ?",
+            (clave_posicion(chess.Board(fen)), limite),
+        ).fetchall()
@@ -1,28 +1,583 @@
 """Módulo de red para juego en red.
 
 Responsabilidades:
+- BucleRed: un único bucle de eventos (selectors) por proceso que atiende
+  todos los sockets (juego, descubrimiento y anuncios) sin esperas periódicas
 - ServidorAjedrez: escucha conexiones y maneja comunicación como anfitrión
 - ClienteAjedrez: conecta al servidor remoto y sincroniza movimientos
-- Descubrimiento automático: broadcast UDP para encontrar servidores en la LAN
-- Protocolo de mensajes simple basado en JSON para enviar movimientos
+- Descubrimiento automático: anuncios multicast UDP con cadencia adaptativa
+  y consultas, escuchados en segundo plano con una tabla que caduca
+- Protocolo de tramas con prefijo de longitud: movimientos en binario
+  compacto y el resto de mensajes en JSON
+- Latencia (ping/pong con RTT suavizado) y reloj de partida con el
+  servidor como autoridad
+- Reconexión: jugadas con número de secuencia y reenvío de las que faltan
 """
 import socket
+import selectors
+import errno
+import heapq
+import itertools
 import json
+import secrets
+import struct
 import threading
 import time
-from typing import Optional, Tuple, Callable, List, Dict
+from collections import deque
+from typing import Optional, Tuple, Callable, List, Dict, Deque
 from modelos import Color
 
 # Constantes para descubrimiento automático
 PUERTO_BROADCAST = 8888  # Puerto UDP para anuncios de servidor
+PUERTO_CONSULTA = 8889   # Puerto UDP en el que los servidores atienden consultas
 PUERTO_JUEGO = 8880      # Puerto TCP para juego
+GRUPO_MULTICAST = "239.255.88.88"  # Grupo de anuncios (ámbito local de la organización)
 MENSAJE_ANUNCIO = "AJEDREZ_SERVER"
+INTERVALO_ANUNCIO_MINIMO = 0.5   # Segundos entre anuncios al arrancar o tras un cambio
+INTERVALO_ANUNCIO_MAXIMO = 5.0   # Segundos entre anuncios cuando nada cambia
+CADUCIDAD_SERVIDOR = 3 * INTERVALO_ANUNCIO_MAXIMO + 1.0  # Segundos sin anuncios tras los que se olvida un servidor
+PLAZO_RESPUESTA_CONSULTA = 1.0   # Segundos para responder a una consulta
+CONSULTAS_SIN_RESPUESTA = 3      # Consultas seguidas sin respuesta tras las que se olvida un servidor
+
+# Tramas: longitud (u32) + tipo (u8) + datos. La longitud incluye el tipo.
+# Todos los enteros van en orden de red (big-endian, "!" en struct).
+TRAMA_JSON = 0          # Datos: objeto JSON en UTF-8
+# Datos: palabra u16 big-endian (origen | destino << 6, casilla = y * 8 + x). Los bits
+# coinciden con codificacion_partidas, pero allí la palabra se guarda en little-endian
+TRAMA_MOVIMIENTO = 1
+TRAMA_MOVIMIENTO_SEC = 2  # Datos: número de secuencia (u32) + palabra u16, ambos big-endian
+_CABECERA = struct.Struct("!IB")
+_TRAMA_MOVIMIENTO = struct.Struct("!IBH")
+_TRAMA_MOVIMIENTO_SEC = struct.Struct("!IBIH")
+LONGITUD_MAXIMA_TRAMA = 1 << 20
+TAMANO_BUFER_ENTRADA = 65536
+
+# Latencia y reloj
+INTERVALO_PING = 2.0         # Segundos entre pings
+TIEMPO_INICIAL = 5 * 60      # Segundos por jugador
+COMPENSACION_MAXIMA = 0.5    # Segundos de latencia que se descuentan como máximo por jugada
+
+# Reconexión
+PLAZO_RECONEXION = 60.0      # Segundos que se mantiene la partida con el rival caído
+INTERVALO_RECONEXION = 0.5   # Segundos entre intentos del cliente
+PLAZO_PRESENTACION = 5.0     # Segundos para que una conexión nueva envíe "reanudar"
+
+
+class BucleRed:
+    """Bucle de eventos basado en `selectors` que atiende todos los sockets del proceso.
+
+    Se ejecuta en un único hilo en segundo plano. `select` solo vuelve cuando
+    hay datos, cuando vence un temporizador o cuando otro hilo encarga
+    trabajo (a través de un socketpair despertador), así que en reposo no
+    consume CPU. Los callbacks de los sockets se ejecutan en el hilo del bucle.
+    """
+
+    def __init__(self):
+        self.selector = selectors.DefaultSelector()
+        self._pendientes: Deque[Tuple[Callable, tuple]] = deque()
+        # Montículo de [instante, contador, callback, activo]
+        self._temporizadores: List[list] = []
+        self._contador = itertools.count()
+        self._hilo: Optional[threading.Thread] = None
+        self._cerrojo = threading.Lock()
+        self._despertador_lectura, self._despertador_escritura = socket.socketpair()
+        self._despertador_lectura.setblocking(False)
+        self._despertador_escritura.setblocking(False)
+        self.selector.register(self._despertador_lectura, selectors.EVENT_READ, self._vaciar_despertador)
+
+    def iniciar(self):
+        """Arranca el hilo del bucle si aún no está en marcha."""
+        with self._cerrojo:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._ejecutar, name="bucle-red", daemon=True)
+                self._hilo.start()
+
+    def en_bucle(self) -> bool:
+        return threading.current_thread() is self._hilo
+
+    def llamar(self, funcion: Callable, *args):
+        """Ejecuta funcion(*args) en el hilo del bucle (directamente si ya se está en él)."""
+        if self.en_bucle():
+            funcion(*args)
+            return
+        self.iniciar()
+        self._pendientes.append((funcion, args))
+        try:
+            self._despertador_escritura.send(b"\0")
+        except OSError:
+            # Búfer lleno: el bucle ya tiene un despertar pendiente
+            pass
+
+    def registrar(self, sock: socket.socket, eventos: int, callback: Callable):
+        """Vigila `sock`; `callback(sock, mascara)` se llama en el hilo del bucle."""
+        self.llamar(self._registrar, sock, eventos, callback)
+
+    def desregistrar(self, sock: socket.socket, cerrar: bool = False):
+        """Deja de vigilar `sock` y, opcionalmente, lo cierra (desde el hilo del bucle)."""
+        self.llamar(self._desregistrar, sock, cerrar)
+
+    def programar(self, retraso: float, callback: Callable) -> list:
+        """Ejecuta `callback()` dentro de `retraso` segundos; devuelve un identificador cancelable."""
+        entrada = [time.monotonic() + retraso, next(self._contador), callback, True]
+        self.llamar(heapq.heappush, self._temporizadores, entrada)
+        return entrada
+
+    @staticmethod
+    def cancelar(entrada: Optional[list]):
+        if entrada:
+            entrada[3] = False
+
+    def _registrar(self, sock, eventos, callback):
+        if sock.fileno() < 0:
+            return
+        try:
+            self.selector.modify(sock, eventos, callback)
+        except KeyError:
+            self.selector.register(sock, eventos, callback)
+
+    def _desregistrar(self, sock, cerrar):
+        try:
+            self.selector.unregister(sock)
+        except (KeyError, ValueError):
+            pass
+        if cerrar:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def _vaciar_despertador(self, sock, mascara):
+        try:
+            while sock.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    @staticmethod
+    def _proteger(funcion: Callable, *args):
+        try:
+            funcion(*args)
+        except Exception as e:
+            print(f"Error en el bucle de red: {e}")
+
+    def _ejecutar(self):
+        while True:
+            while self._pendientes:
+                funcion, args = self._pendientes.popleft()
+                self._proteger(funcion, *args)
+            while self._temporizadores and not self._temporizadores[0][3]:
+                heapq.heappop(self._temporizadores)
+            # Sin temporizadores, select espera indefinidamente
+            espera = None
+            if self._temporizadores:
+                espera = max(0.0, self._temporizadores[0][0] - time.monotonic())
+            for clave, mascara in self.selector.select(espera):
+                self._proteger(clave.data, clave.fileobj, mascara)
+            ahora = time.monotonic()
+            while self._temporizadores and self._temporizadores[0][0] <= ahora:
+                entrada = heapq.heappop(self._temporizadores)
+                if entrada[3]:
+                    self._proteger(entrada[2])
+
+
+# Bucle compartido por todos los sockets del proceso
+bucle_red = BucleRed()
+
+
+class Conexion:
+    """Conexión TCP no bloqueante atendida por el bucle de red.
+
+    Cada mensaje viaja en una trama con prefijo de longitud. Los movimientos
+    ({"tipo": "movimiento", "origen", "destino"}) ocupan 7 bytes en binario
+    (11 con número de secuencia, "sec"), con los enteros en big-endian;
+    cualquier otro mensaje va como JSON. La entrada se lee con `recv_into` en
+    un `bytearray` reutilizable y se analiza con `memoryview`, sin copias
+    salvo para los datos JSON.
+
+    Se puede enviar desde cualquier hilo: se intenta escribir de inmediato y
+    lo que no cabe en el búfer del sistema se agrupa y se envía cuando el
+    socket vuelve a admitir datos.
+    """
+
+    def __init__(self, sock: socket.socket, al_recibir: Callable[[Dict], None],
+                 al_cerrar: Optional[Callable[[], None]] = None, bucle: Optional[BucleRed] = None):
+        """Registra el socket en el bucle.
+
+        Args:
+            sock: Socket TCP ya conectado
+            al_recibir: Función llamada con cada mensaje recibido (en el hilo del bucle)
+            al_cerrar: Función llamada una vez cuando la conexión se cierra
+            bucle: Bucle de red (por defecto, el compartido del proceso)
+        """
+        self.sock = sock
+        self.al_recibir = al_recibir
+        self.al_cerrar = al_cerrar
+        self.bucle = bucle or bucle_red
+        self.abierta = True
+        # Datos válidos de la entrada: self._entrada[self._inicio:self._fin]
+        self._entrada = bytearray(TAMANO_BUFER_ENTRADA)
+        self._inicio = 0
+        self._fin = 0
+        self._salida = bytearray()
+        self._cerrojo = threading.Lock()
+        sock.setblocking(False)
+        # Mensajes pequeños e interactivos: no esperar a agrupar (algoritmo de Nagle)
+        if sock.family in (socket.AF_INET, socket.AF_INET6):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.bucle.registrar(sock, selectors.EVENT_READ, self._al_evento)
+
+    def _al_evento(self, sock, mascara):
+        if mascara & selectors.EVENT_READ:
+            self._leer()
+        if mascara & selectors.EVENT_WRITE and self.abierta:
+            self._vaciar_salida()
+
+    def _leer(self):
+        if self._fin == len(self._entrada):
+            self._compactar()
+        try:
+            leidos = self.sock.recv_into(memoryview(self._entrada)[self._fin:])
+        except BlockingIOError:
+            return
+        except ConnectionResetError:
+            # El otro extremo cerró con datos sin leer: es una desconexión normal
+            leidos = 0
+        except OSError as e:
+            print(f"Error en escucha: {e}")
+            self.cerrar()
+            return
+        if not leidos:
+            self.cerrar()
+            return
+        self._fin += leidos
+        self._procesar_tramas()
+
+    def _compactar(self, necesario: int = 0):
+        """Mueve la trama incompleta al principio del búfer y lo amplía si no cabe."""
+        pendiente = self._fin - self._inicio
+        if necesario > len(self._entrada):
+            nuevo = bytearray(max(necesario, len(self._entrada) * 2))
+            nuevo[:pendiente] = self._entrada[self._inicio:self._fin]
+            self._entrada = nuevo
+        elif self._inicio:
+            self._entrada[:pendiente] = self._entrada[self._inicio:self._fin]
+        else:
+            # Búfer lleno con una sola trama incompleta
+            self._entrada.extend(bytes(len(self._entrada)))
+        self._inicio, self._fin = 0, pendiente
+
+    def _procesar_tramas(self):
+        vista = memoryview(self._entrada)
+        try:
+            while self._fin - self._inicio >= _CABECERA.size:
+                longitud, tipo = _CABECERA.unpack_from(vista, self._inicio)
+                if longitud < 1 or longitud > LONGITUD_MAXIMA_TRAMA:
+                    print(f"Trama inválida de {longitud} bytes: se cierra la conexión")
+                    self.cerrar()
+                    return
+                fin_trama = self._inicio + 4 + longitud
+                if fin_trama > self._fin:
+                    if fin_trama > len(self._entrada):
+                        vista.release()
+                        self._compactar(4 + longitud)
+                        vista = memoryview(self._entrada)
+                    break
+                with vista[self._inicio + _CABECERA.size:fin_trama] as datos:
+                    mensaje = self._decodificar(tipo, datos)
+                self._inicio = fin_trama
+                if mensaje is not None:
+                    self.al_recibir(mensaje)
+        finally:
+            vista.release()
+        if self._inicio == self._fin:
+            self._inicio = self._fin = 0
+
+    @staticmethod
+    def _decodificar(tipo: int, datos: memoryview) -> Optional[Dict]:
+        if tipo == TRAMA_MOVIMIENTO and len(datos) == 2:
+            p = (datos[0] << 8) | datos[1]
+            return {
+                'tipo': 'movimiento',
+                'origen': (p & 7, (p >> 3) & 7),
+                'destino': ((p >> 6) & 7, (p >> 9) & 7),
+            }
+        if tipo == TRAMA_MOVIMIENTO_SEC and len(datos) == 6:
+            p = (datos[4] << 8) | datos[5]
+            return {
+                'tipo': 'movimiento',
+                'origen': (p & 7, (p >> 3) & 7),
+                'destino': ((p >> 6) & 7, (p >> 9) & 7),
+                'sec': int.from_bytes(datos[:4], 'big'),
+            }
+        if tipo == TRAMA_JSON:
+            try:
+                return json.loads(bytes(datos))
+            except ValueError as e:
+                print(f"Error al procesar mensaje: {e}")
+                return None
+        print(f"Tipo de trama desconocido: {tipo}")
+        return None
+
+    @staticmethod
+    def codificar(mensaje: Dict) -> bytes:
+        """Trama lista para enviar (se puede reutilizar para varios destinatarios)."""
+        if mensaje.get('tipo') == 'movimiento' and (len(mensaje) == 3 or (len(mensaje) == 4 and 'sec' in mensaje)):
+            (x1, y1), (x2, y2) = mensaje['origen'], mensaje['destino']
+            p = (y1 * 8 + x1) | (y2 * 8 + x2) << 6
+            if 'sec' in mensaje:
+                return _TRAMA_MOVIMIENTO_SEC.pack(7, TRAMA_MOVIMIENTO_SEC, mensaje['sec'], p)
+            return _TRAMA_MOVIMIENTO.pack(3, TRAMA_MOVIMIENTO, p)
+        datos = json.dumps(mensaje, separators=(',', ':')).encode('utf-8')
+        return _CABECERA.pack(len(datos) + 1, TRAMA_JSON) + datos
+
+    def enviar(self, mensaje: Dict) -> bool:
+        """Envía un mensaje; devuelve False si la conexión está cerrada."""
+        return self.enviar_bytes(self.codificar(mensaje))
+
+    def enviar_lote(self, mensajes: List[Dict]) -> bool:
+        """Envía varios mensajes con una sola escritura."""
+        return self.enviar_bytes(b"".join(self.codificar(m) for m in mensajes))
+
+    def enviar_bytes(self, datos: bytes) -> bool:
+        """Envía tramas ya codificadas."""
+        with self._cerrojo:
+            if not self.abierta:
+                return False
+            if not self._salida:
+                try:
+                    enviados = self.sock.send(datos)
+                except BlockingIOError:
+                    enviados = 0
+                except OSError as e:
+                    print(f"Error al enviar: {e}")
+                    self.bucle.llamar(self.cerrar)
+                    return False
+                if enviados == len(datos):
+                    return True
+                datos = memoryview(datos)[enviados:]
+            # Lo que no se pudo enviar se agrupa con lo siguiente
+            self._salida += datos
+        self.bucle.registrar(self.sock, selectors.EVENT_READ | selectors.EVENT_WRITE, self._al_evento)
+        return True
+
+    def pendiente(self) -> int:
+        """Bytes encolados a la espera de que el socket admita más datos."""
+        return len(self._salida)
+
+    def _vaciar_salida(self):
+        with self._cerrojo:
+            try:
+                enviados = self.sock.send(self._salida)
+            except BlockingIOError:
+                return
+            except OSError as e:
+                print(f"Error al enviar: {e}")
+                enviados = -1
+            if enviados >= 0:
+                del self._salida[:enviados]
+            pendiente = bool(self._salida)
+        if enviados < 0:
+            self.cerrar()
+        elif not pendiente:
+            self.bucle.registrar(self.sock, selectors.EVENT_READ, self._al_evento)
+
+    def cerrar(self):
+        """Cierra la conexión (idempotente) y avisa con `al_cerrar`."""
+        with self._cerrojo:
+            if not self.abierta:
+                return
+            self.abierta = False
+        self.bucle.desregistrar(self.sock, cerrar=True)
+        if self.al_cerrar:
+            self.al_cerrar()
+
+
+class MedidorLatencia:
+    """Mide el tiempo de ida y vuelta (RTT) de una conexión con ping/pong.
+
+    Cada INTERVALO_PING segundos envía {"tipo": "ping", "t": ms} y el otro
+    extremo responde con {"tipo": "pong", "t": ms} (el mismo valor). Las
+    muestras se suavizan como en TCP (RFC 6298): media móvil exponencial
+    del RTT (1/8) y de su variación (1/4).
+    """
+
+    def __init__(self, bucle: Optional[BucleRed] = None):
+        self.bucle = bucle or bucle_red
+        self.conexion: Optional[Conexion] = None
+        self.rtt: Optional[float] = None        # Segundos (suavizado)
+        self.variacion: float = 0.0
+        self.ultima_respuesta: Optional[float] = None
+        self._temporizador: Optional[list] = None
+
+    def iniciar(self, conexion: Conexion):
+        """Empieza a enviar pings por `conexion`."""
+        self.conexion = conexion
+        self._temporizador = self.bucle.programar(0, self._enviar_ping)
+
+    def detener(self):
+        BucleRed.cancelar(self._temporizador)
+        self._temporizador = None
+        self.conexion = None
+
+    def _enviar_ping(self):
+        if not self.conexion or not self.conexion.abierta:
+            return
+        self.conexion.enviar({'tipo': 'ping', 't': time.monotonic() * 1000.0})
+        self._temporizador = self.bucle.programar(INTERVALO_PING, self._enviar_ping)
+
+    def procesar(self, mensaje: Dict) -> bool:
+        """Atiende ping y pong; devuelve True si el mensaje era de latencia."""
+        tipo = mensaje.get('tipo')
+        if tipo == 'ping':
+            if self.conexion:
+                self.conexion.enviar({'tipo': 'pong', 't': mensaje.get('t')})
+            return True
+        if tipo == 'pong':
+            try:
+                muestra = time.monotonic() - float(mensaje['t']) / 1000.0
+            except (KeyError, TypeError, ValueError):
+                return True
+            if muestra >= 0:
+                self.registrar(muestra)
+            return True
+        return False
+
+    def registrar(self, muestra: float):
+        """Incorpora una muestra de RTT en segundos."""
+        self.ultima_respuesta = time.monotonic()
+        if self.rtt is None:
+            self.rtt = muestra
+            self.variacion = muestra / 2
+        else:
+            self.variacion = 0.75 * self.variacion + 0.25 * abs(self.rtt - muestra)
+            self.rtt = 0.875 * self.rtt + 0.125 * muestra
+
+    def retardo(self) -> float:
+        """Retardo estimado de un sentido (RTT/2), en segundos."""
+        return self.rtt / 2 if self.rtt is not None else 0.0
+
+    def calidad(self) -> str:
+        if self.ultima_respuesta is None:
+            return "midiendo"
+        if time.monotonic() - self.ultima_respuesta > 3 * INTERVALO_PING:
+            return "perdida"
+        if self.rtt < 0.05 and self.variacion < 0.02:
+            return "buena"
+        if self.rtt < 0.15:
+            return "regular"
+        return "mala"
+
+    def resumen(self) -> str:
+        """Texto breve para la interfaz, p. ej. "Red: 12 ms (buena)"."""
+        if self.rtt is None:
+            return "Red: midiendo"
+        return f"Red: {self.rtt * 1000:.0f} ms ({self.calidad()})"
+
+
+class RelojPartida:
+    """Reloj de ajedrez de dos jugadores basado en `time.monotonic`.
+
+    En el servidor es la referencia de la partida: descuenta el tiempo de
+    cada jugada al recibirla (compensando la latencia del rival) y decide
+    cuándo cae la bandera. En el cliente es una réplica que se corrige con
+    cada mensaje {"tipo": "reloj"} del servidor, así que no acumula deriva.
+    """
+
+    def __init__(self, tiempo_inicial: float = TIEMPO_INICIAL):
+        self._cerrojo = threading.Lock()
+        self.tiempos: Dict[Color, float] = {Color.BLANCO: float(tiempo_inicial), Color.NEGRO: float(tiempo_inicial)}
+        self.turno = Color.BLANCO
+        self.ply = 0
+        self.inicio_partida: Optional[float] = None
+        self._inicio_turno: Optional[float] = None  # None: reloj parado
+
+    def iniciar(self, ahora: Optional[float] = None):
+        with self._cerrojo:
+            ahora = time.monotonic() if ahora is None else ahora
+            self.inicio_partida = ahora
+            self._inicio_turno = ahora
+
+    @property
+    def corriendo(self) -> bool:
+        return self._inicio_turno is not None
+
+    def detener(self):
+        """Congela los tiempos actuales (fin de partida)."""
+        with self._cerrojo:
+            if self._inicio_turno is not None:
+                self.tiempos[self.turno] = self._restante(self.turno, time.monotonic())
+            self._inicio_turno = None
+
+    def _restante(self, color: Color, ahora: float) -> float:
+        if color != self.turno or self._inicio_turno is None:
+            return self.tiempos[color]
+        return max(0.0, self.tiempos[color] - max(0.0, ahora - self._inicio_turno))
+
+    def restante(self, color: Color, ahora: Optional[float] = None) -> float:
+        with self._cerrojo:
+            return self._restante(color, time.monotonic() if ahora is None else ahora)
+
+    def restantes(self) -> Dict[Color, float]:
+        ahora = time.monotonic()
+        with self._cerrojo:
+            return {color: self._restante(color, ahora) for color in self.tiempos}
+
+    def registrar_jugada(self, color: Color, ahora: Optional[float] = None, compensacion: float = 0.0) -> bool:
+        """Descuenta el tiempo de la jugada de `color` y pasa el turno.
+
+        Args:
+            color: Jugador que ha movido
+            ahora: Instante de llegada de la jugada (por defecto, ahora)
+            compensacion: Segundos de red que no se cobran al jugador
+
+        Returns:
+            False si no era el turno de `color` o el reloj está parado
+        """
+        with self._cerrojo:
+            if color != self.turno or self._inicio_turno is None:
+                return False
+            ahora = time.monotonic() if ahora is None else ahora
+            self.tiempos[color] = self._restante(color, ahora - compensacion)
+            self.turno = Color.NEGRO if color == Color.BLANCO else Color.BLANCO
+            self.ply += 1
+            self._inicio_turno = ahora
+            return True
+
+    def a_mensaje(self) -> Dict:
+        """Estado actual como mensaje {"tipo": "reloj"} con la marca de tiempo del servidor."""
+        ahora = time.monotonic()
+        with self._cerrojo:
+            return {
+                'tipo': 'reloj',
+                'blancas': self._restante(Color.BLANCO, ahora),
+                'negras': self._restante(Color.NEGRO, ahora),
+                'turno': self.turno.value,
+                'ply': self.ply,
+                'corriendo': self._inicio_turno is not None,
+                't': (ahora - self.inicio_partida) * 1000.0 if self.inicio_partida is not None else 0.0,
+            }
+
+    def sincronizar(self, mensaje: Dict, retardo: float = 0.0):
+        """Ajusta la réplica al mensaje del servidor, enviado hace `retardo` segundos."""
+        ahora = time.monotonic()
+        with self._cerrojo:
+            self.tiempos[Color.BLANCO] = float(mensaje['blancas'])
+            self.tiempos[Color.NEGRO] = float(mensaje['negras'])
+            self.turno = Color(mensaje['turno'])
+            self.ply = int(mensaje.get('ply', self.ply))
+            self._inicio_turno = ahora - retardo if mensaje.get('corriendo', True) else None
+            if self.inicio_partida is None:
+                self.inicio_partida = ahora - retardo - float(mensaje.get('t', 0.0)) / 1000.0
+
 
 class ServidorAjedrez:
     """Servidor que escucha conexiones para partidas LAN.
     
     El servidor actúa como el jugador de piezas blancas y envía/recibe
-    movimientos al cliente conectado.
+    movimientos al cliente conectado. Guarda el registro numerado de
+    jugadas de la partida: si el cliente pierde la conexión, la partida
+    sigue en pie durante PLAZO_RECONEXION segundos y, al volver, el cliente
+    recibe solo las jugadas que le faltan.
     """
     
     def __init__(self, puerto: int = PUERTO_JUEGO):
@@ -35,14 +590,35 @@ class ServidorAjedrez:
         self.socket_servidor: Optional[socket.socket] = None
         self.socket_cliente: Optional[socket.socket] = None
         self.direccion_cliente: Optional[Tuple[str, int]] = None
+        self.conexion: Optional[Conexion] = None
         self.conectado = False
-        self.hilo_escucha: Optional[threading.Thread] = None
+        # True desde que llega el cliente hasta que la partida se da por perdida o se cierra
+        self.en_partida = False
         self.callback_movimiento: Optional[Callable] = None
-        self._ejecutando = False
+        self.callback_desconexion: Optional[Callable] = None
+        self.callback_reconexion: Optional[Callable] = None
+        self.callback_tiempo: Optional[Callable] = None
+        # El servidor juega siempre con blancas
+        self.color = Color.BLANCO
+        self._evento_conexion = threading.Event()
         self.anunciador: Optional[AnunciadorServidor] = None
+        # El servidor es la autoridad del reloj de la partida
+        self.latencia = MedidorLatencia()
+        self.reloj = RelojPartida()
+        self._vigilancia: Optional[list] = None
+        self.bandera: Optional[Color] = None
+        # Registro de jugadas: la jugada i lleva el número de secuencia i + 1
+        self.jugadas: List[Tuple[Tuple[int, int], Tuple[int, int]]] = []
+        self.id_partida = secrets.token_hex(8)
+        self._plazo_reconexion: Optional[list] = None
+        # Conexiones que aún no han enviado "reanudar" y su temporizador de cierre
+        self._candidatas: Dict[Conexion, list] = {}
         
     def iniciar(self) -> bool:
         """Inicia el servidor y comienza a escuchar conexiones.
+
+        Las conexiones se aceptan en el bucle de red; `conectado` pasa a True
+        en cuanto llega el cliente.
         
         Returns:
             True si se inició correctamente, False en caso de error
@@ -53,11 +629,12 @@ class ServidorAjedrez:
             self.socket_servidor.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self.socket_servidor.bind(('0.0.0.0', self.puerto))
             self.socket_servidor.listen(1)
-            self.socket_servidor.settimeout(1.0)  # Timeout para poder cerrar limpiamente
+            self.socket_servidor.setblocking(False)
+            bucle_red.registrar(self.socket_servidor, selectors.EVENT_READ, self._aceptar)
             
             # Obtener IP local y iniciar anunciador
             ip_local = obtener_ip_local()
-            self.anunciador = AnunciadorServidor(ip_local, self.puerto)
+            self.anunciador = AnunciadorServidor(ip_local, self.puerto, lambda: {'libre': not self.en_partida})
             self.anunciador.iniciar_anuncios()
             
             print(f"Servidor iniciado en {ip_local}:{self.puerto}")
@@ -66,6 +643,130 @@ class ServidorAjedrez:
         except Exception as e:
             print(f"Error al iniciar servidor: {e}")
             return False
+
+    def _aceptar(self, sock, mascara):
+        """Acepta al cliente (en el hilo del bucle); rechaza conexiones adicionales.
+        
+        Con la partida en marcha y el cliente caído, la nueva conexión solo se
+        admite si se presenta con un mensaje "reanudar" válido antes de
+        PLAZO_PRESENTACION segundos.
+        """
+        try:
+            cliente, direccion = sock.accept()
+        except BlockingIOError:
+            return
+        if self.conectado:
+            cliente.close()
+            return
+        if self.en_partida:
+            candidata = Conexion(cliente, None, None)
+            candidata.al_recibir = lambda datos, c=candidata: self._procesar_reanudacion(c, datos)
+            candidata.al_cerrar = lambda c=candidata: BucleRed.cancelar(self._candidatas.pop(c, None))
+            # Quien conecta y no dice nada (escaneo de puertos, conexión a medias) no se queda registrado
+            self._candidatas[candidata] = bucle_red.programar(PLAZO_PRESENTACION, candidata.cerrar)
+            return
+        self.socket_cliente, self.direccion_cliente = cliente, direccion
+        self.conexion = Conexion(cliente, self._procesar_mensaje, self._al_desconectar)
+        self.conectado = True
+        self.en_partida = True
+        print(f"Cliente conectado desde {direccion}")
+        if self.anunciador:
+            self.anunciador.actualizar()
+        self.latencia.iniciar(self.conexion)
+        self.reloj.iniciar()
+        self.conexion.enviar_lote([
+            {'tipo': 'bienvenida', 'partida': self.id_partida, 'color': Color.NEGRO.value},
+            self.reloj.a_mensaje(),
+        ])
+        self._vigilar_tiempo()
+        self._evento_conexion.set()
+    
+    def _procesar_reanudacion(self, conexion: Conexion, datos: Dict):
+        """Primer mensaje de una conexión entrante durante el plazo de reconexión."""
+        BucleRed.cancelar(self._candidatas.pop(conexion, None))
+        if (self.conectado or not self.en_partida or datos.get('tipo') != 'reanudar'
+                or datos.get('partida') != self.id_partida):
+            conexion.cerrar()
+            return
+        try:
+            visto = max(0, min(int(datos.get('sec', 0)), len(self.jugadas)))
+        except (TypeError, ValueError):
+            conexion.cerrar()
+            return
+        BucleRed.cancelar(self._plazo_reconexion)
+        conexion.al_recibir = self._procesar_mensaje
+        conexion.al_cerrar = self._al_desconectar
+        self.conexion = conexion
+        self.socket_cliente = conexion.sock
+        self.conectado = True
+        print(f"Cliente reconectado: se reenvían {len(self.jugadas) - visto} jugadas")
+        # Todo en una escritura: último número de secuencia del servidor,
+        # jugadas que faltan al cliente y reloj actual
+        mensajes = [{'tipo': 'reanudado', 'sec': len(self.jugadas)}]
+        mensajes += [self._mensaje_jugada(i) for i in range(visto, len(self.jugadas))]
+        mensajes.append(self.reloj.a_mensaje())
+        if self.bandera is not None:
+            mensajes.append({'tipo': 'tiempo_agotado', 'color': self.bandera.value})
+        conexion.enviar_lote(mensajes)
+        self.latencia.iniciar(conexion)
+        if self.callback_reconexion:
+            self.callback_reconexion()
+    
+    def _mensaje_jugada(self, indice: int) -> Dict:
+        origen, destino = self.jugadas[indice]
+        return {'tipo': 'movimiento', 'origen': list(origen), 'destino': list(destino), 'sec': indice + 1}
+
+    def _compensacion_rival(self) -> float:
+        return min(self.latencia.retardo(), COMPENSACION_MAXIMA)
+
+    def _vigilar_tiempo(self):
+        """Programa la comprobación de bandera para el jugador que tiene el turno."""
+        BucleRed.cancelar(self._vigilancia)
+        if not self.reloj.corriendo:
+            return
+        turno = self.reloj.turno
+        # Una jugada del cliente puede estar en camino: se le concede su retardo
+        margen = self._compensacion_rival() if turno == Color.NEGRO else 0.0
+        self._vigilancia = bucle_red.programar(self.reloj.restante(turno) + margen, self._comprobar_tiempo)
+
+    def _comprobar_tiempo(self):
+        if not self.en_partida or not self.reloj.corriendo:
+            return
+        turno = self.reloj.turno
+        margen = self._compensacion_rival() if turno == Color.NEGRO else 0.0
+        if self.reloj.restante(turno, time.monotonic() - margen) > 0.0:
+            self._vigilar_tiempo()
+            return
+        self.reloj.detener()
+        self.bandera = turno
+        print(f"Tiempo agotado para {turno.value}")
+        if self.conectado:
+            self.conexion.enviar_lote([{'tipo': 'tiempo_agotado', 'color': turno.value}, self.reloj.a_mensaje()])
+        if self.callback_tiempo:
+            self.callback_tiempo(turno)
+
+    def _al_desconectar(self):
+        if not self.conectado:
+            return
+        self.conectado = False
+        self.latencia.detener()
+        if self.en_partida:
+            print(f"Cliente desconectado: se espera su reconexión durante {PLAZO_RECONEXION:.0f} s")
+            self._plazo_reconexion = bucle_red.programar(PLAZO_RECONEXION, self._abandonar_partida)
+        if self.callback_desconexion:
+            self.callback_desconexion()
+    
+    def _abandonar_partida(self):
+        """Vence el plazo de reconexión: la partida termina."""
+        if self.conectado or not self.en_partida:
+            return
+        print("El cliente no ha vuelto: partida terminada")
+        self.en_partida = False
+        if self.anunciador:
+            self.anunciador.actualizar()
+        BucleRed.cancelar(self._vigilancia)
+        if self.callback_desconexion:
+            self.callback_desconexion()
     
     def esperar_conexion(self, timeout: Optional[float] = None) -> bool:
         """Espera a que un cliente se conecte (bloqueante).
@@ -78,92 +779,67 @@ class ServidorAjedrez:
         """
         if not self.socket_servidor:
             return False
-            
-        try:
-            if timeout:
-                self.socket_servidor.settimeout(timeout)
-            else:
-                self.socket_servidor.settimeout(None)
-                
-            self.socket_cliente, self.direccion_cliente = self.socket_servidor.accept()
-            self.socket_cliente.settimeout(0.1)  # Non-blocking para recibir
-            self.conectado = True
-            print(f"Cliente conectado desde {self.direccion_cliente}")
-            
-            # Iniciar hilo de escucha de movimientos
-            self._ejecutando = True
-            self.hilo_escucha = threading.Thread(target=self._escuchar_movimientos, daemon=True)
-            self.hilo_escucha.start()
-            
-            return True
-        except socket.timeout:
-            return False
-        except Exception as e:
-            print(f"Error al esperar conexión: {e}")
-            return False
-    
-    def _escuchar_movimientos(self):
-        """Hilo que escucha continuamente movimientos del cliente."""
-        buffer = ""
-        while self._ejecutando and self.conectado:
-            try:
-                if self.socket_cliente:
-                    datos = self.socket_cliente.recv(1024).decode('utf-8')
-                    if not datos:
-                        # Conexión cerrada por el cliente
-                        print("Cliente desconectado")
-                        self.conectado = False
-                        break
-                    
-                    buffer += datos
-                    # Procesar mensajes completos (separados por \n)
-                    while '\n' in buffer:
-                        linea, buffer = buffer.split('\n', 1)
-                        if linea.strip():
-                            self._procesar_mensaje(linea.strip())
-            except socket.timeout:
-                continue
-            except Exception as e:
-                print(f"Error en escucha: {e}")
-                self.conectado = False
-                break
+        return self._evento_conexion.wait(timeout)
     
-    def _procesar_mensaje(self, mensaje: str):
+    def _procesar_mensaje(self, datos: Dict):
         """Procesa un mensaje JSON recibido del cliente."""
         try:
-            datos = json.loads(mensaje)
-            if datos.get('tipo') == 'movimiento' and self.callback_movimiento:
+            if self.latencia.procesar(datos):
+                return
+            tipo = datos.get('tipo')
+            if tipo == 'movimiento':
+                sec = datos.get('sec', len(self.jugadas) + 1)
+                if sec <= len(self.jugadas):
+                    # Reenvío tras una reconexión de una jugada que ya teníamos
+                    return
+                # Se cobra el tiempo hasta la llegada menos el retardo de red del cliente
+                if sec != len(self.jugadas) + 1 or not self.reloj.registrar_jugada(
+                        Color.NEGRO, compensacion=self._compensacion_rival()):
+                    print("Movimiento fuera de secuencia, fuera de turno o con el reloj parado: se rechaza")
+                    # El cliente ya la aplicó: que la retire y vuelva al reloj del servidor
+                    self.conexion.enviar_lote([
+                        {'tipo': 'rechazo', 'motivo': 'jugada fuera de secuencia o de turno'},
+                        self.reloj.a_mensaje(),
+                    ])
+                    return
                 origen = tuple(datos['origen'])
                 destino = tuple(datos['destino'])
-                self.callback_movimiento(origen, destino)
+                self.jugadas.append((origen, destino))
+                self.conexion.enviar(self.reloj.a_mensaje())
+                self._vigilar_tiempo()
+                if self.callback_movimiento:
+                    self.callback_movimiento(origen, destino)
+            elif tipo == 'cierre':
+                # El cliente abandona a propósito: no se espera reconexión
+                self.en_partida = False
         except Exception as e:
             print(f"Error al procesar mensaje: {e}")
     
     def enviar_movimiento(self, origen: Tuple[int, int], destino: Tuple[int, int]) -> bool:
-        """Envía un movimiento al cliente conectado.
+        """Registra un movimiento propio y lo envía al cliente con el reloj actualizado.
+        
+        Si el cliente está caído, la jugada queda en el registro y le llegará
+        al reconectar.
         
         Args:
             origen: Coordenadas (x, y) de la casilla de origen
             destino: Coordenadas (x, y) de la casilla de destino
             
         Returns:
-            True si se envió correctamente, False en caso de error
+            True si la partida sigue en marcha, False en caso contrario
         """
-        if not self.conectado or not self.socket_cliente:
-            return False
-        
-        try:
-            mensaje = json.dumps({
-                'tipo': 'movimiento',
-                'origen': list(origen),
-                'destino': list(destino)
-            }) + '\n'
-            self.socket_cliente.sendall(mensaje.encode('utf-8'))
-            return True
-        except Exception as e:
-            print(f"Error al enviar movimiento: {e}")
-            self.conectado = False
+        if not self.en_partida:
             return False
+        # Registro y envío en el hilo del bucle, ordenados con las reanudaciones
+        bucle_red.llamar(self._registrar_jugada_propia, tuple(origen), tuple(destino))
+        return True
+    
+    def _registrar_jugada_propia(self, origen: Tuple[int, int], destino: Tuple[int, int]):
+        self.reloj.registrar_jugada(Color.BLANCO)
+        self.jugadas.append((origen, destino))
+        if self.conectado:
+            self.conexion.enviar_lote([self._mensaje_jugada(len(self.jugadas) - 1), self.reloj.a_mensaje()])
+        self._vigilar_tiempo()
     
     def establecer_callback_movimiento(self, callback: Callable):
         """Establece la función a llamar cuando se recibe un movimiento.
@@ -172,33 +848,44 @@ class ServidorAjedrez:
             callback: Función que recibe (origen, destino) como parámetros
         """
         self.callback_movimiento = callback
+
+    def establecer_callback_desconexion(self, callback: Callable):
+        """Establece la función (sin parámetros) a llamar al perder la conexión o la partida."""
+        self.callback_desconexion = callback
+    
+    def establecer_callback_reconexion(self, callback: Callable):
+        """Establece la función (sin parámetros) a llamar cuando el cliente vuelve."""
+        self.callback_reconexion = callback
+
+    def establecer_callback_tiempo(self, callback: Callable):
+        """Establece la función a llamar con el Color que agota su tiempo."""
+        self.callback_tiempo = callback
     
     def cerrar(self):
         """Cierra todas las conexiones y libera recursos."""
-        self._ejecutando = False
-        self.conectado = False
+        self.en_partida = False
+        self.latencia.detener()
+        BucleRed.cancelar(self._vigilancia)
+        BucleRed.cancelar(self._plazo_reconexion)
         
         # Detener anuncios
         if self.anunciador:
             self.anunciador.detener_anuncios()
             self.anunciador = None
         
-        if self.socket_cliente:
-            try:
-                self.socket_cliente.close()
-            except:
-                pass
-            self.socket_cliente = None
+        if self.conexion:
+            # Avisar al cliente para que no intente reconectar
+            self.conexion.enviar({'tipo': 'cierre'})
+            self.conexion.cerrar()
+            self.conexion = None
+        self.conectado = False
+        self.socket_cliente = None
+        for candidata in list(self._candidatas):
+            candidata.cerrar()
             
         if self.socket_servidor:
-            try:
-                self.socket_servidor.close()
-            except:
-                pass
+            bucle_red.desregistrar(self.socket_servidor, cerrar=True)
             self.socket_servidor = None
-            
-        if self.hilo_escucha and self.hilo_escucha.is_alive():
-            self.hilo_escucha.join(timeout=2.0)
         
         print("Servidor cerrado")
 
@@ -206,17 +893,44 @@ class ServidorAjedrez:
 class ClienteAjedrez:
     """Cliente que se conecta a un servidor para partidas LAN.
     
-    El cliente actúa como el jugador de piezas negras y sincroniza
-    movimientos con el servidor.
+    El cliente juega con el color que le asigna el servidor ("bienvenida"
+    de `ServidorAjedrez`, siempre negras, o "inicio" de
+    `servidor_partidas.ServidorPartidas`) y sincroniza movimientos con él.
+    Si el servidor rechaza una jugada propia, la retira del registro y avisa
+    para que la interfaz rehaga el tablero.
+    Si la conexión se cae en mitad de la partida y el servidor la admite
+    reanudar, reintenta conectar durante PLAZO_RECONEXION segundos y se
+    pone al día con las jugadas posteriores a la última que vio.
     """
     
     def __init__(self):
         """Inicializa el cliente sin conectar."""
         self.socket_cliente: Optional[socket.socket] = None
+        self.conexion: Optional[Conexion] = None
         self.conectado = False
-        self.hilo_escucha: Optional[threading.Thread] = None
+        self.en_partida = False
+        self.host: Optional[str] = None
+        self.puerto = PUERTO_JUEGO
+        # Dirección ya resuelta del servidor: los reintentos no consultan el DNS desde el bucle
+        self._familia = socket.AF_INET
+        self._direccion: Optional[Tuple] = None
         self.callback_movimiento: Optional[Callable] = None
-        self._ejecutando = False
+        self.callback_desconexion: Optional[Callable] = None
+        self.callback_reconexion: Optional[Callable] = None
+        self.callback_tiempo: Optional[Callable] = None
+        self.callback_fin: Optional[Callable] = None
+        self.callback_rechazo: Optional[Callable] = None
+        # Color propio; None hasta que el servidor lo asigna
+        self.color: Optional[Color] = None
+        self.latencia = MedidorLatencia()
+        # Réplica del reloj del servidor
+        self.reloj = RelojPartida()
+        # Registro de jugadas vistas o hechas; su longitud es el último número de secuencia
+        self.jugadas: List[Tuple[Tuple[int, int], Tuple[int, int]]] = []
+        self.id_partida: Optional[str] = None
+        self._intento: Optional[socket.socket] = None
+        self._temporizador_intento: Optional[list] = None
+        self._limite_reconexion = 0.0
     
     def conectar(self, host: str, puerto: int = 8880, timeout: float = 5.0) -> bool:
         """Conecta al servidor especificado.
@@ -230,85 +944,168 @@ class ClienteAjedrez:
             True si se conectó correctamente, False en caso de error
         """
         try:
-            self.socket_cliente = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket_cliente.settimeout(timeout)
-            self.socket_cliente.connect((host, puerto))
-            self.socket_cliente.settimeout(0.1)  # Non-blocking para recibir
+            self.socket_cliente = socket.create_connection((host, puerto), timeout=timeout)
+            self.host, self.puerto = host, puerto
+            self._familia = self.socket_cliente.family
+            self._direccion = self.socket_cliente.getpeername()
+            self.conexion = Conexion(self.socket_cliente, self._procesar_mensaje, self._al_desconectar)
             self.conectado = True
+            self.en_partida = True
+            self.latencia.iniciar(self.conexion)
             print(f"Conectado al servidor {host}:{puerto}")
-            
-            # Iniciar hilo de escucha de movimientos
-            self._ejecutando = True
-            self.hilo_escucha = threading.Thread(target=self._escuchar_movimientos, daemon=True)
-            self.hilo_escucha.start()
-            
             return True
         except Exception as e:
             print(f"Error al conectar: {e}")
             return False
+
+    def _al_desconectar(self):
+        if not self.conectado:
+            return
+        self.conectado = False
+        self.latencia.detener()
+        if self.en_partida and self.id_partida:
+            print("Conexión perdida: reintentando...")
+            self._limite_reconexion = time.monotonic() + PLAZO_RECONEXION
+            bucle_red.llamar(self._reintentar)
+        else:
+            print("Servidor desconectado")
+            self.en_partida = False
+        if self.callback_desconexion:
+            self.callback_desconexion()
     
-    def _escuchar_movimientos(self):
-        """Hilo que escucha continuamente movimientos del servidor."""
-        buffer = ""
-        while self._ejecutando and self.conectado:
-            try:
-                if self.socket_cliente:
-                    datos = self.socket_cliente.recv(1024).decode('utf-8')
-                    if not datos:
-                        # Conexión cerrada por el servidor
-                        print("Servidor desconectado")
-                        self.conectado = False
-                        break
-                    
-                    buffer += datos
-                    # Procesar mensajes completos (separados por \n)
-                    while '\n' in buffer:
-                        linea, buffer = buffer.split('\n', 1)
-                        if linea.strip():
-                            self._procesar_mensaje(linea.strip())
-            except socket.timeout:
-                continue
-            except Exception as e:
-                print(f"Error en escucha: {e}")
-                self.conectado = False
-                break
+    def _reintentar(self):
+        """Lanza un intento de conexión no bloqueante (en el hilo del bucle)."""
+        if not self.en_partida or self.conectado:
+            return
+        if time.monotonic() > self._limite_reconexion:
+            print("No se pudo reconectar: partida terminada")
+            self.en_partida = False
+            if self.callback_desconexion:
+                self.callback_desconexion()
+            return
+        sock = socket.socket(self._familia, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        try:
+            codigo = sock.connect_ex(self._direccion)
+        except OSError as e:
+            codigo = e.errno
+        if codigo not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN):
+            # Fallo inmediato (p. ej. red inalcanzable): cerrar y probar más tarde
+            sock.close()
+            bucle_red.programar(INTERVALO_RECONEXION, self._reintentar)
+            return
+        self._intento = sock
+        bucle_red.registrar(sock, selectors.EVENT_WRITE, self._al_conectar_intento)
+        # Si el intento no se resuelve a tiempo, se descarta y se prueba de nuevo
+        self._temporizador_intento = bucle_red.programar(INTERVALO_RECONEXION * 4, self._descartar_intento)
+    
+    def _descartar_intento(self):
+        if self._intento is not None:
+            bucle_red.desregistrar(self._intento, cerrar=True)
+            self._intento = None
+        bucle_red.programar(INTERVALO_RECONEXION, self._reintentar)
     
-    def _procesar_mensaje(self, mensaje: str):
+    def _al_conectar_intento(self, sock, mascara):
+        if sock is not self._intento:
+            bucle_red.desregistrar(sock, cerrar=True)
+            return
+        self._intento = None
+        BucleRed.cancelar(self._temporizador_intento)
+        if sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) != 0:
+            bucle_red.desregistrar(sock, cerrar=True)
+            bucle_red.programar(INTERVALO_RECONEXION, self._reintentar)
+            return
+        bucle_red.desregistrar(sock)
+        self.socket_cliente = sock
+        self.conexion = Conexion(sock, self._procesar_mensaje, self._al_desconectar)
+        self.conectado = True
+        self.conexion.enviar({'tipo': 'reanudar', 'partida': self.id_partida, 'sec': len(self.jugadas)})
+        self.latencia.iniciar(self.conexion)
+    
+    def _procesar_mensaje(self, datos: Dict):
         """Procesa un mensaje JSON recibido del servidor."""
         try:
-            datos = json.loads(mensaje)
-            if datos.get('tipo') == 'movimiento' and self.callback_movimiento:
+            if self.latencia.procesar(datos):
+                return
+            tipo = datos.get('tipo')
+            if tipo == 'movimiento':
+                sec = datos.get('sec', len(self.jugadas) + 1)
+                if sec != len(self.jugadas) + 1:
+                    # Ya vista (reenvío tras reconectar) o fuera de secuencia
+                    return
                 origen = tuple(datos['origen'])
                 destino = tuple(datos['destino'])
-                self.callback_movimiento(origen, destino)
+                self.jugadas.append((origen, destino))
+                if self.callback_movimiento:
+                    self.callback_movimiento(origen, destino)
+            elif tipo == 'reloj':
+                # El mensaje salió del servidor hace aproximadamente medio RTT
+                self.reloj.sincronizar(datos, self.latencia.retardo())
+            elif tipo == 'tiempo_agotado' and self.callback_tiempo:
+                self.callback_tiempo(Color(datos['color']))
+            elif tipo == 'bienvenida':
+                # Sin id de partida el servidor no admite reanudar: no se reintenta al caer
+                self.id_partida = datos.get('partida')
+                self.color = Color(datos.get('color', Color.NEGRO.value))
+            elif tipo == 'inicio':
+                # ServidorPartidas no admite reanudar: su id de partida no sirve para reconectar
+                self.id_partida = None
+                self.color = Color(datos['color'])
+            elif tipo == 'rechazo':
+                # La jugada propia no cuenta en el servidor (el turno se corrige con su "reloj")
+                if self.jugadas:
+                    self.jugadas.pop()
+                if self.callback_rechazo:
+                    self.callback_rechazo(datos.get('motivo'), list(self.jugadas))
+            elif tipo == 'fin':
+                # Partida cerrada por el servidor: ya no hay nada que reanudar
+                self.id_partida = None
+                self.reloj.detener()
+                if self.callback_fin:
+                    self.callback_fin(datos.get('resultado'), datos.get('motivo'))
+            elif tipo == 'reanudado':
+                # Reenviar las jugadas propias que el servidor no llegó a recibir
+                recibidas = int(datos.get('sec', 0))
+                pendientes = [self._mensaje_jugada(i) for i in range(recibidas, len(self.jugadas))]
+                if pendientes:
+                    self.conexion.enviar_lote(pendientes)
+                print(f"Reconectado al servidor ({len(pendientes)} jugadas reenviadas)")
+                if self.callback_reconexion:
+                    self.callback_reconexion()
+            elif tipo == 'cierre':
+                # El servidor termina a propósito: no se intenta reconectar
+                self.en_partida = False
         except Exception as e:
             print(f"Error al procesar mensaje: {e}")
     
+    def _mensaje_jugada(self, indice: int) -> Dict:
+        origen, destino = self.jugadas[indice]
+        return {'tipo': 'movimiento', 'origen': list(origen), 'destino': list(destino), 'sec': indice + 1}
+    
     def enviar_movimiento(self, origen: Tuple[int, int], destino: Tuple[int, int]) -> bool:
-        """Envía un movimiento al servidor.
+        """Registra un movimiento propio y lo envía al servidor.
+
+        La réplica del reloj pasa el turno de inmediato; el servidor la
+        corrige con su propio cómputo al recibir la jugada. Si la conexión
+        está caída, la jugada se envía al reconectar.
         
         Args:
             origen: Coordenadas (x, y) de la casilla de origen
             destino: Coordenadas (x, y) de la casilla de destino
             
         Returns:
-            True si se envió correctamente, False en caso de error
+            True si la partida sigue en marcha, False en caso contrario
         """
-        if not self.conectado or not self.socket_cliente:
-            return False
-        
-        try:
-            mensaje = json.dumps({
-                'tipo': 'movimiento',
-                'origen': list(origen),
-                'destino': list(destino)
-            }) + '\n'
-            self.socket_cliente.sendall(mensaje.encode('utf-8'))
-            return True
-        except Exception as e:
-            print(f"Error al enviar movimiento: {e}")
-            self.conectado = False
+        if not self.en_partida:
             return False
+        bucle_red.llamar(self._registrar_jugada_propia, tuple(origen), tuple(destino))
+        return True
+    
+    def _registrar_jugada_propia(self, origen: Tuple[int, int], destino: Tuple[int, int]):
+        self.reloj.registrar_jugada(self.color)
+        self.jugadas.append((origen, destino))
+        if self.conectado:
+            self.conexion.enviar(self._mensaje_jugada(len(self.jugadas) - 1))
     
     def establecer_callback_movimiento(self, callback: Callable):
         """Establece la función a llamar cuando se recibe un movimiento.
@@ -317,36 +1114,230 @@ class ClienteAjedrez:
             callback: Función que recibe (origen, destino) como parámetros
         """
         self.callback_movimiento = callback
+
+    def establecer_callback_desconexion(self, callback: Callable):
+        """Establece la función (sin parámetros) a llamar al perder la conexión o la partida."""
+        self.callback_desconexion = callback
+    
+    def establecer_callback_reconexion(self, callback: Callable):
+        """Establece la función (sin parámetros) a llamar al recuperar la conexión."""
+        self.callback_reconexion = callback
+
+    def establecer_callback_tiempo(self, callback: Callable):
+        """Establece la función a llamar con el Color que agota su tiempo (según el servidor)."""
+        self.callback_tiempo = callback
+
+    def establecer_callback_fin(self, callback: Callable):
+        """Establece la función a llamar con (resultado, motivo) cuando el servidor da la partida por terminada."""
+        self.callback_fin = callback
+
+    def establecer_callback_rechazo(self, callback: Callable):
+        """Establece la función a llamar con (motivo, jugadas) cuando el servidor rechaza una jugada propia.
+
+        `jugadas` es el registro ya sin la jugada rechazada, en orden desde el inicio.
+        """
+        self.callback_rechazo = callback
     
     def cerrar(self):
         """Cierra la conexión y libera recursos."""
-        self._ejecutando = False
-        self.conectado = False
+        self.en_partida = False
+        self.latencia.detener()
+        BucleRed.cancelar(self._temporizador_intento)
+        if self._intento is not None:
+            bucle_red.desregistrar(self._intento, cerrar=True)
+            self._intento = None
         
-        if self.socket_cliente:
-            try:
-                self.socket_cliente.close()
-            except:
-                pass
-            self.socket_cliente = None
-            
-        if self.hilo_escucha and self.hilo_escucha.is_alive():
-            self.hilo_escucha.join(timeout=2.0)
+        if self.conexion:
+            # Avisar al servidor para que no espere la reconexión
+            self.conexion.enviar({'tipo': 'cierre'})
+            self.conexion.cerrar()
+            self.conexion = None
+        self.conectado = False
+        self.socket_cliente = None
         
         print("Cliente desconectado")
 
 
+class ServicioDescubrimiento:
+    """Escucha los anuncios de servidores de forma continua y mantiene una tabla viva.
+
+    El socket UDP lo atiende el bucle de red durante toda la vida del
+    proceso, así que los menús pueden mostrar al instante los servidores ya
+    conocidos. Cada entrada guarda cuándo se vio por última vez y la carga
+    anunciada; las que dejan de anunciarse caducan a los CADUCIDAD_SERVIDOR
+    segundos. Los suscriptores reciben un aviso (en el hilo del bucle) cada
+    vez que la tabla cambia.
+    """
+
+    def __init__(self, caducidad: float = CADUCIDAD_SERVIDOR, bucle: Optional[BucleRed] = None):
+        self.caducidad = caducidad
+        self.bucle = bucle or bucle_red
+        self.socket_udp: Optional[socket.socket] = None
+        # {(ip, puerto): {"ip", "puerto", "visto", "timestamp", ...carga}}
+        self._servidores: Dict[Tuple[str, int], Dict] = {}
+        self._cerrojo = threading.Lock()
+        self._suscriptores: List[Callable[[], None]] = []
+        self._purga: Optional[list] = None
+
+    def iniciar(self) -> bool:
+        """Empieza a escuchar anuncios (idempotente)."""
+        with self._cerrojo:
+            if self.socket_udp is not None:
+                return True
+            try:
+                sock = _socket_multicast(PUERTO_BROADCAST)
+            except OSError as e:
+                print(f"Error al iniciar el descubrimiento de servidores: {e}")
+                return False
+            self.socket_udp = sock
+        self.bucle.registrar(sock, selectors.EVENT_READ, self._recibir_anuncios)
+        # No esperar al siguiente anuncio de cada servidor
+        self.consultar()
+        return True
+
+    def consultar(self):
+        """Pide a los servidores que se anuncien ya.
+
+        Las respuestas llegan por unicast a este mismo socket. Un servidor de
+        la tabla que deja sin responder CONSULTAS_SIN_RESPUESTA consultas
+        seguidas (PLAZO_RESPUESTA_CONSULTA segundos cada una) se da por
+        desaparecido: un solo datagrama perdido no lo quita del menú.
+        """
+        self.bucle.llamar(self._consultar)
+
+    def _consultar(self):
+        if not self.socket_udp:
+            return
+        consulta = json.dumps({'tipo': 'consulta_servidores', 'mensaje': MENSAJE_ANUNCIO}).encode('utf-8')
+        try:
+            self.socket_udp.sendto(consulta, (GRUPO_MULTICAST, PUERTO_CONSULTA))
+        except OSError as e:
+            print(f"Error al consultar servidores: {e}")
+            return
+        enviada = time.monotonic()
+        self.bucle.programar(PLAZO_RESPUESTA_CONSULTA, lambda: self._olvidar_no_vistos_desde(enviada))
+
+    def _olvidar_no_vistos_desde(self, instante: float):
+        with self._cerrojo:
+            mudos = []
+            for clave, info in self._servidores.items():
+                if info['visto'] < instante:
+                    # Cada anuncio crea una entrada nueva: el contador cuenta fallos seguidos
+                    info['sin_respuesta'] = info.get('sin_respuesta', 0) + 1
+                    if info['sin_respuesta'] >= CONSULTAS_SIN_RESPUESTA:
+                        mudos.append(clave)
+            for clave in mudos:
+                del self._servidores[clave]
+        if mudos:
+            self._avisar()
+
+    def detener(self):
+        with self._cerrojo:
+            sock, self.socket_udp = self.socket_udp, None
+            self._servidores.clear()
+        BucleRed.cancelar(self._purga)
+        if sock:
+            self.bucle.desregistrar(sock, cerrar=True)
+
+    def suscribir(self, callback: Callable[[], None]):
+        """Llama a `callback()` cada vez que cambie la tabla de servidores."""
+        self._suscriptores.append(callback)
+
+    def desuscribir(self, callback: Callable[[], None]):
+        if callback in self._suscriptores:
+            self._suscriptores.remove(callback)
+
+    def servidores(self) -> Dict[Tuple[str, int], Dict]:
+        """Copia de la tabla de servidores vivos."""
+        with self._cerrojo:
+            return {clave: dict(info) for clave, info in self._servidores.items()}
+
+    def _avisar(self):
+        for callback in list(self._suscriptores):
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error al avisar de cambios en los servidores: {e}")
+
+    def _recibir_anuncios(self, sock, mascara):
+        """Lee todos los anuncios disponibles (en el hilo del bucle)."""
+        cambios = False
+        while True:
+            try:
+                datos, _ = sock.recvfrom(1024)
+            except (BlockingIOError, OSError):
+                break
+            info = _leer_anuncio(datos)
+            if info is None:
+                continue
+            clave = (info['ip'], info['puerto'])
+            if info['tipo'] == 'baja_servidor':
+                with self._cerrojo:
+                    cambios = self._servidores.pop(clave, None) is not None or cambios
+                continue
+            ahora = time.monotonic()
+            with self._cerrojo:
+                anterior = self._servidores.get(clave)
+                self._servidores[clave] = {'ip': clave[0], 'puerto': clave[1], 'carga': info['carga'],
+                                           'visto': ahora, 'timestamp': time.time()}
+            if anterior is None:
+                print(f"  ✓ Servidor encontrado: {clave[0]}:{clave[1]}")
+            if anterior is None or anterior.get('carga') != info.get('carga'):
+                cambios = True
+        if self._purga is None and self._servidores:
+            self._purga = self.bucle.programar(self.caducidad / 2, self._purgar)
+        if cambios:
+            self._avisar()
+
+    def _purgar(self):
+        """Quita los servidores que llevan `caducidad` segundos sin anunciarse."""
+        limite = time.monotonic() - self.caducidad
+        with self._cerrojo:
+            caducados = [clave for clave, info in self._servidores.items() if info['visto'] < limite]
+            for clave in caducados:
+                del self._servidores[clave]
+            quedan = bool(self._servidores)
+        # Solo se reprograma mientras haya servidores: en reposo no hay temporizadores
+        self._purga = self.bucle.programar(self.caducidad / 2, self._purgar) if quedan else None
+        if caducados:
+            self._avisar()
+
+
+def _leer_anuncio(datos: bytes) -> Optional[Dict]:
+    """Anuncio o despedida de servidor válido como {"tipo", "ip", "puerto", "carga"}, o None."""
+    mensaje = datos.decode('utf-8', errors='ignore')
+    # Verificar si es un anuncio válido
+    if MENSAJE_ANUNCIO not in mensaje:
+        return None
+    try:
+        info = json.loads(mensaje)
+    except json.JSONDecodeError:
+        return None
+    if info.get('tipo') not in ('anuncio_servidor', 'baja_servidor') or not info.get('ip') or not info.get('puerto'):
+        return None
+    return {'tipo': info['tipo'], 'ip': info['ip'], 'puerto': info['puerto'], 'carga': info.get('carga')}
+
+
+# Servicio compartido por todo el proceso
+servicio_descubrimiento = ServicioDescubrimiento()
+
+
 class DescubridorServidores:
-    """Descubre automáticamente servidores de ajedrez en la LAN mediante broadcast UDP."""
+    """Búsqueda puntual de servidores de ajedrez en la LAN.
+
+    Consulta el servicio de descubrimiento en segundo plano: si ya conoce
+    algún servidor responde al momento y solo espera cuando la tabla está
+    vacía.
+    """
     
     def __init__(self, timeout_busqueda: float = 3.0):
         """Inicializa el descubridor.
         
         Args:
-            timeout_busqueda: Tiempo máximo en segundos para buscar servidores
+            timeout_busqueda: Tiempo máximo en segundos para esperar al primer servidor
         """
         self.timeout_busqueda = timeout_busqueda
-        self.servidores_encontrados: Dict[str, Dict] = {}  # {ip: {"nombre": str, "puerto": int}}
+        self.servidores_encontrados: Dict[str, Dict] = {}  # {ip: {"puerto": int, "timestamp": float}}
     
     def buscar_servidores(self) -> Dict[str, Dict]:
         """Busca servidores de ajedrez en la LAN.
@@ -354,107 +1345,170 @@ class DescubridorServidores:
         Returns:
             Diccionario con los servidores encontrados {ip: {"puerto": int, "timestamp": float}}
         """
-        self.servidores_encontrados = {}
-        
-        # Crear socket UDP para escuchar anuncios
-        socket_udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        socket_udp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        
+        servicio = servicio_descubrimiento
+        servicio.iniciar()
+        hay_cambios = threading.Event()
+        # Suscribirse antes de consultar para no perder un anuncio entre medias
+        servicio.suscribir(hay_cambios.set)
         try:
-            # Permitir recibir broadcast
-            socket_udp.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-            
-            # Vincular al puerto de broadcast
-            socket_udp.bind(('', PUERTO_BROADCAST))
-            socket_udp.settimeout(self.timeout_busqueda)
-            
-            print(f"Buscando servidores en la LAN por {self.timeout_busqueda} segundos...")
-            inicio = time.time()
-            
-            # Recopilar anuncios durante el timeout
-            while time.time() - inicio < self.timeout_busqueda:
-                try:
-                    datos, (ip, puerto) = socket_udp.recvfrom(1024)
-                    mensaje = datos.decode('utf-8', errors='ignore')
-                    
-                    # Verificar si es un anuncio válido
-                    if MENSAJE_ANUNCIO in mensaje:
-                        try:
-                            info = json.loads(mensaje)
-                            if info.get('tipo') == 'anuncio_servidor':
-                                ip_servidor = info.get('ip')
-                                puerto_juego = info.get('puerto')
-                                if ip_servidor and puerto_juego:
-                                    # Registrar el servidor encontrado
-                                    self.servidores_encontrados[ip_servidor] = {
-                                        'puerto': puerto_juego,
-                                        'timestamp': time.time()
-                                    }
-                                    print(f"  ✓ Servidor encontrado: {ip_servidor}:{puerto_juego}")
-                        except json.JSONDecodeError:
-                            pass
-                except socket.timeout:
-                    break
+            if not servicio.servidores():
+                print(f"Buscando servidores en la LAN (hasta {self.timeout_busqueda} segundos)...")
+                servicio.consultar()
+                hay_cambios.wait(self.timeout_busqueda)
         finally:
-            socket_udp.close()
-        
-        return self.servidores_encontrados
+            servicio.desuscribir(hay_cambios.set)
+        self.servidores_encontrados = {
+            ip: {'puerto': puerto, 'timestamp': info['timestamp']}
+            for (ip, puerto), info in servicio.servidores().items()
+        }
+        return dict(self.servidores_encontrados)
 
 
 class AnunciadorServidor:
-    """Anuncia la presencia del servidor en la LAN mediante broadcast UDP."""
+    """Anuncia la presencia del servidor en la LAN por multicast UDP.
+
+    El anuncio se codifica una vez y solo se vuelve a codificar cuando cambia
+    la carga. La cadencia es adaptativa: justo al arrancar (o tras un cambio)
+    se anuncia cada INTERVALO_ANUNCIO_MINIMO segundos y el intervalo se
+    duplica hasta INTERVALO_ANUNCIO_MAXIMO mientras nada cambia. Además
+    responde por unicast a las consultas de los clientes, que así no tienen
+    que esperar al siguiente anuncio, y se despide al detenerse.
+    """
     
-    def __init__(self, ip_local: str, puerto_juego: int = PUERTO_JUEGO):
+    def __init__(self, ip_local: str, puerto_juego: int = PUERTO_JUEGO,
+                 carga: Optional[Callable[[], Dict]] = None):
         """Inicializa el anunciador.
         
         Args:
             ip_local: IP local del servidor
             puerto_juego: Puerto en el que escucha el servidor
+            carga: Función que devuelve la carga actual del servidor (se incluye en cada anuncio)
         """
         self.ip_local = ip_local
         self.puerto_juego = puerto_juego
-        self.hilo_anuncio: Optional[threading.Thread] = None
+        self.carga = carga
+        self.socket_udp: Optional[socket.socket] = None
+        self._temporizador: Optional[list] = None
         self._ejecutando = False
+        self._intervalo = INTERVALO_ANUNCIO_MINIMO
+        self._ultimo_envio = 0.0
+        # Anuncio ya codificado y la carga con la que se codificó
+        self._paquete: Optional[bytes] = None
+        self._carga_paquete: Optional[Dict] = None
     
     def iniciar_anuncios(self):
-        """Inicia el hilo que anuncia el servidor cada segundo."""
+        """Empieza a anunciar y a atender consultas desde el bucle de red."""
         if self._ejecutando:
             return
         
+        try:
+            self.socket_udp = _socket_multicast(PUERTO_CONSULTA)
+        except OSError as e:
+            print(f"Error al preparar los anuncios: {e}")
+            return
         self._ejecutando = True
-        self.hilo_anuncio = threading.Thread(target=self._anunciar_periodicamente, daemon=True)
-        self.hilo_anuncio.start()
-    
-    def _anunciar_periodicamente(self):
-        """Hilo que envía anuncios de disponibilidad cada segundo."""
-        socket_udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        socket_udp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        socket_udp.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-        
+        self._intervalo = INTERVALO_ANUNCIO_MINIMO
+        bucle_red.registrar(self.socket_udp, selectors.EVENT_READ, self._atender_consultas)
+        self._temporizador = bucle_red.programar(0, self._anunciar)
+
+    def _paquete_actual(self) -> bytes:
+        """Anuncio codificado; solo se regenera si la carga ha cambiado."""
+        carga = self.carga() if self.carga else None
+        if self._paquete is None or carga != self._carga_paquete:
+            if self._paquete is not None:
+                # Algo ha cambiado: volver a la cadencia rápida
+                self._intervalo = INTERVALO_ANUNCIO_MINIMO
+            self._carga_paquete = carga
+            self._paquete = json.dumps({
+                'tipo': 'anuncio_servidor',
+                'mensaje': MENSAJE_ANUNCIO,
+                'ip': self.ip_local,
+                'puerto': self.puerto_juego,
+                'carga': carga
+            }).encode('utf-8')
+        return self._paquete
+
+    def _enviar(self, paquete: bytes, destino: Tuple[str, int]):
         try:
-            while self._ejecutando:
-                mensaje = json.dumps({
-                    'tipo': 'anuncio_servidor',
-                    'mensaje': MENSAJE_ANUNCIO,
-                    'ip': self.ip_local,
-                    'puerto': self.puerto_juego
-                })
-                
-                try:
-                    # Enviar broadcast en la red local
-                    socket_udp.sendto(mensaje.encode('utf-8'), ('<broadcast>', PUERTO_BROADCAST))
-                except Exception as e:
-                    print(f"Error al enviar anuncio: {e}")
-                
-                time.sleep(1.0)  # Anunciar cada segundo
-        finally:
-            socket_udp.close()
+            self.socket_udp.sendto(paquete, destino)
+        except OSError as e:
+            print(f"Error al enviar anuncio: {e}")
+    
+    def _anunciar(self):
+        """Envía un anuncio al grupo y programa el siguiente (en el hilo del bucle)."""
+        if not self._ejecutando or not self.socket_udp:
+            return
+        paquete = self._paquete_actual()
+        self._enviar(paquete, (GRUPO_MULTICAST, PUERTO_BROADCAST))
+        self._ultimo_envio = time.monotonic()
+        self._temporizador = bucle_red.programar(self._intervalo, self._anunciar)
+        self._intervalo = min(self._intervalo * 2, INTERVALO_ANUNCIO_MAXIMO)
+
+    def actualizar(self):
+        """Avisa de que la carga ha cambiado: se anuncia pronto (como mucho dos veces por segundo)."""
+        bucle_red.llamar(self._adelantar)
+
+    def _adelantar(self):
+        if not self._ejecutando:
+            return
+        self._intervalo = INTERVALO_ANUNCIO_MINIMO
+        BucleRed.cancelar(self._temporizador)
+        retraso = max(0.0, self._ultimo_envio + INTERVALO_ANUNCIO_MINIMO - time.monotonic())
+        self._temporizador = bucle_red.programar(retraso, self._anunciar)
+
+    def _atender_consultas(self, sock, mascara):
+        """Responde por unicast a cada consulta con el anuncio ya codificado."""
+        while True:
+            try:
+                datos, direccion = sock.recvfrom(1024)
+            except (BlockingIOError, OSError):
+                return
+            if MENSAJE_ANUNCIO.encode('utf-8') not in datos:
+                continue
+            try:
+                consulta = json.loads(datos)
+            except ValueError:
+                continue
+            if consulta.get('tipo') == 'consulta_servidores':
+                self._enviar(self._paquete_actual(), direccion)
     
     def detener_anuncios(self):
-        """Detiene los anuncios."""
+        """Detiene los anuncios y se despide para que los clientes lo olviden al momento."""
+        if self._ejecutando and self.socket_udp:
+            self._enviar(json.dumps({
+                'tipo': 'baja_servidor',
+                'mensaje': MENSAJE_ANUNCIO,
+                'ip': self.ip_local,
+                'puerto': self.puerto_juego
+            }).encode('utf-8'), (GRUPO_MULTICAST, PUERTO_BROADCAST))
         self._ejecutando = False
-        if self.hilo_anuncio:
-            self.hilo_anuncio.join(timeout=2.0)
+        BucleRed.cancelar(self._temporizador)
+        if self.socket_udp:
+            bucle_red.desregistrar(self.socket_udp, cerrar=True)
+            self.socket_udp = None
+
+
+def _socket_multicast(puerto: Optional[int] = None) -> socket.socket:
+    """Socket UDP no bloqueante para el grupo de anuncios.
+
+    Con `puerto`, además se vincula a él y se une al grupo para recibir.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # TTL 1: los anuncios no salen de la red local
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)
+        # Entregar también a los procesos del mismo equipo
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+        if puerto is not None:
+            sock.bind(('', puerto))
+            grupo = struct.pack("4s4s", socket.inet_aton(GRUPO_MULTICAST), socket.inet_aton("0.0.0.0"))
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, grupo)
+        sock.setblocking(False)
+    except OSError:
+        sock.close()
+        raise
+    return sock
 
 
 def obtener_ip_local() -> str:
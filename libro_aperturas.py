@@ -0,0 +1,134 @@
+"""Libro de aperturas en formato Polyglot (.bin).
+
+Responsabilidades:
+- Abrir libros Polyglot mapeados en memoria (mmap) mediante python-chess
+- Buscar las entradas de una posición por clave Zobrist (búsqueda binaria)
+- Elegir una jugada del libro con selección aleatoria ponderada por peso
+"""
+from typing import Optional, Dict, List
+import os
+import random
+
+try:
+    import chess
+    import chess.polyglot
+except Exception:
+    chess = None
+
+# Variable de entorno para indicar un libro concreto
+VARIABLE_ENTORNO_LIBRO = "AJEDREZ_LIBRO"
+
+
+class LibroAperturas:
+    """Lector de un libro Polyglot con consultas por posición.
+
+    El archivo se abre con `chess.polyglot.open_reader`, que lo mapea en
+    memoria y localiza las entradas de cada clave Zobrist por búsqueda
+    binaria, de modo que no se carga el libro completo en RAM.
+    """
+
+    def __init__(self, ruta_libro: str):
+        """Abre el libro indicado; si falla, queda marcado como no disponible.
+
+        Args:
+            ruta_libro: Ruta al archivo .bin en formato Polyglot
+        """
+        self.ruta_libro = ruta_libro
+        self.lector = None
+        if chess is not None:
+            try:
+                self.lector = chess.polyglot.open_reader(ruta_libro)
+            except Exception as e:
+                print(f"No se pudo abrir el libro de aperturas {ruta_libro}: {e}")
+                self.lector = None
+
+    def disponible(self) -> bool:
+        return self.lector is not None
+
+    def entradas(self, fen: str) -> List:
+        """Devuelve las entradas del libro para la posición FEN (puede ser vacía).
+
+        Se descartan los enroques y las entradas con peso 0, ya que el tablero
+        interno no implementa el enroque.
+        """
+        if not self.lector:
+            return []
+        try:
+            board = chess.Board(fen)
+            return [
+                e for e in self.lector.find_all(board)
+                if e.weight > 0 and not board.is_castling(e.move)
+            ]
+        except Exception:
+            return []
+
+    def jugada(self, fen: str, aleatorio: bool = True) -> Optional[str]:
+        """Devuelve una jugada del libro en formato LAN (e2e4) o None.
+
+        Args:
+            fen: Posición a consultar
+            aleatorio: Si es True elige al azar ponderando por peso;
+                si es False devuelve siempre la jugada de mayor peso
+        """
+        entradas = self.entradas(fen)
+        if not entradas:
+            return None
+        if aleatorio:
+            elegida = random.choices(entradas, weights=[e.weight for e in entradas])[0]
+        else:
+            elegida = max(entradas, key=lambda e: e.weight)
+        return elegida.move.uci()
+
+    def cerrar(self):
+        try:
+            if self.lector:
+                self.lector.close()
+        except Exception:
+            pass
+        self.lector = None
+
+
+def _ruta_libro_por_defecto() -> Optional[str]:
+    """Resuelve la ruta del libro de aperturas.
+
+    - Usa la variable de entorno AJEDREZ_LIBRO si está definida.
+    - Busca `libro.bin` o `book.bin` junto al proyecto.
+    - Busca el primer .bin dentro de ./libros/.
+    """
+    ruta = os.environ.get(VARIABLE_ENTORNO_LIBRO)
+    if ruta and os.path.isfile(ruta):
+        return ruta
+
+    raiz = os.path.dirname(os.path.abspath(__file__))
+    for nombre in ("libro.bin", "book.bin"):
+        candidato = os.path.join(raiz, nombre)
+        if os.path.isfile(candidato):
+            return candidato
+
+    carpeta_libros = os.path.join(raiz, "libros")
+    if os.path.isdir(carpeta_libros):
+        try:
+            for nombre in sorted(os.listdir(carpeta_libros)):
+                candidato = os.path.join(carpeta_libros, nombre)
+                if nombre.lower().endswith(".bin") and os.path.isfile(candidato):
+                    return candidato
+        except Exception:
+            pass
+    return None
+
+
+# Libros abiertos por ruta: el mmap se reutiliza durante toda la sesión
+_libros_abiertos: Dict[str, LibroAperturas] = {}
+
+
+def obtener_libro(ruta_libro: Optional[str] = None) -> Optional[LibroAperturas]:
+    """Devuelve el libro (abierto una sola vez) o None si no hay ninguno."""
+    if ruta_libro is None:
+        ruta_libro = _ruta_libro_por_defecto()
+    if not ruta_libro:
+        return None
+    libro = _libros_abiertos.get(ruta_libro)
+    if libro is None:
+        libro = LibroAperturas(ruta_libro)
+        _libros_abiertos[ruta_libro] = libro
+    return libro if libro.disponible() else None
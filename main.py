@@ -8,14 +8,14 @@ Orquesta el flujo inicial:
 - Controla el bucle principal de juego
 """
 import pygame
-import socket
-import threading
-from ui import Menu, InterfazUsuario
-from lan import ServidorAjedrez, ClienteAjedrez, DescubridorServidores, PUERTO_JUEGO
-from modelos import Color
-from reglas import sugerir_movimiento
+from ui import Menu, MenuServidores, InterfazUsuario, publicar_evento_red
+from lan import ServidorAjedrez, ClienteAjedrez, servicio_descubrimiento, PUERTO_JUEGO
+from modelos import Color, EstadoJuego
+from reglas import sugerir_movimiento, crear_motor_interno
 
 def main():
+    # Escuchar anuncios de servidores LAN desde el arranque
+    servicio_descubrimiento.iniciar()
     try:
         # Menú principal: seleccionar modo
         menu_principal = Menu([
@@ -49,6 +49,7 @@ def main():
                 # Submenú para elegir motor
                 menu_motor = Menu([
                     "Stockfish (Local)",
+                    "Motor Interno (Local)",
                     "Chess-API.com (Remoto)",
                     "Volver"
                 ])
@@ -56,6 +57,8 @@ def main():
                 
                 if motor_opcion == "Stockfish (Local)":
                     juego_vs_maquina(motor="stockfish")
+                elif motor_opcion == "Motor Interno (Local)":
+                    juego_vs_maquina(motor="interno")
                 elif motor_opcion == "Chess-API.com (Remoto)":
                     juego_vs_maquina(motor="chess-api")
         
@@ -68,6 +71,29 @@ def main():
         pygame.quit()
 
 
+def _registrar_partida(interfaz, blancas: str, negras: str):
+    """Guarda la partida terminada en la base local para el explorador de posiciones."""
+    tablero = interfaz.tablero
+    if not tablero.historial_movimientos:
+        return
+    if tablero.estado in (EstadoJuego.JAQUE_MATE, EstadoJuego.TIEMPO):
+        # Pierde el bando al que le toca mover
+        resultado = "0-1" if tablero.turno == Color.BLANCO else "1-0"
+    elif tablero.estado == EstadoJuego.EMPATE:
+        resultado = "1/2-1/2"
+    else:
+        resultado = "*"
+    try:
+        from base_partidas import BasePartidas
+        base = BasePartidas()
+        try:
+            base.guardar_partida_local(tablero.historial_movimientos, resultado, blancas, negras)
+        finally:
+            base.cerrar()
+    except Exception as e:
+        print(f"No se pudo guardar la partida en la base local: {e}")
+
+
 def juego_local():
     """Ejecuta una partida local (Jugador vs Jugador)."""
     # Crear la interfaz de usuario y preparar estado de selección
@@ -108,6 +134,8 @@ def juego_local():
         interfaz.dibujar_tablero(seleccionado)
         pygame.display.flip()
 
+    _registrar_partida(interfaz, "Blancas", "Negras")
+
 
 def _lan_a_coords(lan: str):
     """Convierte un movimiento LAN (e2e4) a coordenadas (x, y)."""
@@ -128,6 +156,8 @@ def juego_vs_maquina(motor="stockfish"):
     interfaz = InterfazUsuario()
     seleccionado = None
     clock = pygame.time.Clock()
+    # El motor interno vive toda la partida para reutilizar su TT entre jugadas
+    motor_interno = crear_motor_interno("medio") if motor == "interno" else None
     
     while True:
         dt = clock.tick(60) / 1000.0
@@ -141,7 +171,10 @@ def juego_vs_maquina(motor="stockfish"):
             pygame.display.flip()
             
             # El motor se detecta automáticamente (PATH o carpeta stockfish/)
-            lan = sugerir_movimiento(interfaz.tablero.casillas, interfaz.tablero.turno, motor=motor, nivel="medio")
+            lan = sugerir_movimiento(
+                interfaz.tablero.casillas, interfaz.tablero.turno, motor=motor, nivel="medio",
+                motor_interno=motor_interno
+            )
             coords = _lan_a_coords(lan) if lan else None
             if coords:
                 origen, destino = coords
@@ -185,6 +218,109 @@ def juego_vs_maquina(motor="stockfish"):
         interfaz.dibujar_tablero(seleccionado)
         pygame.display.flip()
 
+    _registrar_partida(interfaz, "Jugador", f"Motor ({motor})")
+
+
+def _partida_lan(interfaz, red):
+    """Bucle de una partida LAN contra el rival conectado a `red` (servidor o cliente).
+
+    El color propio es `red.color`: fijo en el servidor y asignado por el
+    servidor en el cliente; hasta que llega no se puede mover.
+
+    Los movimientos del rival llegan desde el hilo de red como EVENTO_RED, en
+    orden y sin perder ninguno. El bucle duerme hasta que hay un evento local,
+    un mensaje de red o cambia el segundo del reloj.
+
+    Los relojes se leen de `red.reloj`, cuya autoridad es el servidor: él
+    descuenta cada jugada compensando la latencia y decide la bandera.
+    Un corte de conexión no termina la partida: `red` reconecta y reenvía
+    las jugadas pendientes mientras la partida sigue en pantalla. Si el
+    servidor rechaza una jugada propia, el tablero se rehace con las jugadas
+    que sí aceptó.
+    """
+    red.establecer_callback_movimiento(
+        lambda origen, destino: publicar_evento_red(tipo="movimiento", origen=origen, destino=destino)
+    )
+    red.establecer_callback_desconexion(lambda: publicar_evento_red(tipo="desconexion"))
+    red.establecer_callback_reconexion(lambda: publicar_evento_red(tipo="reconexion"))
+    red.establecer_callback_tiempo(lambda color: publicar_evento_red(tipo="tiempo_agotado", color=color.value))
+    interfaz.reloj_red = red.reloj
+    seleccionado = None
+    terminada = False
+    aviso = None
+    reloj = pygame.time.Clock()
+    
+    def tras_movimiento():
+        nonlocal terminada
+        interfaz.reproducir_sonido_movimiento()
+        if interfaz.tablero.estado in (EstadoJuego.JAQUE_MATE, EstadoJuego.EMPATE):
+            terminada = True
+            red.reloj.detener()
+    
+    while red.en_partida:
+        # Redibujar y esperar al siguiente evento
+        interfaz.texto_red = red.latencia.resumen()
+        if not red.conectado:
+            interfaz.mensaje_estado = "Conexión perdida: esperando reconexión..."
+        elif red.color is None:
+            interfaz.mensaje_estado = "Esperando rival..."
+        else:
+            interfaz.mensaje_estado = aviso
+        interfaz.dibujar_tablero(seleccionado)
+        pygame.display.flip()
+        continuar, clics, mensajes = interfaz.esperar_eventos(interfaz.ms_hasta_siguiente_segundo())
+        interfaz.actualizar_tiempos(reloj.tick() / 1000.0)
+        if not continuar:
+            break
+        
+        # Aplicar los mensajes del oponente en el orden de llegada
+        for mensaje in mensajes:
+            tipo = mensaje.get("tipo")
+            if tipo == "movimiento" and not terminada:
+                if interfaz.tablero.realizar_movimiento(mensaje["origen"], mensaje["destino"]):
+                    tras_movimiento()
+            elif tipo == "tiempo_agotado":
+                terminada = True
+                interfaz.tiempos[Color(mensaje["color"])] = 0.0
+                interfaz.timers_activos = False
+                interfaz.tablero.estado = EstadoJuego.TIEMPO
+            elif tipo == "fin" and not terminada:
+                # El servidor de partidas cierra la partida (p. ej. por abandono del rival)
+                terminada = True
+                red.reloj.detener()
+                aviso = f"Partida terminada: {mensaje['resultado']} ({mensaje['motivo']})"
+            elif tipo == "rechazo":
+                # La jugada ya estaba en el tablero local: volver a la posición del servidor
+                interfaz.reiniciar_tablero(mensaje["jugadas"])
+                seleccionado = None
+                terminada = False
+                aviso = f"Jugada rechazada por el servidor: {mensaje['motivo']}"
+        
+        # Solo permitir clicks en el turno propio
+        color_propio = red.color
+        for click in clics:
+            if terminada or color_propio is None or interfaz.tablero.turno != color_propio:
+                break
+            if seleccionado is None:
+                if (click in interfaz.tablero.casillas and 
+                    interfaz.tablero.casillas[click] and 
+                    interfaz.tablero.casillas[click].color == color_propio):
+                    seleccionado = click
+            else:
+                if interfaz.tablero.realizar_movimiento(seleccionado, click):
+                    # Enviar el movimiento al rival
+                    red.enviar_movimiento(seleccionado, click)
+                    tras_movimiento()
+                    seleccionado = None
+                    aviso = None
+                else:
+                    if (click in interfaz.tablero.casillas and 
+                        interfaz.tablero.casillas[click] and 
+                        interfaz.tablero.casillas[click].color == color_propio):
+                        seleccionado = click
+                    else:
+                        seleccionado = None
+
 
 def juego_lan_servidor():
     """Ejecuta una partida LAN actuando como servidor (juega con blancas)."""
@@ -219,30 +355,9 @@ def juego_lan_servidor():
                 servidor.cerrar()
                 return
         
-        # Intentar aceptar conexión (no bloqueante)
-        if servidor.socket_servidor:
-            try:
-                servidor.socket_servidor.settimeout(0.1)
-                cliente_socket, cliente_addr = servidor.socket_servidor.accept()
-                servidor.socket_cliente = cliente_socket
-                servidor.direccion_cliente = cliente_addr
-                servidor.socket_cliente.settimeout(0.1)
-                servidor.conectado = True
-                servidor._ejecutando = True
-                
-                # Iniciar hilo de escucha
-                servidor.hilo_escucha = threading.Thread(
-                    target=servidor._escuchar_movimientos, 
-                    daemon=True
-                )
-                servidor.hilo_escucha.start()
-                
-                print(f"Cliente conectado desde {cliente_addr}")
-                break
-            except socket.timeout:
-                pass
-            except Exception:
-                pass
+        # La conexión la acepta el bucle de red; aquí solo se refresca la pantalla
+        if servidor.conectado:
+            break
         
         # Actualizar mensaje con tiempo restante
         tiempo_restante = int(timeout_conexion - tiempo_elapsed)
@@ -255,178 +370,46 @@ def juego_lan_servidor():
     if not servidor.conectado:
         return
     
-    # Variable para almacenar movimientos del oponente
-    movimiento_pendiente = {'origen': None, 'destino': None}
-    
-    def recibir_movimiento_oponente(origen, destino):
-        """Callback cuando se recibe un movimiento del cliente."""
-        movimiento_pendiente['origen'] = origen
-        movimiento_pendiente['destino'] = destino
-    
-    servidor.establecer_callback_movimiento(recibir_movimiento_oponente)
-    
-    # Bucle principal del juego
-    seleccionado = None
-    clock = pygame.time.Clock()
-    
-    while True:
-        dt = clock.tick(60) / 1000.0
-        interfaz.actualizar_tiempos(dt)
-        interfaz.mensaje_estado = None  # Limpiar mensaje de espera
-        
-        # Verificar si hay movimiento del oponente
-        if movimiento_pendiente['origen'] is not None:
-            origen = movimiento_pendiente['origen']
-            destino = movimiento_pendiente['destino']
-            movimiento_pendiente['origen'] = None
-            movimiento_pendiente['destino'] = None
-            
-            # Aplicar movimiento del oponente (negras)
-            if interfaz.tablero.realizar_movimiento(origen, destino):
-                interfaz.reproducir_sonido_movimiento()
-        
-        # Manejo de eventos locales
-        continuar, click = interfaz.manejar_eventos()
-        if not continuar or not servidor.conectado:
-            break
-        
-        # Solo permitir clicks si es el turno de blancas (servidor)
-        if click and interfaz.tablero.turno == Color.BLANCO:
-            if seleccionado is None:
-                if (click in interfaz.tablero.casillas and 
-                    interfaz.tablero.casillas[click] and 
-                    interfaz.tablero.casillas[click].color == Color.BLANCO):
-                    seleccionado = click
-            else:
-                if interfaz.tablero.realizar_movimiento(seleccionado, click):
-                    # Enviar el movimiento al cliente
-                    servidor.enviar_movimiento(seleccionado, click)
-                    interfaz.reproducir_sonido_movimiento()
-                    seleccionado = None
-                else:
-                    if (click in interfaz.tablero.casillas and 
-                        interfaz.tablero.casillas[click] and 
-                        interfaz.tablero.casillas[click].color == Color.BLANCO):
-                        seleccionado = click
-                    else:
-                        seleccionado = None
-        
-        # Redibujar
-        interfaz.dibujar_tablero(seleccionado)
-        pygame.display.flip()
-    
+    _partida_lan(interfaz, servidor)
     servidor.cerrar()
 
 
 def juego_lan_cliente():
-    """Ejecuta una partida LAN conectándose a un servidor (juega con negras)."""
-    print("\n=== BUSCAR SERVIDORES EN LA LAN ===")
-    
-    # Buscar servidores automáticamente
-    descubridor = DescubridorServidores(timeout_busqueda=3.0)
-    servidores = descubridor.buscar_servidores()
+    """Ejecuta una partida LAN conectándose a un servidor (juega con el color que este asigne)."""
+    # El descubrimiento lleva escuchando desde el arranque: la lista sale al instante
+    menu_servidores = MenuServidores(servicio_descubrimiento)
+    opcion = menu_servidores.loop()
+    if opcion is None or opcion == MenuServidores.OPCION_VOLVER:
+        return
     
-    # Si no hay servidores, permitir ingreso manual
-    if not servidores:
-        print("\nNo se encontraron servidores automáticamente.")
-        print("Ingresa la IP del servidor manualmente (o 'localhost' para local)")
+    if opcion in menu_servidores.direcciones:
+        host, puerto = menu_servidores.direcciones[opcion]
+    else:
+        # Ingreso manual
+        print("Ingresa la IP del servidor (o 'localhost' para local)")
         host = input("IP del servidor: ").strip()
         if not host:
             host = "localhost"
-    else:
-        # Mostrar servidores encontrados
-        print(f"\nServidores encontrados: {len(servidores)}")
-        ips = list(servidores.keys())
-        
-        for i, ip in enumerate(ips, 1):
-            print(f"{i}. {ip}:{servidores[ip]['puerto']}")
-        
-        # Si hay solo uno, usar ese
-        if len(ips) == 1:
-            host = ips[0]
-            print(f"\nConectando automáticamente a {host}...")
-        else:
-            # Permitir selección
-            try:
-                seleccion = input(f"Selecciona un servidor (1-{len(ips)}): ").strip()
-                indice = int(seleccion) - 1
-                if 0 <= indice < len(ips):
-                    host = ips[indice]
-                else:
-                    print("Opción inválida")
-                    return
-            except (ValueError, IndexError):
-                print("Opción inválida")
-                return
+        puerto = PUERTO_JUEGO
     
     # Crear el cliente y conectar
     cliente = ClienteAjedrez()
-    print(f"Conectando a {host}:{PUERTO_JUEGO}...")
-    if not cliente.conectar(host, puerto=PUERTO_JUEGO, timeout=10.0):
+    print(f"Conectando a {host}:{puerto}...")
+    if not cliente.conectar(host, puerto=puerto, timeout=10.0):
         print("No se pudo conectar al servidor")
         return
     
+    cliente.establecer_callback_fin(
+        lambda resultado, motivo: publicar_evento_red(tipo="fin", resultado=resultado, motivo=motivo)
+    )
+    cliente.establecer_callback_rechazo(
+        lambda motivo, jugadas: publicar_evento_red(tipo="rechazo", motivo=motivo, jugadas=jugadas)
+    )
+    
     # Crear interfaz
     interfaz = InterfazUsuario()
     
-    # Variable para almacenar movimientos del oponente
-    movimiento_pendiente = {'origen': None, 'destino': None}
-    
-    def recibir_movimiento_oponente(origen, destino):
-        """Callback cuando se recibe un movimiento del servidor."""
-        movimiento_pendiente['origen'] = origen
-        movimiento_pendiente['destino'] = destino
-    
-    cliente.establecer_callback_movimiento(recibir_movimiento_oponente)
-    
-    # Bucle principal del juego
-    seleccionado = None
-    clock = pygame.time.Clock()
-    
-    while True:
-        dt = clock.tick(60) / 1000.0
-        interfaz.actualizar_tiempos(dt)
-        
-        # Verificar si hay movimiento del oponente
-        if movimiento_pendiente['origen'] is not None:
-            origen = movimiento_pendiente['origen']
-            destino = movimiento_pendiente['destino']
-            movimiento_pendiente['origen'] = None
-            movimiento_pendiente['destino'] = None
-            
-            # Aplicar movimiento del oponente (blancas)
-            if interfaz.tablero.realizar_movimiento(origen, destino):
-                interfaz.reproducir_sonido_movimiento()
-        
-        # Manejo de eventos locales
-        continuar, click = interfaz.manejar_eventos()
-        if not continuar or not cliente.conectado:
-            break
-        
-        # Solo permitir clicks si es el turno de negras (cliente)
-        if click and interfaz.tablero.turno == Color.NEGRO:
-            if seleccionado is None:
-                if (click in interfaz.tablero.casillas and 
-                    interfaz.tablero.casillas[click] and 
-                    interfaz.tablero.casillas[click].color == Color.NEGRO):
-                    seleccionado = click
-            else:
-                if interfaz.tablero.realizar_movimiento(seleccionado, click):
-                    # Enviar el movimiento al servidor
-                    cliente.enviar_movimiento(seleccionado, click)
-                    interfaz.reproducir_sonido_movimiento()
-                    seleccionado = None
-                else:
-                    if (click in interfaz.tablero.casillas and 
-                        interfaz.tablero.casillas[click] and 
-                        interfaz.tablero.casillas[click].color == Color.NEGRO):
-                        seleccionado = click
-                    else:
-                        seleccionado = None
-        
-        # Redibujar
-        interfaz.dibujar_tablero(seleccionado)
-        pygame.display.flip()
+    _partida_lan(interfaz, cliente)
     
     cliente.cerrar()
 
@@ -0,0 +1,413 @@
+"""Motor de ajedrez interno basado en python-chess.
+
+Responsabilidades:
+- Búsqueda alfa-beta (negamax) adaptada de `Chess-AI-master/main.py`, sin pygame
+- Profundización iterativa con tabla de transposición y ordenación de jugadas
+- Reutilización de la TT, el historial y la variante principal entre jugadas
+- Podas y reducciones conmutables: movimiento nulo, LMR, PVS con ventanas
+  de aspiración y extensión por jaque
+- Evaluación material desde el punto de vista del bando que mueve
+- Consulta de tablas Syzygy en finales con pocas piezas
+
+Uso (benchmark de nodos por técnica):
+    python motor_interno.py --profundidad 4
+"""
+from typing import Optional, Dict, List, Tuple
+import time
+
+try:
+    import chess
+    import chess.polyglot
+except Exception:
+    chess = None
+
+from tablas_finales import TablasFinales, obtener_tablas
+
+# Valores de las piezas (mismos que Chess-AI-master)
+VALORES_PIEZA = {
+    1: 10,    # peón
+    2: 30,    # caballo
+    3: 30,    # alfil
+    4: 50,    # torre
+    5: 90,    # dama
+    6: 900,   # rey
+}
+MATE = 100000
+# Puntuaciones por encima de este umbral son mates (se ajustan por ply en la TT)
+UMBRAL_MATE = MATE - 1000
+# Puntuación de una posición ganada según las tablas (por debajo de cualquier mate)
+VALOR_TABLAS = 50000
+
+# Tipos de entrada de la tabla de transposición
+EXACTO = 0
+COTA_INFERIOR = 1
+COTA_SUPERIOR = 2
+
+# Parámetros de las podas
+REDUCCION_NULO = 2
+VENTANA_ASPIRACION = 25
+JUGADAS_SIN_REDUCIR = 3
+
+
+class MotorInterno:
+    """Motor alfa-beta de profundidad fija que no requiere binarios externos.
+
+    Cada técnica de poda se puede desactivar por separado para medir su
+    efecto con `benchmark()`; `nodos` cuenta los nodos de la última búsqueda.
+    Una misma instancia debe usarse durante toda la partida para que cada
+    búsqueda empiece con la información de la anterior; `nueva_partida()`
+    la reinicia.
+    """
+
+    def __init__(
+        self,
+        profundidad: int = 3,
+        tablas: Optional[TablasFinales] = None,
+        usar_tablas: bool = True,
+        usar_nulo: bool = True,
+        usar_lmr: bool = True,
+        usar_pvs: bool = True,
+        usar_aspiracion: bool = True,
+        usar_extension_jaque: bool = True,
+        tamano_tt: int = 500000,
+    ):
+        """Configura la búsqueda.
+
+        Args:
+            profundidad: Profundidad de búsqueda en plies
+            tablas: Tablas Syzygy a usar (por defecto, las del proyecto si existen)
+            usar_tablas: Si es False no se consultan tablas de finales
+            usar_nulo: Poda por movimiento nulo
+            usar_lmr: Reducción de jugadas tardías (late move reductions)
+            usar_pvs: Búsqueda de variante principal con ventana nula
+            usar_aspiracion: Ventanas de aspiración en la profundización iterativa
+            usar_extension_jaque: Extender un ply los nodos en jaque
+            tamano_tt: Número máximo de entradas de la tabla de transposición
+        """
+        self.profundidad = profundidad
+        self.tablas = (tablas or obtener_tablas()) if usar_tablas else None
+        self.usar_nulo = usar_nulo
+        self.usar_lmr = usar_lmr
+        self.usar_pvs = usar_pvs
+        self.usar_aspiracion = usar_aspiracion
+        self.usar_extension_jaque = usar_extension_jaque
+        self.tamano_tt = tamano_tt
+        # {clave_zobrist: (profundidad, valor, tipo, jugada)}
+        self.tt: Dict[int, Tuple[int, int, int, Optional["chess.Move"]]] = {}
+        # {(color, origen, destino): puntuación} para ordenar jugadas tranquilas
+        self.historial: Dict[Tuple[bool, int, int], int] = {}
+        self.killers: List[List[Optional["chess.Move"]]] = []
+        # Variante principal de la última búsqueda y clave de la posición
+        # que se espera encontrar en la siguiente (tras nuestra jugada y la respuesta)
+        self.variante_principal: List["chess.Move"] = []
+        self._clave_esperada: Optional[int] = None
+        self.nodos = 0
+
+    def disponible(self) -> bool:
+        return chess is not None
+
+    def mejor_jugada(self, fen: str) -> Optional[str]:
+        """Devuelve la mejor jugada en formato LAN (e2e4) o None si no hay."""
+        if chess is None:
+            return None
+        try:
+            board = chess.Board(fen)
+        except Exception:
+            return None
+        self.nodos = 0
+
+        if self.tablas:
+            jugada = self.tablas.mejor_jugada(fen)
+            if jugada:
+                return jugada
+
+        jugadas = list(board.legal_moves)
+        if not jugadas:
+            return None
+        self._preparar_busqueda(board)
+
+        mejor = jugadas[0]
+        valor = 0
+        inicio = 1
+        # Si la búsqueda anterior ya exploró esta posición, se parte de su
+        # profundidad, valor y mejor jugada en lugar de empezar desde 1
+        entrada = self.tt.get(chess.polyglot.zobrist_hash(board))
+        if entrada and entrada[3] is not None and board.is_legal(entrada[3]):
+            inicio = max(1, min(entrada[0], self.profundidad))
+            valor = entrada[1]
+            mejor = entrada[3]
+        for profundidad in range(inicio, self.profundidad + 1):
+            valor, jugada = self._buscar_raiz(board, profundidad, valor)
+            if jugada is not None:
+                mejor = jugada
+        self._recordar_variante(board, mejor)
+        return mejor.uci()
+
+    def nueva_partida(self):
+        """Olvida la tabla de transposición, el historial y la variante esperada."""
+        self.tt.clear()
+        self.historial.clear()
+        self.killers = []
+        self.variante_principal = []
+        self._clave_esperada = None
+
+    def _preparar_busqueda(self, board):
+        """Reutiliza el estado de la búsqueda anterior entre jugadas de la misma partida.
+
+        La tabla de transposición se conserva tal cual (las posiciones no cambian
+        de valor); el historial se envejece a la mitad. Si el rival respondió lo
+        que predecía la variante principal, los killers se desplazan dos plies
+        porque el árbol nuevo es el subárbol de la búsqueda anterior.
+        """
+        for clave in self.historial:
+            self.historial[clave] //= 2
+        tamano = self.profundidad * 2 + 8
+        if self._clave_esperada is not None and chess.polyglot.zobrist_hash(board) == self._clave_esperada:
+            self.killers = self.killers[2:]
+        else:
+            self.killers = []
+        self.killers += [[None, None] for _ in range(tamano - len(self.killers))]
+
+    def _recordar_variante(self, board, mejor):
+        """Extrae la variante principal de la TT y guarda la posición esperada tras ella."""
+        variante = [mejor]
+        board.push(mejor)
+        while len(variante) < self.profundidad:
+            jugada = self._jugada_tt(board)
+            if jugada is None or not board.is_legal(jugada):
+                break
+            variante.append(jugada)
+            board.push(jugada)
+        for _ in variante:
+            board.pop()
+        self.variante_principal = variante
+
+        self._clave_esperada = None
+        if len(variante) >= 2:
+            board.push(variante[0])
+            board.push(variante[1])
+            self._clave_esperada = chess.polyglot.zobrist_hash(board)
+            board.pop()
+            board.pop()
+
+    def _buscar_raiz(self, board, profundidad: int, valor_previo: int) -> Tuple[int, Optional["chess.Move"]]:
+        """Una iteración de la profundización, con ventana de aspiración si procede."""
+        if self.usar_aspiracion and profundidad > 1:
+            alfa = valor_previo - VENTANA_ASPIRACION
+            beta = valor_previo + VENTANA_ASPIRACION
+            valor = self._alfabeta(board, profundidad, alfa, beta, 0)
+            if alfa < valor < beta:
+                return valor, self._jugada_tt(board)
+        valor = self._alfabeta(board, profundidad, -MATE - 1, MATE + 1, 0)
+        return valor, self._jugada_tt(board)
+
+    def _jugada_tt(self, board) -> Optional["chess.Move"]:
+        entrada = self.tt.get(chess.polyglot.zobrist_hash(board))
+        return entrada[3] if entrada else None
+
+    def _alfabeta(self, board, profundidad: int, alfa: int, beta: int, ply: int, nulo_permitido: bool = True) -> int:
+        """Negamax con poda alfa-beta; el valor es relativo al bando que mueve."""
+        self.nodos += 1
+        en_jaque = board.is_check()
+        if self.usar_extension_jaque and en_jaque:
+            profundidad += 1
+
+        if ply > 0:
+            if board.is_insufficient_material() or board.halfmove_clock >= 100:
+                return 0
+            if self.tablas and self.tablas.aplicable(board):
+                wdl, _ = self.tablas.probar(board)
+                if wdl is not None:
+                    # wdl = ±1 son victorias/derrotas anuladas por la regla de 50 jugadas
+                    if wdl > 1:
+                        return VALOR_TABLAS - ply
+                    if wdl < -1:
+                        return -VALOR_TABLAS + ply
+                    return 0
+
+        clave = chess.polyglot.zobrist_hash(board)
+        entrada = self.tt.get(clave)
+        jugada_tt = None
+        if entrada:
+            prof_tt, valor_tt, tipo_tt, jugada_tt = entrada
+            if ply > 0 and prof_tt >= profundidad:
+                valor_tt = self._valor_desde_tt(valor_tt, ply)
+                if tipo_tt == EXACTO:
+                    return valor_tt
+                if tipo_tt == COTA_INFERIOR and valor_tt >= beta:
+                    return valor_tt
+                if tipo_tt == COTA_SUPERIOR and valor_tt <= alfa:
+                    return valor_tt
+
+        if profundidad <= 0:
+            if not any(board.generate_legal_moves()):
+                return -MATE + ply if en_jaque else 0
+            return self._evaluar(board)
+
+        es_pv = beta - alfa > 1
+
+        # Movimiento nulo: si pasar el turno ya supera beta, la posición está ganada de sobra
+        if (
+            self.usar_nulo and nulo_permitido and not es_pv and not en_jaque
+            and profundidad >= 3 and self._tiene_piezas(board)
+        ):
+            board.push(chess.Move.null())
+            valor = -self._alfabeta(board, profundidad - 1 - REDUCCION_NULO, -beta, -beta + 1, ply + 1, False)
+            board.pop()
+            if valor >= beta:
+                return beta
+
+        jugadas = self._ordenar_jugadas(board, jugada_tt, ply)
+        if not jugadas:
+            return -MATE + ply if en_jaque else 0
+
+        alfa_original = alfa
+        mejor_valor = -MATE - 1
+        mejor_jugada = None
+        for indice, move in enumerate(jugadas):
+            tranquila = not board.is_capture(move) and move.promotion is None
+            board.push(move)
+            if indice == 0:
+                valor = -self._alfabeta(board, profundidad - 1, -beta, -alfa, ply + 1)
+            else:
+                reduccion = 0
+                if (
+                    self.usar_lmr and tranquila and not en_jaque and indice >= JUGADAS_SIN_REDUCIR
+                    and profundidad >= 3 and not board.is_check()
+                ):
+                    reduccion = 1
+                # PVS: las jugadas tras la primera solo se comprueban con ventana nula
+                beta_prueba = alfa + 1 if self.usar_pvs else beta
+                valor = -self._alfabeta(board, profundidad - 1 - reduccion, -beta_prueba, -alfa, ply + 1)
+                if valor > alfa and reduccion:
+                    valor = -self._alfabeta(board, profundidad - 1, -beta_prueba, -alfa, ply + 1)
+                if self.usar_pvs and alfa < valor < beta:
+                    valor = -self._alfabeta(board, profundidad - 1, -beta, -alfa, ply + 1)
+            board.pop()
+
+            if valor > mejor_valor:
+                mejor_valor = valor
+                mejor_jugada = move
+            if valor > alfa:
+                alfa = valor
+            if alfa >= beta:
+                if tranquila:
+                    self._registrar_corte(board, move, profundidad, ply)
+                break
+
+        if mejor_valor <= alfa_original:
+            tipo = COTA_SUPERIOR
+        elif mejor_valor >= beta:
+            tipo = COTA_INFERIOR
+        else:
+            tipo = EXACTO
+        if len(self.tt) >= self.tamano_tt:
+            self.tt.clear()
+        self.tt[clave] = (profundidad, self._valor_hacia_tt(mejor_valor, ply), tipo, mejor_jugada)
+        return mejor_valor
+
+    def _ordenar_jugadas(self, board, jugada_tt, ply: int) -> List["chess.Move"]:
+        """Ordena: jugada de la TT, capturas (MVV-LVA), killers e historial."""
+        killers = self.killers[ply] if ply < len(self.killers) else (None, None)
+
+        def puntuacion(move) -> int:
+            if move == jugada_tt:
+                return 10_000_000
+            if board.is_capture(move):
+                victima = board.piece_type_at(move.to_square) or chess.PAWN
+                atacante = board.piece_type_at(move.from_square)
+                return 1_000_000 + VALORES_PIEZA[victima] * 10 - VALORES_PIEZA[atacante]
+            if move.promotion:
+                return 900_000
+            if move in killers:
+                return 800_000
+            return self.historial.get((board.turn, move.from_square, move.to_square), 0)
+
+        return sorted(board.legal_moves, key=puntuacion, reverse=True)
+
+    def _registrar_corte(self, board, move, profundidad: int, ply: int):
+        """Guarda una jugada tranquila que produjo corte beta (killer e historial)."""
+        if ply < len(self.killers) and self.killers[ply][0] != move:
+            self.killers[ply][1] = self.killers[ply][0]
+            self.killers[ply][0] = move
+        clave = (board.turn, move.from_square, move.to_square)
+        self.historial[clave] = self.historial.get(clave, 0) + profundidad * profundidad
+
+    def _tiene_piezas(self, board) -> bool:
+        """Indica si el bando que mueve tiene piezas además de rey y peones (evita zugzwang)."""
+        propias = board.occupied_co[board.turn]
+        return bool(propias & ~(board.pawns | board.kings))
+
+    @staticmethod
+    def _valor_hacia_tt(valor: int, ply: int) -> int:
+        if valor > UMBRAL_MATE:
+            return valor + ply
+        if valor < -UMBRAL_MATE:
+            return valor - ply
+        return valor
+
+    @staticmethod
+    def _valor_desde_tt(valor: int, ply: int) -> int:
+        if valor > UMBRAL_MATE:
+            return valor - ply
+        if valor < -UMBRAL_MATE:
+            return valor + ply
+        return valor
+
+    def _evaluar(self, board) -> int:
+        """Balance material desde el punto de vista del bando que mueve."""
+        valor = 0
+        for tipo, puntos in VALORES_PIEZA.items():
+            valor += puntos * (
+                len(board.pieces(tipo, chess.WHITE)) - len(board.pieces(tipo, chess.BLACK))
+            )
+        return valor if board.turn == chess.WHITE else -valor
+
+    def cerrar(self):
+        """Sin recursos externos que liberar; se mantiene por simetría con MotorUCI."""
+        pass
+
+
+# Posiciones de referencia para el benchmark (apertura, medio juego y final)
+POSICIONES_BENCHMARK = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+]
+
+
+def benchmark(profundidad: int = 4, posiciones: Optional[List[str]] = None) -> Dict[str, Tuple[int, float]]:
+    """Mide nodos y tiempo con todas las técnicas, sin ninguna y sin cada una.
+
+    Returns:
+        {nombre_configuración: (nodos_totales, segundos)}
+    """
+    posiciones = posiciones or POSICIONES_BENCHMARK
+    tecnicas = ["usar_nulo", "usar_lmr", "usar_pvs", "usar_aspiracion", "usar_extension_jaque"]
+    configuraciones = {"todas": {}, "ninguna": {t: False for t in tecnicas}}
+    for tecnica in tecnicas:
+        configuraciones[f"sin {tecnica[5:]}"] = {tecnica: False}
+
+    resultados = {}
+    for nombre, opciones in configuraciones.items():
+        motor = MotorInterno(profundidad=profundidad, usar_tablas=False, **opciones)
+        nodos = 0
+        inicio = time.perf_counter()
+        for fen in posiciones:
+            motor.nueva_partida()
+            motor.mejor_jugada(fen)
+            nodos += motor.nodos
+        segundos = time.perf_counter() - inicio
+        resultados[nombre] = (nodos, segundos)
+        print(f"{nombre:<24} nodos={nodos:>9}  tiempo={segundos:7.2f}s  nps={nodos / max(segundos, 1e-9):9.0f}")
+    return resultados
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark de nodos del motor interno")
+    parser.add_argument("--profundidad", type=int, default=4)
+    args = parser.parse_args()
+    benchmark(args.profundidad)
@@ -0,0 +1,459 @@
+"""Prueba de carga del servidor LAN con miles de clientes simulados.
+
+Responsabilidades:
+- Levantar `servidor_partidas.ServidorPartidas` en local en su propio proceso
+  y medir su consumo de CPU justo antes y justo después de la prueba, y su
+  memoria durante toda ella
+- Repartir miles de clientes (mismo protocolo que `lan.ClienteAjedrez`) entre
+  unos pocos procesos, cada uno con su propio `lan.BucleRed`
+- Reproducir las jugadas de partidas guardadas (archivo de
+  `archivo_partidas` o PGN) al ritmo indicado
+- Informar de la latencia de retransmisión (p50/p99), las jugadas por segundo
+  y el consumo del servidor
+
+La latencia de una jugada es el tiempo desde que un cliente la envía hasta que
+su rival la recibe, pasando por la validación del servidor. Emisor y receptor
+pueden estar en procesos distintos: se mide con `time.perf_counter`, cuyo
+origen es común a todos los procesos del equipo en Linux y Windows.
+
+Uso:
+    python prueba_carga.py --archivo partidas.bin [--clientes 2000] [--procesos 4]
+    python prueba_carga.py --pgn partidas.pgn [--ritmo 2] [--plies 80] [--partidas 500]
+"""
+from typing import Optional, Dict, List, Tuple
+import argparse
+import math
+import multiprocessing
+import os
+import queue
+import socket
+import threading
+import time
+
+try:
+    import chess
+except Exception:
+    chess = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from lan import BucleRed, Conexion
+from codificacion_partidas import codificar_san, jugadas_chess
+
+# Cada cuánto toma el servidor una muestra de memoria (segundos)
+INTERVALO_MUESTREO = 0.5
+
+# (partida, ply) -> instante en `time.perf_counter`
+Marcas = Dict[Tuple[int, int], float]
+
+
+def cargar_partidas(archivo: Optional[str] = None, pgn: Optional[str] = None, maximo: int = 1000,
+                    max_plies: int = 0) -> List[bytes]:
+    """Lee las partidas a reproducir en la codificación de 16 bits por jugada.
+
+    Cada partida se corta antes de la primera coronación que no sea a dama,
+    porque el protocolo LAN no transmite la pieza y el servidor corona siempre
+    a dama. Requiere python-chess.
+
+    Args:
+        archivo: Archivo de partidas mapeado (`archivo_partidas.ArchivoPartidas`)
+        pgn: Archivo PGN (alternativa a `archivo`)
+        maximo: Número máximo de partidas a cargar
+        max_plies: Plies máximos por partida (0 = completas)
+
+    Returns:
+        Lista de partidas codificadas (sin las vacías)
+    """
+    codificadas: List[bytes] = []
+    if archivo:
+        from archivo_partidas import ArchivoPartidas
+        partidas = ArchivoPartidas(archivo)
+        for jugadas, _ in partidas.iterar(hasta=maximo):
+            codificadas.append(bytes(jugadas))
+            jugadas.release()
+        partidas.cerrar()
+    elif pgn:
+        from base_partidas import iterar_pgn
+        for cabeceras, movetext in iterar_pgn(pgn):
+            if len(codificadas) >= maximo:
+                break
+            # Las partidas desde una posición no sirven: el servidor empieza siempre desde la inicial
+            if "FEN" in cabeceras:
+                continue
+            datos = codificar_san(movetext)
+            if datos:
+                codificadas.append(datos)
+
+    resultado = []
+    for datos in codificadas:
+        plies = 0
+        for move in jugadas_chess(datos):
+            if move.promotion not in (None, chess.QUEEN) or (max_plies and plies >= max_plies):
+                break
+            plies += 1
+        if plies:
+            resultado.append(datos[:2 * plies])
+    return resultado
+
+
+def _tramas(datos: bytes) -> List[bytes]:
+    """Tramas de `lan.Conexion` de cada jugada, codificadas una sola vez por proceso."""
+    return [
+        Conexion.codificar({
+            "tipo": "movimiento",
+            "origen": [chess.square_file(move.from_square), chess.square_rank(move.from_square)],
+            "destino": [chess.square_file(move.to_square), chess.square_rank(move.to_square)],
+        })
+        for move in jugadas_chess(datos)
+    ]
+
+
+def _elevar_limite_descriptores():
+    """Sube el límite de sockets abiertos del proceso hasta el máximo permitido."""
+    if resource is None:
+        return
+    try:
+        _, maximo = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (maximo, maximo))
+    except (ValueError, OSError):
+        pass
+
+
+def _memoria_residente() -> Optional[int]:
+    """Memoria residente del proceso en bytes (None si el sistema no la expone)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _memoria_maxima() -> Optional[int]:
+    """Pico de memoria residente del proceso en bytes, según el sistema."""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KiB; macOS, en bytes
+    return pico if os.uname().sysname == "Darwin" else pico * 1024
+
+
+class ClienteCarga:
+    """Cliente sin interfaz que reproduce una partida guardada.
+
+    La partida se elige por el id que asigna el servidor, de modo que los dos
+    rivales reproducen la misma. Registra cuándo envía cada jugada propia y
+    cuándo recibe cada jugada del rival.
+    """
+
+    def __init__(self, bucle: BucleRed, direccion: Tuple[str, int], partidas: List[List[bytes]],
+                 pausa: float, enviadas: Marcas, recibidas: Marcas, al_terminar):
+        self.bucle = bucle
+        self.partidas = partidas
+        self.pausa = pausa
+        self.enviadas = enviadas
+        self.recibidas = recibidas
+        self.al_terminar = al_terminar
+        self.tramas: List[bytes] = []
+        self.partida = None
+        self.ply = 0
+        self.rechazos = 0
+        self.terminado = False
+        self.conexion: Optional[Conexion] = None
+        sock = socket.create_connection(direccion)
+        # Se registra en el hilo del bucle: así ningún mensaje llega antes de asignar self.conexion
+        bucle.llamar(lambda: self._conectar(sock))
+
+    def _conectar(self, sock: socket.socket):
+        self.conexion = Conexion(sock, self._al_recibir, self._al_cerrar, self.bucle)
+
+    def _al_recibir(self, mensaje: Dict):
+        tipo = mensaje.get("tipo")
+        if tipo == "inicio":
+            self.partida = mensaje["partida"]
+            self.tramas = self.partidas[self.partida % len(self.partidas)]
+            if mensaje["color"] == "blanco":
+                self._siguiente()
+        elif tipo == "movimiento":
+            self.recibidas[(self.partida, self.ply)] = time.perf_counter()
+            self.ply += 1
+            self._siguiente()
+        elif tipo == "rechazo":
+            # La partida guardada ya no coincide con la del servidor: abandonar
+            self.rechazos += 1
+            self.conexion.cerrar()
+        elif tipo == "fin":
+            self.conexion.cerrar()
+
+    def _siguiente(self):
+        if self.pausa > 0:
+            self.bucle.programar(self.pausa, self._jugar)
+        else:
+            self._jugar()
+
+    def _jugar(self):
+        if not self.conexion.abierta:
+            return
+        if self.ply >= len(self.tramas):
+            # Fin de la partida guardada: abandonar para liberar la partida en el servidor
+            self.conexion.cerrar()
+            return
+        self.enviadas[(self.partida, self.ply)] = time.perf_counter()
+        self.conexion.enviar_bytes(self.tramas[self.ply])
+        self.ply += 1
+
+    def _al_cerrar(self):
+        if not self.terminado:
+            self.terminado = True
+            self.al_terminar(self)
+
+
+def _proceso_clientes(clientes: int, direccion: Tuple[str, int], partidas: List[bytes], pausa: float,
+                      tiempo_maximo: float, listos, arrancar, resultados):
+    """Ejecuta `clientes` clientes de carga en este proceso hasta que terminen todos.
+
+    Avisa por `listos` cuando ha preparado las tramas y espera a `arrancar`
+    para empezar a la vez que los demás procesos; el resumen va a `resultados`.
+    """
+    _elevar_limite_descriptores()
+    tramas = [_tramas(datos) for datos in partidas]
+    bucle = BucleRed()
+    enviadas: Marcas = {}
+    recibidas: Marcas = {}
+    cerrojo = threading.Lock()
+    terminados: List[ClienteCarga] = []
+    todos_terminados = threading.Event()
+
+    def al_terminar(cliente):
+        with cerrojo:
+            terminados.append(cliente)
+            if len(terminados) == clientes:
+                todos_terminados.set()
+
+    listos.put(True)
+    arrancar.wait()
+    inicio = time.perf_counter()
+    simulados = []
+    errores_conexion = 0
+    for _ in range(clientes):
+        try:
+            simulados.append(ClienteCarga(bucle, direccion, tramas, pausa, enviadas, recibidas, al_terminar))
+        except OSError:
+            errores_conexion += 1
+            al_terminar(None)
+    completado = todos_terminados.wait(tiempo_maximo)
+    fin = time.perf_counter()
+    # Las marcas se copian en el hilo del bucle, que es quien las modifica
+    copia = threading.Event()
+    marcas: List[Marcas] = []
+    bucle.llamar(lambda: (marcas.extend((dict(enviadas), dict(recibidas))), copia.set()))
+    copia.wait(5.0)
+    for cliente in simulados:
+        if cliente.conexion:
+            cliente.conexion.cerrar()
+    resultados.put({
+        "inicio": inicio,
+        "fin": fin,
+        "completado": completado,
+        "enviadas": marcas[0] if marcas else {},
+        "recibidas": marcas[1] if marcas else {},
+        "rechazos": sum(c.rechazos for c in simulados),
+        "errores_conexion": errores_conexion,
+    })
+
+
+def _proceso_servidor(puerto: int, extremo):
+    """Ejecuta el servidor y atiende por `extremo` las peticiones de medida.
+
+    Responde a "muestra" con el instante y el tiempo de CPU del proceso, y a
+    "parar" con las estadísticas y la memoria máxima antes de terminar. Entre
+    peticiones muestrea la memoria residente cada `INTERVALO_MUESTREO`.
+    """
+    from servidor_partidas import ServidorPartidas
+    _elevar_limite_descriptores()
+    servidor = ServidorPartidas(puerto=puerto, anunciar=False)
+    if not servidor.iniciar():
+        extremo.send(False)
+        return
+    extremo.send(True)
+    memoria = _memoria_residente() or 0
+    while True:
+        if extremo.poll(INTERVALO_MUESTREO):
+            if extremo.recv() == "parar":
+                break
+            extremo.send((time.perf_counter(), time.process_time()))
+        memoria = max(memoria, _memoria_residente() or 0)
+    servidor.cerrar()
+    extremo.send({
+        "estadisticas": dict(servidor.estadisticas),
+        "memoria_maxima": memoria or _memoria_maxima() or 0,
+    })
+
+
+def _percentil(ordenados: List[float], p: float) -> float:
+    """Percentil p (0-100) por rango más cercano de una lista ya ordenada."""
+    if not ordenados:
+        return 0.0
+    # Rango ceil(p/100 * n), de 1 a n. round(x + 0.5) no sirve: redondea al par
+    indice = max(0, min(len(ordenados) - 1, math.ceil(p / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+def _consumo_entre(antes: Tuple[float, float], despues: Tuple[float, float]) -> Optional[float]:
+    """Porcentaje de un núcleo usado por el servidor entre dos muestras (None si no son medibles)."""
+    if despues[0] <= antes[0]:
+        return None
+    return 100.0 * (despues[1] - antes[1]) / (despues[0] - antes[0])
+
+
+def prueba_carga(partidas: List[bytes], clientes: int = 2000, procesos: int = 4, ritmo: float = 0.0,
+                 puerto: int = 18980, tiempo_maximo: float = 300.0) -> Dict:
+    """Lanza el servidor y los procesos de clientes y reúne los resultados.
+
+    Args:
+        partidas: Partidas codificadas a reproducir (ver `cargar_partidas`)
+        clientes: Número total de clientes (se redondea a par: se juega por parejas)
+        procesos: Procesos entre los que se reparten los clientes
+        ritmo: Jugadas por segundo de cada cliente (0 = responder sin pausa)
+        puerto: Puerto local del servidor
+        tiempo_maximo: Segundos máximos de espera por los clientes
+
+    Returns:
+        Resumen con latencias en milisegundos, jugadas por segundo y consumo
+        del servidor (vacío si el servidor no arranca; la CPU es None si no
+        se pudo medir)
+    """
+    if chess is None:
+        print("python-chess no está instalado: no se pueden reproducir partidas")
+        return {}
+    if not partidas:
+        print("No hay partidas que reproducir")
+        return {}
+    clientes += clientes % 2
+    procesos = max(1, min(procesos, clientes))
+    pausa = 1.0 / ritmo if ritmo > 0 else 0.0
+    contexto = multiprocessing.get_context("spawn")
+
+    padre, hijo = contexto.Pipe()
+    servidor = contexto.Process(target=_proceso_servidor, args=(puerto, hijo), daemon=True)
+    servidor.start()
+    try:
+        arrancado = padre.poll(30.0) and padre.recv()
+    except EOFError:
+        arrancado = False
+    if not arrancado:
+        print("El servidor no arrancó a tiempo")
+        servidor.terminate()
+        return {}
+
+    reparto = [clientes // procesos + (1 if i < clientes % procesos else 0) for i in range(procesos)]
+    listos, arrancar, resultados = contexto.Queue(), contexto.Event(), contexto.Queue()
+    trabajadores = [
+        contexto.Process(
+            target=_proceso_clientes,
+            args=(n, ("127.0.0.1", puerto), partidas, pausa, tiempo_maximo, listos, arrancar, resultados),
+            daemon=True,
+        )
+        for n in reparto
+    ]
+    for trabajador in trabajadores:
+        trabajador.start()
+    parciales = []
+    antes = despues = (0.0, 0.0)
+    medidas = None
+    try:
+        for _ in trabajadores:
+            listos.get(timeout=60.0)
+        # El consumo del servidor se mide justo antes de que arranquen los
+        # clientes y justo después de que terminen, no a intervalos fijos
+        padre.send("muestra")
+        antes = padre.recv()
+        arrancar.set()
+        for _ in trabajadores:
+            parciales.append(resultados.get(timeout=tiempo_maximo + 60.0))
+        padre.send("muestra")
+        despues = padre.recv()
+    except queue.Empty:
+        print("Algún proceso de clientes no respondió a tiempo")
+    except (EOFError, OSError):
+        print("El servidor terminó durante la prueba")
+    finally:
+        for trabajador in trabajadores:
+            trabajador.join(10.0)
+            if trabajador.is_alive():
+                trabajador.terminate()
+        # Si el servidor ya murió, que no tape el error original
+        try:
+            padre.send("parar")
+            medidas = padre.recv()
+        except (EOFError, OSError):
+            pass
+        servidor.join(10.0)
+    if medidas is None or len(parciales) < len(trabajadores):
+        return {}
+
+    enviadas: Marcas = {}
+    recibidas: Marcas = {}
+    for parcial in parciales:
+        enviadas.update(parcial["enviadas"])
+        recibidas.update(parcial["recibidas"])
+    latencias = sorted(
+        (t - enviadas[clave]) * 1000.0 for clave, t in recibidas.items() if clave in enviadas
+    )
+    inicio = min(p["inicio"] for p in parciales)
+    fin = max(p["fin"] for p in parciales)
+    duracion = fin - inicio
+    estadisticas = medidas["estadisticas"]
+
+    return {
+        "clientes": clientes,
+        "procesos": procesos,
+        "partidas_distintas": len(partidas),
+        "completado": all(p["completado"] for p in parciales),
+        "errores_conexion": sum(p["errores_conexion"] for p in parciales),
+        "duracion": duracion,
+        "jugadas": estadisticas["jugadas"],
+        "jugadas_por_segundo": estadisticas["jugadas"] / duracion if duracion else 0.0,
+        "rechazadas": estadisticas["rechazadas"],
+        "rechazos_en_clientes": sum(p["rechazos"] for p in parciales),
+        "latencia_p50_ms": _percentil(latencias, 50),
+        "latencia_p99_ms": _percentil(latencias, 99),
+        "latencia_max_ms": latencias[-1] if latencias else 0.0,
+        "jugadas_medidas": len(latencias),
+        "cpu_servidor_pct": _consumo_entre(antes, despues),
+        "memoria_servidor_mb": medidas["memoria_maxima"] / 2 ** 20,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del servidor LAN de partidas")
+    origen = parser.add_mutually_exclusive_group(required=True)
+    origen.add_argument("--archivo", help="Archivo de partidas mapeado (archivo_partidas.py)")
+    origen.add_argument("--pgn", help="Archivo PGN con las partidas a reproducir")
+    parser.add_argument("--clientes", type=int, default=2000, help="Clientes simulados en total")
+    parser.add_argument("--procesos", type=int, default=min(4, os.cpu_count() or 1),
+                        help="Procesos entre los que se reparten los clientes")
+    parser.add_argument("--ritmo", type=float, default=0.0,
+                        help="Jugadas por segundo de cada cliente (0 = sin pausa)")
+    parser.add_argument("--plies", type=int, default=0, help="Plies máximos por partida (0 = completas)")
+    parser.add_argument("--partidas", type=int, default=1000, help="Partidas distintas a cargar")
+    parser.add_argument("--puerto", type=int, default=18980)
+    parser.add_argument("--tiempo-maximo", type=float, default=300.0)
+    args = parser.parse_args()
+
+    if chess is None:
+        print("python-chess no está instalado: no se pueden reproducir partidas")
+        return
+    partidas = cargar_partidas(args.archivo, args.pgn, args.partidas, args.plies)
+    resumen = prueba_carga(partidas, args.clientes, args.procesos, args.ritmo, args.puerto, args.tiempo_maximo)
+    for clave, valor in resumen.items():
+        if valor is None:
+            print(f"{clave}: n/a")
+        else:
+            print(f"{clave}: {valor:.1f}" if isinstance(valor, float) else f"{clave}: {valor}")
+
+
+if __name__ == "__main__":
+    main()
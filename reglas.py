@@ -4,6 +4,8 @@ Responsabilidades:
 - Conversión entre el modelo Tablero y FEN (python-chess)
 - Aplicación de movimientos en formato LAN (e2e4)
 - Wrapper de motores UCI (Stockfish, LCZero) para obtener mejores jugadas
+- Consulta del libro de aperturas Polyglot antes de llamar a los motores
+- Consulta de tablas Syzygy en finales con pocas piezas
 """
 from typing import Optional, Tuple, Dict
 import os
@@ -20,10 +22,15 @@ except Exception:
 from modelos import Color, TipoPieza
 from ajedrez_clasico import Pieza
 from apis import chess_api
+from libro_aperturas import obtener_libro
+from tablas_finales import obtener_tablas
+from motor_interno import MotorInterno
 
-def tablero_a_fen(casillas: Dict[Tuple[int, int], Optional[Pieza]], turno: Color) -> str:
+def tablero_a_fen(casillas: Dict[Tuple[int, int], Optional[Pieza]], turno: Color, con_enroques: bool = False) -> str:
     """Convierte el diccionario de casillas a FEN estándar.
     Nota: Asume (0,0) en la esquina superior-izquierda y filas 0..7 de arriba a abajo.
+    Con `con_enroques` se deducen los derechos de enroque de reyes y torres que
+    no se han movido (necesario para que la clave Zobrist coincida con el libro).
     """
     filas = []
     for y in range(7, -1, -1):  # de fila 7 (abajo) a 0 (arriba) para FEN 8..1
@@ -55,8 +62,24 @@ def tablero_a_fen(casillas: Dict[Tuple[int, int], Optional[Pieza]], turno: Color
         filas.append(fila_fen)
     fen_pos = "/".join(filas)
     turno_char = "w" if turno == Color.BLANCO else "b"
-    # Sin enroques, sin peón al paso, contadores en 0
-    return f"{fen_pos} {turno_char} - - 0 1"
+    enroques = _derechos_enroque(casillas) if con_enroques else "-"
+    # Sin peón al paso, contadores en 0
+    return f"{fen_pos} {turno_char} {enroques} - 0 1"
+
+def _derechos_enroque(casillas: Dict[Tuple[int, int], Optional[Pieza]]) -> str:
+    """Deduce los derechos de enroque (KQkq) según piezas sin mover en su casilla inicial."""
+    def sin_mover(pos: Tuple[int, int], color: Color, tipo: TipoPieza) -> bool:
+        p = casillas.get(pos)
+        return bool(p) and p.color == color and p.tipo == tipo and p.movimientos == 0
+    derechos = ""
+    for fila, color, letras in ((0, Color.BLANCO, "KQ"), (7, Color.NEGRO, "kq")):
+        if not sin_mover((4, fila), color, TipoPieza.REY):
+            continue
+        if sin_mover((7, fila), color, TipoPieza.TORRE):
+            derechos += letras[0]
+        if sin_mover((0, fila), color, TipoPieza.TORRE):
+            derechos += letras[1]
+    return derechos or "-"
 
 def aplicar_movimiento_lan(casillas: Dict[Tuple[int, int], Optional[Pieza]], lan: str) -> bool:
     """Aplica un movimiento tipo 'e2e4' en el diccionario de casillas."""
@@ -108,7 +131,28 @@ class MotorUCI:
             return uci
         except Exception:
             return None
-    
+
+    def analizar(self, fen: str, profundidad: Optional[int] = None) -> Optional[Tuple[Optional[int], Optional[int]]]:
+        """Evalúa la posición; devuelve (centipeones, mate) desde el punto de vista de las blancas.
+
+        Usa `profundidad` si se indica y, si no, el tiempo del motor. Solo uno de
+        los dos valores es distinto de None.
+        """
+        if not self.engine or chess is None:
+            return None
+        try:
+            board = chess.Board(fen)
+            if profundidad:
+                limite = chess.engine.Limit(depth=profundidad)
+            else:
+                limite = chess.engine.Limit(time=self.tiempo_ms/1000.0)
+            puntuacion = self.engine.analyse(board, limite)["score"].white()
+            if puntuacion.is_mate():
+                return None, puntuacion.mate()
+            return puntuacion.score(), None
+        except Exception:
+            return None
+
     def cerrar(self):
         try:
             if self.engine:
@@ -206,16 +250,46 @@ def sugerir_movimiento(
     turno: Color,
     motor: str = "stockfish",
     nivel: str = "medio",
-    ruta_motor: Optional[str] = None
+    ruta_motor: Optional[str] = None,
+    usar_libro: bool = True,
+    ruta_libro: Optional[str] = None,
+    usar_tablas: bool = True,
+    directorio_tablas: Optional[str] = None,
+    motor_interno: Optional[MotorInterno] = None
 ) -> Optional[str]:
     """Devuelve la mejor jugada LAN usando motor local o API externa.
 
+    Antes de llamar al motor se consulta el libro de aperturas Polyglot y,
+    en finales con pocas piezas, las tablas Syzygy (si existen); en ambos
+    casos la jugada se responde sin gastar tiempo de motor.
+
     Motores soportados:
     - "stockfish": Motor UCI local
+    - "interno": Motor alfa-beta propio (motor_interno.py)
     - "chess-api": Chess-API.com (remoto)
     - "chess-com": Chess.com (no implementado aún)
+
+    Con motor "interno" conviene pasar la misma instancia de `MotorInterno`
+    durante toda la partida (`motor_interno`) para que reutilice la tabla de
+    transposición y la variante principal de la jugada anterior.
     """
-    if motor == "chess-api":
+    if usar_libro:
+        libro = obtener_libro(ruta_libro)
+        if libro:
+            jugada = libro.jugada(tablero_a_fen(casillas, turno, con_enroques=True))
+            if jugada:
+                return jugada
+
+    tablas = obtener_tablas(directorio_tablas) if usar_tablas else None
+    if tablas:
+        jugada = tablas.mejor_jugada(tablero_a_fen(casillas, turno))
+        if jugada:
+            return jugada
+
+    if motor == "interno":
+        m = motor_interno or crear_motor_interno(nivel, tablas=tablas, usar_tablas=usar_tablas)
+        return m.mejor_jugada(tablero_a_fen(casillas, turno))
+    elif motor == "chess-api":
         return _sugerir_movimiento_api(casillas, turno, nivel)
     else:
         # Motor local
@@ -238,17 +312,48 @@ def sugerir_movimiento(
         return jugada
 
 
+def crear_motor_interno(nivel: str = "medio", tablas=None, usar_tablas: bool = True) -> MotorInterno:
+    """Crea el motor interno con la profundidad correspondiente al nivel."""
+    niveles_profundidad = {"facil": 2, "medio": 3, "dificil": 4}
+    return MotorInterno(profundidad=niveles_profundidad.get(nivel, 3), tablas=tablas, usar_tablas=usar_tablas)
+
+
+def _respaldo_local(fen: str) -> Optional[Dict]:
+    """Búsqueda local de cobertura cuando Chess-API.com tarda más de lo habitual.
+
+    Usa Stockfish si está instalado y, si no, el motor interno. Devuelve el
+    resultado con la misma forma que Chess-API.com ({"move": "e2e4"}).
+    """
+    ruta = _ruta_motor_por_defecto("stockfish")
+    jugada = None
+    if ruta:
+        m = MotorUCI(ruta, tiempo_ms=500)
+        if m.disponible():
+            jugada = m.mejor_jugada(fen)
+        m.cerrar()
+    if jugada is None:
+        jugada = MotorInterno(profundidad=3).mejor_jugada(fen)
+    return {"move": jugada, "origen": "local"} if jugada else None
+
+
 def _sugerir_movimiento_api(
     casillas: Dict[Tuple[int, int], Optional[Pieza]],
     turno: Color,
-    nivel: str = "medio"
+    nivel: str = "medio",
+    cobertura_local: bool = True
 ) -> Optional[str]:
-    """Obtiene sugerencia de movimiento usando Chess-API.com."""
+    """Obtiene sugerencia de movimiento usando Chess-API.com.
+
+    Con `cobertura_local`, si la API tarda más que su latencia habitual se
+    lanza también una búsqueda local y se usa la primera respuesta.
+    """
     niveles_depth = {"facil": 8, "medio": 12, "dificil": 16}
     depth = niveles_depth.get(nivel, 12)
 
     fen = tablero_a_fen(casillas, turno)
-    resultado = chess_api.analizar_posicion(fen, depth=depth, variants=1)
+    resultado = chess_api.analizar_posicion(
+        fen, depth=depth, variants=1, respaldo=_respaldo_local if cobertura_local else None
+    )
 
     if resultado and 'move' in resultado:
         # Chess-API.com devuelve movimiento en formato UCI (e2e4)
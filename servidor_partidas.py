@@ -0,0 +1,563 @@
+"""Servidor LAN sin interfaz que aloja muchas partidas simultáneas.
+
+Responsabilidades:
+- Aceptar cualquier número de clientes en el bucle de red compartido (`lan.BucleRed`)
+- Emparejar a los clientes según llegan (el primero juega con blancas)
+- Mantener el estado de cada partida y validar cada jugada con python-chess
+  antes de reenviarla al rival (el servidor es la autoridad)
+- Llevar el reloj de cada partida (`lan.RelojPartida`) y decidir la bandera
+- Canal de espectadores (otro puerto): cada jugada se codifica una vez y se
+  reparte a todos los observadores; los lentos se resincronizan con una
+  posición o se desconectan, sin frenar nunca a los jugadores
+- Prueba de estrés: simular N clientes que juegan contra el servidor
+
+Protocolo (tramas de `lan.Conexion`, compatible con `lan.ClienteAjedrez`):
+    servidor → cliente  {"tipo": "inicio", "partida": id, "color": "blanco" | "negro"}
+    ambos sentidos      {"tipo": "movimiento", "origen": [x, y], "destino": [x, y]}
+    servidor → cliente  {"tipo": "reloj", ...} al empezar y tras cada jugada (ver `lan.RelojPartida`)
+    servidor → cliente  {"tipo": "tiempo_agotado", "color": "blanco" | "negro"}
+    servidor → cliente  {"tipo": "rechazo", "motivo": str} seguido del reloj (la jugada no cuenta)
+    servidor → cliente  {"tipo": "fin", "resultado": "1-0" | "0-1" | "1/2-1/2", "motivo": str}
+    cliente → servidor  {"tipo": "ping", "t": ms}, respondido con {"tipo": "pong", "t": ms}
+
+Espectadores (puerto de juego + 1):
+    espectador → servidor  {"tipo": "partidas"}
+    servidor → espectador  {"tipo": "partidas", "partidas": [{"id", "ply", "espectadores"}, ...]}
+    espectador → servidor  {"tipo": "observar", "partida": id}
+    servidor → espectador  {"tipo": "posicion", "partida": id, "fen": str, "ply": n}
+    servidor → espectador  movimientos y "fin" como a los jugadores
+
+Uso:
+    python servidor_partidas.py [--puerto 8880]
+    python servidor_partidas.py --estres 200 [--plies 60] [--espectadores 500]
+"""
+from typing import Optional, Dict, List, Set
+import argparse
+import itertools
+import random
+import selectors
+import socket
+import threading
+import time
+
+try:
+    import chess
+except Exception:
+    chess = None
+
+from lan import BucleRed, Conexion, AnunciadorServidor, RelojPartida, bucle_red, obtener_ip_local, PUERTO_JUEGO
+from modelos import Color
+
+PUERTO_ESPECTADORES = PUERTO_JUEGO + 1
+# Bytes encolados por espectador a partir de los cuales se le omiten jugadas
+# (se resincroniza con una posición al recuperarse)
+COLA_DESFASE_ESPECTADOR = 16 * 1024
+# Veces seguidas que un espectador puede quedarse atrás antes de desconectarlo;
+# la racha se rompe tras recibir JUGADAS_RECUPERACION jugadas sin retrasarse
+DESFASES_MAXIMOS_ESPECTADOR = 3
+JUGADAS_RECUPERACION = 32
+
+
+class Partida:
+    """Estado de una partida alojada en el servidor."""
+
+    def __init__(self, id_partida: int, blancas: Conexion, negras: Conexion):
+        self.id = id_partida
+        self.blancas = blancas
+        self.negras = negras
+        self.board = chess.Board()
+        self.reloj = RelojPartida()
+        # Temporizador de la bandera del jugador que tiene el turno
+        self.vigilancia: Optional[list] = None
+        self.terminada = False
+        self.espectadores: Set[Conexion] = set()
+        # Espectadores a los que se omitieron jugadas por ir retrasados
+        self.desfasados: Set[Conexion] = set()
+        # Racha de retrasos de cada espectador: [veces seguidas, jugadas al día desde el último]
+        self.rachas: Dict[Conexion, List[int]] = {}
+
+    def rival(self, conexion: Conexion) -> Conexion:
+        return self.negras if conexion is self.blancas else self.blancas
+
+    def color_de(self, conexion: Conexion) -> bool:
+        return chess.WHITE if conexion is self.blancas else chess.BLACK
+
+
+def _movimiento_desde_coordenadas(board, origen, destino):
+    """Jugada legal de python-chess para unas coordenadas (x, y) del tablero interno, o None.
+
+    El protocolo no indica la pieza de coronación: se corona a dama.
+    """
+    move = chess.Move(chess.square(origen[0], origen[1]), chess.square(destino[0], destino[1]))
+    if move in board.legal_moves:
+        return move
+    move.promotion = chess.QUEEN
+    return move if move in board.legal_moves else None
+
+
+class ServidorPartidas:
+    """Servidor de partidas concurrentes sin interfaz gráfica.
+
+    Todo el estado se modifica en el hilo del bucle de red, por lo que no
+    hacen falta cerrojos entre partidas.
+    """
+
+    def __init__(self, puerto: int = PUERTO_JUEGO, bucle: Optional[BucleRed] = None, anunciar: bool = True,
+                 puerto_espectadores: Optional[int] = None):
+        """Prepara el servidor.
+
+        Args:
+            puerto: Puerto TCP de escucha
+            bucle: Bucle de red (por defecto, el compartido del proceso)
+            anunciar: Anunciar el servidor en la LAN como `ServidorAjedrez`
+            puerto_espectadores: Puerto del canal de espectadores (por defecto, puerto + 1)
+        """
+        self.puerto = puerto
+        self.puerto_espectadores = puerto + 1 if puerto_espectadores is None else puerto_espectadores
+        self.bucle = bucle or bucle_red
+        self.anunciar = anunciar
+        self.socket_servidor: Optional[socket.socket] = None
+        self.socket_espectadores: Optional[socket.socket] = None
+        self.anunciador: Optional[AnunciadorServidor] = None
+        self.partidas: Dict[int, Partida] = {}
+        self._partida_de: Dict[Conexion, Partida] = {}
+        self._observa: Dict[Conexion, Partida] = {}
+        self._esperando: Optional[Conexion] = None
+        self._ids = itertools.count(1)
+        self.estadisticas = {
+            "conexiones": 0, "partidas_terminadas": 0, "jugadas": 0, "rechazadas": 0,
+            "espectadores": 0, "envios_espectadores": 0, "espectadores_desfasados": 0,
+            "espectadores_descartados": 0,
+        }
+
+    @staticmethod
+    def _escuchar(puerto: int) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(('0.0.0.0', puerto))
+        sock.listen(socket.SOMAXCONN)
+        sock.setblocking(False)
+        return sock
+
+    def iniciar(self) -> bool:
+        if chess is None:
+            print("python-chess no está instalado: el servidor no puede validar jugadas")
+            return False
+        try:
+            self.socket_servidor = self._escuchar(self.puerto)
+            self.socket_espectadores = self._escuchar(self.puerto_espectadores)
+            self.bucle.registrar(self.socket_servidor, selectors.EVENT_READ, self._aceptar)
+            self.bucle.registrar(self.socket_espectadores, selectors.EVENT_READ, self._aceptar_espectadores)
+            if self.anunciar:
+                self.anunciador = AnunciadorServidor(obtener_ip_local(), self.puerto, self._carga)
+                self.anunciador.iniciar_anuncios()
+            print(f"Servidor de partidas escuchando en el puerto {self.puerto} "
+                  f"(espectadores en el {self.puerto_espectadores})")
+            return True
+        except Exception as e:
+            print(f"Error al iniciar servidor: {e}")
+            return False
+
+    def _carga(self) -> Dict:
+        """Carga anunciada en la LAN (ver `lan.ServicioDescubrimiento`)."""
+        return {"libre": True, "partidas": len(self.partidas), "espectadores": len(self._observa)}
+
+    def _aceptar(self, sock, mascara):
+        # Aceptar todas las conexiones pendientes de una vez
+        while True:
+            try:
+                cliente, _ = sock.accept()
+            except (BlockingIOError, OSError):
+                return
+            conexion = Conexion(cliente, None, None, self.bucle)
+            # Estamos en el hilo del bucle: no llegará ningún evento antes de asignar los callbacks
+            conexion.al_recibir = lambda mensaje, c=conexion: self._al_recibir(c, mensaje)
+            conexion.al_cerrar = lambda c=conexion: self._al_cerrar(c)
+            self.estadisticas["conexiones"] += 1
+            self._emparejar(conexion)
+
+    def _aceptar_espectadores(self, sock, mascara):
+        while True:
+            try:
+                cliente, _ = sock.accept()
+            except (BlockingIOError, OSError):
+                return
+            conexion = Conexion(cliente, None, None, self.bucle)
+            conexion.al_recibir = lambda mensaje, c=conexion: self._al_recibir_espectador(c, mensaje)
+            conexion.al_cerrar = lambda c=conexion: self._dejar_de_observar(c)
+            self.estadisticas["espectadores"] += 1
+
+    def _al_recibir_espectador(self, conexion: Conexion, mensaje: Dict):
+        tipo = mensaje.get("tipo")
+        if tipo == "partidas":
+            conexion.enviar({"tipo": "partidas", "partidas": [
+                {"id": p.id, "ply": p.board.ply(), "espectadores": len(p.espectadores)}
+                for p in self.partidas.values()
+            ]})
+        elif tipo == "observar":
+            partida = self.partidas.get(mensaje.get("partida"))
+            if partida is None:
+                conexion.enviar({"tipo": "rechazo", "motivo": "la partida no existe"})
+                return
+            self._dejar_de_observar(conexion)
+            partida.espectadores.add(conexion)
+            self._observa[conexion] = partida
+            conexion.enviar(self._posicion(partida))
+        elif tipo == "ping":
+            conexion.enviar({"tipo": "pong", "t": mensaje.get("t")})
+
+    def _dejar_de_observar(self, conexion: Conexion):
+        partida = self._observa.pop(conexion, None)
+        if partida:
+            partida.espectadores.discard(conexion)
+            partida.desfasados.discard(conexion)
+            partida.rachas.pop(conexion, None)
+
+    @staticmethod
+    def _posicion(partida: Partida) -> Dict:
+        return {"tipo": "posicion", "partida": partida.id, "fen": partida.board.fen(), "ply": partida.board.ply()}
+
+    def _difundir(self, partida: Partida, trama: bytes):
+        """Reparte una trama ya codificada a los espectadores de la partida.
+
+        Nunca bloquea: a quien tiene demasiados bytes encolados se le omite la
+        jugada (recibirá la posición completa cuando se ponga al día) y, si se
+        queda atrás DESFASES_MAXIMOS_ESPECTADOR veces seguidas, se le
+        desconecta.
+        """
+        posicion = None
+        for espectador in list(partida.espectadores):
+            pendiente = espectador.pendiente()
+            racha = partida.rachas.get(espectador)
+            if pendiente > COLA_DESFASE_ESPECTADOR:
+                if espectador in partida.desfasados:
+                    continue
+                if racha is None or racha[1] >= JUGADAS_RECUPERACION:
+                    racha = partida.rachas[espectador] = [0, 0]
+                racha[0] += 1
+                racha[1] = 0
+                if racha[0] >= DESFASES_MAXIMOS_ESPECTADOR:
+                    self.estadisticas["espectadores_descartados"] += 1
+                    espectador.cerrar()
+                    continue
+                partida.desfasados.add(espectador)
+                self.estadisticas["espectadores_desfasados"] += 1
+            elif espectador in partida.desfasados:
+                partida.desfasados.discard(espectador)
+                if posicion is None:
+                    posicion = Conexion.codificar(self._posicion(partida))
+                espectador.enviar_bytes(posicion)
+                self.estadisticas["envios_espectadores"] += 1
+            else:
+                espectador.enviar_bytes(trama)
+                self.estadisticas["envios_espectadores"] += 1
+                if racha is not None:
+                    racha[1] += 1
+
+    def _emparejar(self, conexion: Conexion):
+        rival = self._esperando
+        if rival is None or not rival.abierta:
+            self._esperando = conexion
+            return
+        self._esperando = None
+        partida = Partida(next(self._ids), rival, conexion)
+        self.partidas[partida.id] = partida
+        self._partida_de[rival] = partida
+        self._partida_de[conexion] = partida
+        partida.reloj.iniciar()
+        reloj = Conexion.codificar(partida.reloj.a_mensaje())
+        for jugador, color in ((rival, Color.BLANCO), (conexion, Color.NEGRO)):
+            jugador.enviar_bytes(
+                Conexion.codificar({"tipo": "inicio", "partida": partida.id, "color": color.value}) + reloj
+            )
+        self._vigilar_tiempo(partida)
+
+    def _vigilar_tiempo(self, partida: Partida):
+        """Programa la comprobación de bandera del jugador que tiene el turno.
+
+        Si ya hay una comprobación que vence antes, basta con ella (al vencer
+        se reprograma): así no se crea un temporizador por jugada.
+        """
+        retraso = partida.reloj.restante(partida.reloj.turno)
+        if partida.vigilancia is not None and partida.vigilancia[0] <= time.monotonic() + retraso:
+            return
+        BucleRed.cancelar(partida.vigilancia)
+        partida.vigilancia = self.bucle.programar(retraso, lambda: self._comprobar_tiempo(partida))
+
+    def _comprobar_tiempo(self, partida: Partida):
+        partida.vigilancia = None
+        if partida.terminada:
+            return
+        turno = partida.reloj.turno
+        if partida.reloj.restante(turno) > 0.0:
+            self._vigilar_tiempo(partida)
+            return
+        partida.reloj.detener()
+        trama = (Conexion.codificar({"tipo": "tiempo_agotado", "color": turno.value})
+                 + Conexion.codificar(partida.reloj.a_mensaje()))
+        partida.blancas.enviar_bytes(trama)
+        partida.negras.enviar_bytes(trama)
+        self._terminar(partida, "0-1" if turno == Color.BLANCO else "1-0", "tiempo agotado")
+
+    def _al_recibir(self, conexion: Conexion, mensaje: Dict):
+        if mensaje.get("tipo") == "ping":
+            # Los clientes de lan.py miden la latencia con ping/pong
+            conexion.enviar({"tipo": "pong", "t": mensaje.get("t")})
+            return
+        partida = self._partida_de.get(conexion)
+        if mensaje.get("tipo") != "movimiento" or partida is None or partida.terminada:
+            return
+        board = partida.board
+        move = None
+        if board.turn == partida.color_de(conexion):
+            try:
+                move = _movimiento_desde_coordenadas(board, mensaje["origen"], mensaje["destino"])
+            except (KeyError, TypeError, IndexError, ValueError):
+                move = None
+        if move is None:
+            self.estadisticas["rechazadas"] += 1
+            # El cliente ya pasó el turno en su réplica del reloj: se le devuelve el del servidor
+            conexion.enviar_lote([
+                {"tipo": "rechazo", "motivo": "jugada ilegal o fuera de turno"},
+                partida.reloj.a_mensaje(),
+            ])
+            return
+        board.push(move)
+        partida.reloj.registrar_jugada(Color.BLANCO if conexion is partida.blancas else Color.NEGRO)
+        self.estadisticas["jugadas"] += 1
+        # Se codifica una sola vez para el rival y todos los espectadores
+        trama = Conexion.codificar({
+            "tipo": "movimiento",
+            "origen": mensaje["origen"],
+            "destino": mensaje["destino"],
+        })
+        reloj = Conexion.codificar(partida.reloj.a_mensaje())
+        partida.rival(conexion).enviar_bytes(trama + reloj)
+        conexion.enviar_bytes(reloj)
+        self._vigilar_tiempo(partida)
+        if partida.espectadores:
+            self._difundir(partida, trama)
+        if board.is_game_over():
+            self._terminar(partida, board.result(), "fin de partida")
+
+    def _al_cerrar(self, conexion: Conexion):
+        if self._esperando is conexion:
+            self._esperando = None
+        partida = self._partida_de.pop(conexion, None)
+        if partida and not partida.terminada:
+            resultado = "0-1" if conexion is partida.blancas else "1-0"
+            self._terminar(partida, resultado, "abandono")
+
+    def _terminar(self, partida: Partida, resultado: str, motivo: str):
+        partida.terminada = True
+        partida.reloj.detener()
+        BucleRed.cancelar(partida.vigilancia)
+        self.estadisticas["partidas_terminadas"] += 1
+        self.partidas.pop(partida.id, None)
+        trama = Conexion.codificar({"tipo": "fin", "resultado": resultado, "motivo": motivo})
+        for conexion in (partida.blancas, partida.negras):
+            self._partida_de.pop(conexion, None)
+            conexion.enviar_bytes(trama)
+        posicion = None
+        for espectador in partida.espectadores:
+            if espectador in partida.desfasados:
+                # Los retrasados reciben antes la posición final
+                if posicion is None:
+                    posicion = Conexion.codificar(self._posicion(partida))
+                espectador.enviar_bytes(posicion + trama)
+            else:
+                espectador.enviar_bytes(trama)
+            self._observa.pop(espectador, None)
+        partida.espectadores.clear()
+        partida.desfasados.clear()
+        partida.rachas.clear()
+
+    def partidas_activas(self) -> int:
+        return len(self.partidas)
+
+    def cerrar(self):
+        if self.anunciador:
+            self.anunciador.detener_anuncios()
+            self.anunciador = None
+        for sock in (self.socket_servidor, self.socket_espectadores):
+            if sock:
+                self.bucle.desregistrar(sock, cerrar=True)
+        self.socket_servidor = self.socket_espectadores = None
+        for espectador in list(self._observa):
+            espectador.cerrar()
+        for partida in list(self.partidas.values()):
+            partida.blancas.cerrar()
+            partida.negras.cerrar()
+        if self._esperando:
+            self._esperando.cerrar()
+
+
+class ClienteSimulado:
+    """Cliente sin interfaz que juega jugadas legales al azar (para la prueba de estrés)."""
+
+    def __init__(self, bucle: BucleRed, host: str, puerto: int, max_plies: int, al_terminar):
+        self.board = chess.Board()
+        self.color = None
+        self.max_plies = max_plies
+        self.al_terminar = al_terminar
+        self.rechazos = 0
+        # Jugadas del rival que no se pudieron reproducir en el tablero propio
+        self.jugadas_invalidas = 0
+        self.terminado = False
+        self.conexion: Optional[Conexion] = None
+        sock = socket.create_connection((host, puerto))
+        # Se registra en el hilo del bucle: así ningún mensaje llega antes de asignar self.conexion
+        bucle.llamar(lambda: self._conectar(sock, bucle))
+
+    def _conectar(self, sock: socket.socket, bucle: BucleRed):
+        self.conexion = Conexion(sock, self._al_recibir, self._al_cerrar, bucle)
+
+    def _jugar(self):
+        if self.board.ply() >= self.max_plies or self.board.is_game_over():
+            # Límite alcanzado: abandonar para liberar la partida
+            self.conexion.cerrar()
+            return
+        jugadas = [m for m in self.board.legal_moves if m.promotion in (None, chess.QUEEN)]
+        move = random.choice(jugadas)
+        self.board.push(move)
+        self.conexion.enviar({
+            "tipo": "movimiento",
+            "origen": [chess.square_file(move.from_square), chess.square_rank(move.from_square)],
+            "destino": [chess.square_file(move.to_square), chess.square_rank(move.to_square)],
+        })
+
+    def _al_recibir(self, mensaje: Dict):
+        tipo = mensaje.get("tipo")
+        if tipo == "inicio":
+            self.color = chess.WHITE if mensaje["color"] == "blanco" else chess.BLACK
+            if self.color == chess.WHITE:
+                self._jugar()
+        elif tipo == "movimiento":
+            move = _movimiento_desde_coordenadas(self.board, mensaje["origen"], mensaje["destino"])
+            if move is None:
+                # El tablero propio ya no coincide con el del servidor: abandonar
+                self.jugadas_invalidas += 1
+                self.conexion.cerrar()
+                return
+            self.board.push(move)
+            if self.board.turn == self.color:
+                self._jugar()
+        elif tipo == "rechazo":
+            # La jugada propia no cuenta y el tablero quedó desfasado: abandonar
+            self.rechazos += 1
+            self.conexion.cerrar()
+        elif tipo == "fin":
+            self.conexion.cerrar()
+
+    def _al_cerrar(self):
+        if not self.terminado:
+            self.terminado = True
+            self.al_terminar(self)
+
+
+class EspectadorSimulado:
+    """Espectador sin interfaz que observa partidas al azar (para la prueba de estrés).
+
+    Al terminar la partida observada pide la lista y pasa a otra.
+    """
+
+    def __init__(self, bucle: BucleRed, host: str, puerto: int):
+        self.bucle = bucle
+        self.jugadas = 0
+        self.posiciones = 0
+        self.conexion = Conexion(socket.create_connection((host, puerto)), self._al_recibir, None, bucle)
+        self.conexion.enviar({"tipo": "partidas"})
+
+    def _al_recibir(self, mensaje: Dict):
+        tipo = mensaje.get("tipo")
+        if tipo == "movimiento":
+            self.jugadas += 1
+        elif tipo == "posicion":
+            self.posiciones += 1
+        elif tipo == "partidas":
+            if mensaje["partidas"]:
+                self.conexion.enviar({"tipo": "observar", "partida": random.choice(mensaje["partidas"])["id"]})
+            else:
+                self.bucle.programar(0.05, lambda: self.conexion.enviar({"tipo": "partidas"}))
+        elif tipo in ("fin", "rechazo"):
+            self.conexion.enviar({"tipo": "partidas"})
+
+
+def prueba_estres(clientes: int = 200, max_plies: int = 60, puerto: int = 18880, tiempo_maximo: float = 120.0,
+                  espectadores: int = 0) -> Dict:
+    """Levanta un servidor en local y lo somete a `clientes` clientes simulados.
+
+    Servidor y clientes usan bucles de red distintos (dos hilos), como si
+    fueran procesos separados. Devuelve las estadísticas del servidor más la
+    duración y las jugadas por segundo.
+    """
+    servidor = ServidorPartidas(puerto=puerto, anunciar=False)
+    if not servidor.iniciar():
+        return {}
+    bucle_clientes = BucleRed()
+    terminados: List[ClienteSimulado] = []
+    cerrojo = threading.Lock()
+    todos_terminados = threading.Event()
+
+    def al_terminar(cliente):
+        with cerrojo:
+            terminados.append(cliente)
+            if len(terminados) == clientes:
+                todos_terminados.set()
+
+    inicio = time.perf_counter()
+    simulados = [ClienteSimulado(bucle_clientes, "127.0.0.1", puerto, max_plies, al_terminar) for _ in range(clientes)]
+    observadores = [EspectadorSimulado(bucle_clientes, "127.0.0.1", servidor.puerto_espectadores)
+                    for _ in range(espectadores)]
+    completado = todos_terminados.wait(tiempo_maximo)
+    duracion = time.perf_counter() - inicio
+    servidor.cerrar()
+    for observador in observadores:
+        observador.conexion.cerrar()
+
+    resumen = dict(servidor.estadisticas)
+    resumen.update({
+        "clientes": clientes,
+        "completado": completado,
+        "duracion": duracion,
+        "jugadas_por_segundo": resumen["jugadas"] / duracion if duracion else 0.0,
+        "rechazos_en_clientes": sum(c.rechazos for c in simulados),
+        "jugadas_invalidas_en_clientes": sum(c.jugadas_invalidas for c in simulados),
+    })
+    if espectadores:
+        resumen["jugadas_vistas_por_espectadores"] = sum(o.jugadas for o in observadores)
+    return resumen
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor LAN de partidas simultáneas")
+    parser.add_argument("--puerto", type=int, default=PUERTO_JUEGO)
+    parser.add_argument("--estres", type=int, default=None, metavar="CLIENTES",
+                        help="Ejecutar la prueba de estrés con N clientes simulados")
+    parser.add_argument("--puerto-espectadores", type=int, default=None,
+                        help="Puerto del canal de espectadores (por defecto, puerto + 1)")
+    parser.add_argument("--plies", type=int, default=60, help="Plies por partida en la prueba de estrés")
+    parser.add_argument("--espectadores", type=int, default=0, help="Espectadores simulados en la prueba de estrés")
+    args = parser.parse_args()
+
+    if args.estres:
+        resumen = prueba_estres(args.estres, args.plies, args.puerto, espectadores=args.espectadores)
+        for clave, valor in resumen.items():
+            print(f"{clave}: {valor:.1f}" if isinstance(valor, float) else f"{clave}: {valor}")
+        return
+
+    servidor = ServidorPartidas(args.puerto, puerto_espectadores=args.puerto_espectadores)
+    if not servidor.iniciar():
+        return
+    try:
+        while True:
+            time.sleep(10)
+            print(f"Partidas activas: {servidor.partidas_activas()} | {servidor.estadisticas}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Consulta de tablas de finales Syzygy (WDL/DTZ).
+
+Responsabilidades:
+- Abrir un directorio de tablas Syzygy mediante `chess.syzygy`
+- Resolver posiciones con pocas piezas sin búsqueda (resultado exacto)
+- Guardar en una caché LRU los resultados de las consultas
+"""
+from typing import Optional, Dict, Tuple
+from collections import OrderedDict
+import os
+
+try:
+    import chess
+    import chess.syzygy
+except Exception:
+    chess = None
+
+# Variable de entorno para indicar el directorio de tablas
+VARIABLE_ENTORNO_SYZYGY = "AJEDREZ_SYZYGY"
+
+
+class TablasFinales:
+    """Tablas Syzygy con caché LRU de resultados por posición.
+
+    Solo se consultan posiciones con `max_piezas` piezas o menos; por defecto
+    se usa el mayor número de piezas de las tablas encontradas en el directorio.
+    """
+
+    def __init__(self, directorio: str, max_piezas: Optional[int] = None, capacidad_cache: int = 100000):
+        """Abre las tablas del directorio; si falla, quedan como no disponibles.
+
+        Args:
+            directorio: Carpeta con los archivos .rtbw/.rtbz
+            max_piezas: Número máximo de piezas (incluidos reyes) a consultar
+            capacidad_cache: Número de posiciones que guarda la caché LRU
+        """
+        self.directorio = directorio
+        self.capacidad_cache = capacidad_cache
+        self._cache: "OrderedDict[str, Tuple[Optional[int], Optional[int]]]" = OrderedDict()
+        self.tablas = None
+        self.max_piezas = 0
+        if chess is not None and os.path.isdir(directorio):
+            try:
+                self.tablas = chess.syzygy.open_tablebase(directorio)
+                # Los nombres de tabla son del tipo "KQvK": una letra por pieza
+                piezas_tablas = max((len(n) - 1 for n in self.tablas.wdl), default=0)
+                self.max_piezas = min(max_piezas, piezas_tablas) if max_piezas else piezas_tablas
+            except Exception as e:
+                print(f"No se pudieron abrir las tablas Syzygy en {directorio}: {e}")
+                self.tablas = None
+        if self.max_piezas == 0:
+            self.tablas = None
+
+    def disponible(self) -> bool:
+        return self.tablas is not None
+
+    def aplicable(self, board) -> bool:
+        """Indica si la posición tiene pocas piezas y no conserva enroques."""
+        return (
+            self.tablas is not None
+            and chess.popcount(board.occupied) <= self.max_piezas
+            and not board.castling_rights
+        )
+
+    def probar(self, board) -> Tuple[Optional[int], Optional[int]]:
+        """Devuelve (wdl, dtz) desde el punto de vista del bando que mueve.
+
+        Cualquiera de los dos puede ser None si la tabla necesaria no existe.
+        """
+        if not self.aplicable(board):
+            return None, None
+        clave = board.epd()
+        resultado = self._cache.get(clave)
+        if resultado is not None:
+            self._cache.move_to_end(clave)
+            return resultado
+        wdl = self.tablas.get_wdl(board)
+        dtz = self.tablas.get_dtz(board) if wdl is not None else None
+        resultado = (wdl, dtz)
+        self._cache[clave] = resultado
+        if len(self._cache) > self.capacidad_cache:
+            self._cache.popitem(last=False)
+        return resultado
+
+    def mejor_jugada(self, fen: str) -> Optional[str]:
+        """Devuelve la jugada LAN (e2e4) óptima según las tablas, o None.
+
+        Gana lo antes posible: prefiere las capturas y jugadas de peón (ponen
+        a cero la regla de 50 jugadas, equivalen a DTZ 1) y después el menor
+        DTZ. Pierde lo más tarde posible, evitando esas jugadas y buscando el
+        mayor DTZ. En tablas se queda con cualquier jugada que conserve el empate.
+        """
+        if self.tablas is None:
+            return None
+        try:
+            board = chess.Board(fen)
+        except Exception:
+            return None
+        if not self.aplicable(board):
+            return None
+
+        mejor = None
+        mejor_clave = None
+        for move in board.legal_moves:
+            a_cero = board.is_zeroing(move)
+            board.push(move)
+            if board.is_checkmate():
+                board.pop()
+                return move.uci()
+            wdl_rival, dtz_rival = self.probar(board)
+            board.pop()
+            if wdl_rival is None or dtz_rival is None:
+                # Falta alguna tabla: no se puede garantizar una jugada perfecta
+                return None
+            wdl = -wdl_rival
+            if wdl > 0:
+                clave = (wdl, a_cero, -abs(dtz_rival))
+            elif wdl < 0:
+                clave = (wdl, not a_cero, abs(dtz_rival))
+            else:
+                clave = (wdl, False, 0)
+            if mejor_clave is None or clave > mejor_clave:
+                mejor, mejor_clave = move, clave
+        return mejor.uci() if mejor else None
+
+    def cerrar(self):
+        try:
+            if self.tablas:
+                self.tablas.close()
+        except Exception:
+            pass
+        self.tablas = None
+        self._cache.clear()
+
+
+def _directorio_tablas_por_defecto() -> Optional[str]:
+    """Resuelve el directorio de tablas: AJEDREZ_SYZYGY o ./syzygy junto al proyecto."""
+    directorio = os.environ.get(VARIABLE_ENTORNO_SYZYGY)
+    if directorio and os.path.isdir(directorio):
+        return directorio
+    raiz = os.path.dirname(os.path.abspath(__file__))
+    candidato = os.path.join(raiz, "syzygy")
+    if os.path.isdir(candidato):
+        return candidato
+    return None
+
+
+# Tablas abiertas por directorio: la caché LRU se comparte durante la sesión
+_tablas_abiertas: Dict[str, TablasFinales] = {}
+
+
+def obtener_tablas(directorio: Optional[str] = None) -> Optional[TablasFinales]:
+    """Devuelve las tablas (abiertas una sola vez) o None si no hay ninguna."""
+    if directorio is None:
+        directorio = _directorio_tablas_por_defecto()
+    if not directorio:
+        return None
+    tablas = _tablas_abiertas.get(directorio)
+    if tablas is None:
+        tablas = TablasFinales(directorio)
+        _tablas_abiertas[directorio] = tablas
+    return tablas if tablas.disponible() else None
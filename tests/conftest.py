@@ -0,0 +1,5 @@
+"""Configuración común de las pruebas: los módulos del proyecto están en la raíz."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,242 @@
+"""Pruebas de la lectura incremental de JSON, de la caché HTTP y de los clientes de apis.py."""
+import json
+
+from apis import CacheHTTP, ChessAPICom, ChessComAPIAsync, iterar_array_json
+
+DOCUMENTO = json.dumps(
+    {
+        "otros": {"games": "no es el array"},
+        "games": [
+            {"pgn": "1. e4 e5 *", "jugador": "Muñoz"},
+            {"texto": "corchetes ] y comas , dentro de una cadena", "rey": "♔"},
+            [1, [2, [3]], {"x": None}],
+            42,
+        ],
+        "despues": [99],
+    },
+    ensure_ascii=False,
+).encode("utf-8")
+ESPERADO = json.loads(DOCUMENTO)["games"]
+
+
+def _trocear(datos, tamano):
+    return [datos[i:i + tamano] for i in range(0, len(datos), tamano)]
+
+
+def test_array_en_un_solo_fragmento():
+    assert list(iterar_array_json([DOCUMENTO], "games")) == ESPERADO
+
+
+def test_array_en_fragmentos_de_un_byte():
+    # Parte también los caracteres UTF-8 de varios bytes (ñ, ♔)
+    assert list(iterar_array_json(_trocear(DOCUMENTO, 1), "games")) == ESPERADO
+
+
+def test_array_cortado_en_cada_posicion():
+    for corte in range(1, len(DOCUMENTO)):
+        fragmentos = [DOCUMENTO[:corte], DOCUMENTO[corte:]]
+        assert list(iterar_array_json(fragmentos, "games")) == ESPERADO, corte
+
+
+def test_array_vacio_y_clave_ausente():
+    assert list(iterar_array_json([b'{"games": []}'], "games")) == []
+    assert list(iterar_array_json(_trocear(b'{"otra": [1, 2]}', 3), "games")) == []
+
+
+def test_elemento_truncado_no_se_devuelve():
+    datos = b'{"games": [{"a": 1}, {"b": 2}, {"c": '
+    assert list(iterar_array_json(_trocear(datos, 4), "games")) == [{"a": 1}, {"b": 2}]
+
+
+class _Respuesta:
+    def __init__(self, codigo, cuerpo=None, cabeceras=None):
+        self.status_code = codigo
+        self.text = json.dumps(cuerpo) if cuerpo is not None else ""
+        self.headers = cabeceras or {}
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class _PoolFalso:
+    """Sustituye a `PoolSesiones`: devuelve respuestas preparadas y anota las cabeceras enviadas."""
+
+    def __init__(self, respuestas):
+        self.respuestas = list(respuestas)
+        self.cabeceras = []
+
+    def get(self, url, headers=None):
+        self.cabeceras.append(dict(headers or {}))
+        return self.respuestas.pop(0)
+
+
+def test_cache_revalida_con_etag():
+    cache = CacheHTTP(ruta=None, ttl=0)
+    pool = _PoolFalso([
+        _Respuesta(200, {"username": "hikaru"}, {"ETag": '"v1"'}),
+        _Respuesta(304, cabeceras={"ETag": '"v1"'}),
+    ])
+    url = "https://api.chess.com/pub/player/hikaru"
+
+    assert cache.obtener(pool, url)[:2] == (200, {"username": "hikaru"})
+    # Con TTL 0 la entrada ya está caducada: petición condicional y 304
+    assert cache.obtener(pool, url)[:2] == (200, {"username": "hikaru"})
+    assert pool.cabeceras == [{}, {"If-None-Match": '"v1"'}]
+    cache.cerrar()
+
+
+def test_cache_sustituye_la_entrada_si_cambia():
+    cache = CacheHTTP(ruta=None, ttl=0)
+    pool = _PoolFalso([
+        _Respuesta(200, {"version": 1}, {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}),
+        _Respuesta(200, {"version": 2}, {"ETag": '"v2"'}),
+        _Respuesta(304),
+    ])
+    url = "https://api.chess.com/pub/player/hikaru/stats"
+
+    cache.obtener(pool, url)
+    assert cache.obtener(pool, url)[1] == {"version": 2}
+    assert cache.obtener(pool, url)[1] == {"version": 2}
+    assert pool.cabeceras[1] == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+    assert pool.cabeceras[2] == {"If-None-Match": '"v2"'}
+    cache.cerrar()
+
+
+def test_cache_fresca_no_usa_la_red():
+    cache = CacheHTTP(ruta=None, ttl=300)
+    pool = _PoolFalso([_Respuesta(200, {"ok": True}, {"ETag": '"v1"'})])
+    url = "https://api.chess.com/pub/player/magnus"
+
+    cache.obtener(pool, url)
+    assert cache.obtener(pool, url)[:2] == (200, {"ok": True})
+    assert len(pool.cabeceras) == 1
+    cache.cerrar()
+
+
+def test_cache_no_guarda_errores():
+    cache = CacheHTTP(ruta=None, ttl=300)
+    pool = _PoolFalso([_Respuesta(404), _Respuesta(200, {"ok": True})])
+    url = "https://api.chess.com/pub/player/nadie"
+
+    assert cache.obtener(pool, url)[:2] == (404, None)
+    assert cache.buscar(url) is None
+    assert cache.obtener(pool, url)[:2] == (200, {"ok": True})
+    cache.cerrar()
+
+
+class _PoolPost:
+    """Sustituye a `PoolSesiones` en `ChessAPICom`: cada POST devuelve la respuesta preparada."""
+
+    def __init__(self, respuesta):
+        self.respuesta = respuesta
+        self.peticiones = 0
+
+    def post(self, url, json=None):
+        self.peticiones += 1
+        return self.respuesta
+
+
+def test_cobertura_local_si_la_api_falla_enseguida():
+    api = ChessAPICom(pool=_PoolPost(_Respuesta(503)), espera_cobertura_inicial=30)
+    resultado = api.analizar_posicion("8/8/8/8/8/8/8/K6k w - - 0 1", respaldo=lambda fen: {"move": "a1a2"})
+    assert resultado == {"move": "a1a2"}
+
+
+def test_sin_respaldo_el_fallo_devuelve_none():
+    api = ChessAPICom(pool=_PoolPost(_Respuesta(503)))
+    assert api.analizar_posicion("8/8/8/8/8/8/8/K6k w - - 0 1") is None
+
+
+def test_respuesta_remota_valida_no_usa_la_cobertura():
+    api = ChessAPICom(pool=_PoolPost(_Respuesta(200, {"move": "a1b1"})))
+
+    def respaldo(fen):
+        raise AssertionError("no debería usarse la búsqueda local")
+
+    assert api.analizar_posicion("8/8/8/8/8/8/8/K6k w - - 0 1", respaldo=respaldo) == {"move": "a1b1"}
+
+
+class _RespuestaStream(_Respuesta):
+    def iter_content(self, chunk_size=1):
+        datos = self.text.encode("utf-8")
+        for i in range(0, len(datos), 7):
+            yield datos[i:i + 7]
+
+    def close(self):
+        pass
+
+
+class _PoolRutas:
+    """Sustituye a `PoolSesiones`: responde según la URL y anota las pedidas."""
+
+    def __init__(self, rutas):
+        self.rutas = rutas
+        self.pedidas = []
+
+    def get(self, url, headers=None, stream=False):
+        self.pedidas.append(url)
+        respuesta = self.rutas.get(url)
+        if respuesta is None:
+            return _RespuestaStream(404)
+        if isinstance(respuesta, list):
+            # Respuestas preparadas en orden (la última se repite)
+            respuesta = respuesta.pop(0) if len(respuesta) > 1 else respuesta[0]
+        if isinstance(respuesta, _Respuesta):
+            return respuesta
+        return _RespuestaStream(200, respuesta)
+
+
+def test_cliente_async_recorre_los_archivos_mensuales():
+    base = "http://local"
+    mes = lambda n: f"{base}/player/ana/games/2024/0{n}"
+    pool = _PoolRutas({
+        f"{base}/player/ana": {"username": "ana"},
+        f"{base}/player/ana/stats": {"chess_blitz": {}},
+        f"{base}/player/ana/games/archives": {"archives": [mes(1), mes(2), mes(3)]},
+        mes(2): {"games": [{"end_time": 3}, {"end_time": 4}]},
+        mes(3): {"games": [{"end_time": 5}]},
+    })
+    api = ChessComAPIAsync(base_url=base, pool=pool, peticiones_por_segundo=1000)
+
+    datos = api.obtener_jugadores_sincrono(["ana"], limit=2)["ana"]
+    assert datos["perfil"] == {"username": "ana"}
+    assert [j["end_time"] for j in datos["juegos"]] == [5, 4]
+    assert datos["juegos_completos"]
+    # Con dos partidas basta con los dos últimos meses
+    assert mes(1) not in pool.pedidas
+    assert f"{base}/player/ana/games" not in pool.pedidas
+
+
+def test_cliente_async_reintenta_el_mes_con_429():
+    base = "http://local"
+    mes = lambda n: f"{base}/player/ana/games/2024/0{n}"
+    pool = _PoolRutas({
+        f"{base}/player/ana/games/archives": {"archives": [mes(1), mes(2)]},
+        mes(2): [_RespuestaStream(429, cabeceras={"Retry-After": "0.05"}), {"games": [{"end_time": 3}]}],
+        mes(1): {"games": [{"end_time": 1}, {"end_time": 2}]},
+    })
+    api = ChessComAPIAsync(base_url=base, pool=pool, peticiones_por_segundo=1000)
+
+    datos = api.obtener_jugadores_sincrono(["ana"], limit=3)["ana"]
+    assert [j["end_time"] for j in datos["juegos"]] == [3, 2, 1]
+    assert datos["juegos_completos"]
+    assert pool.pedidas.count(mes(2)) == 2
+
+
+def test_cliente_async_avisa_si_falta_un_mes():
+    base = "http://local"
+    mes = lambda n: f"{base}/player/ana/games/2024/0{n}"
+    pool = _PoolRutas({
+        f"{base}/player/ana/games/archives": {"archives": [mes(1), mes(2), mes(3)]},
+        mes(3): {"games": [{"end_time": 5}]},
+        mes(2): _RespuestaStream(500),
+        mes(1): {"games": [{"end_time": 1}]},
+    })
+    api = ChessComAPIAsync(base_url=base, pool=pool, peticiones_por_segundo=1000)
+
+    datos = api.obtener_jugadores_sincrono(["ana"], limit=3)["ana"]
+    assert [j["end_time"] for j in datos["juegos"]] == [5]
+    assert not datos["juegos_completos"]
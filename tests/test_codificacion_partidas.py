@@ -0,0 +1,69 @@
+"""Pruebas de ida y vuelta de la codificación de 16 bits de codificacion_partidas.py."""
+import pytest
+
+from codificacion_partidas import (
+    a_movetext,
+    codificar_movimientos,
+    codificar_san,
+    codificar_uci,
+    decodificar_movimientos,
+    decodificar_uci,
+    jugadas_chess,
+    jugadas_san,
+)
+
+MOVETEXT = (
+    "1. e4 {apertura} e5 2. Nf3 Nc6 (2... d6 3. d4) 3. Bb5 a6 $1 4. Ba4 Nf6 "
+    "5. O-O Be7 6. Re1 b5 7. Bb3 d6 8. c3 O-O 1-0"
+)
+
+
+def test_uci_ida_y_vuelta_con_coronaciones():
+    jugadas = ["e2e4", "e7e5", "g1f3", "a7a8q", "h2h1n", "b7c8r", "g2f1b", "h8a1"]
+    datos = codificar_uci(jugadas)
+    assert len(datos) == 2 * len(jugadas)
+    assert decodificar_uci(datos) == jugadas
+
+
+def test_uci_vacio():
+    assert codificar_uci([]) == b""
+    assert decodificar_uci(b"") == []
+
+
+def test_movimientos_del_tablero_interno_ida_y_vuelta():
+    movimientos = [((4, 1), (4, 3)), ((4, 6), (4, 4)), ((0, 0), (7, 7)), ((7, 7), (0, 0))]
+    assert decodificar_movimientos(codificar_movimientos(movimientos)) == movimientos
+
+
+def test_tablero_interno_y_uci_comparten_casillas():
+    # e2e4: x=4, y=1 -> x=4, y=3
+    assert codificar_movimientos([((4, 1), (4, 3))]) == codificar_uci(["e2e4"])
+
+
+def test_jugadas_san_descarta_comentarios_variantes_y_resultado():
+    assert jugadas_san(MOVETEXT)[:6] == ["e4", "e5", "Nf3", "Nc6", "Bb5", "a6"]
+    assert "d6" in jugadas_san(MOVETEXT) and "d4" not in jugadas_san(MOVETEXT)
+    assert jugadas_san("1. e4!? e5?? *") == ["e4", "e5"]
+
+
+def test_san_ida_y_vuelta():
+    pytest.importorskip("chess")
+    datos = codificar_san(MOVETEXT)
+    assert datos is not None
+    assert a_movetext(datos, "1-0") == (
+        "1. e4 e5 2. Nf3 Nc6 3. Bb5 a6 4. Ba4 Nf6 5. O-O Be7 6. Re1 b5 7. Bb3 d6 8. c3 O-O 1-0"
+    )
+    assert [m.uci() for m in jugadas_chess(datos)][:2] == ["e2e4", "e7e5"]
+
+
+def test_san_con_coronacion_y_fen():
+    pytest.importorskip("chess")
+    fen = "4k3/P7/8/8/8/8/7p/K7 w - - 0 1"
+    datos = codificar_san("1. a8=N h1=Q+ 2. Kb2", fen=fen)
+    assert decodificar_uci(datos) == ["a7a8n", "h2h1q", "a1b2"]
+    assert a_movetext(datos, fen=fen) == "1. a8=N h1=Q+ 2. Kb2"
+
+
+def test_san_ilegal_devuelve_none():
+    pytest.importorskip("chess")
+    assert codificar_san("1. e4 e5 2. Ke3") is None
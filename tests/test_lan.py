@@ -0,0 +1,185 @@
+"""Pruebas del troceado de tramas de `lan.Conexion` y del servidor de dos jugadores."""
+import socket
+import threading
+import time
+
+import pytest
+
+import lan
+from lan import TAMANO_BUFER_ENTRADA, BucleRed, Conexion, ServidorAjedrez
+
+MENSAJES = [
+    {"tipo": "movimiento", "origen": (4, 1), "destino": (4, 3)},
+    {"tipo": "movimiento", "origen": (6, 7), "destino": (5, 5), "sec": 70000},
+    {"tipo": "chat", "texto": "¡Hola! ♔"},
+    {"tipo": "movimiento", "origen": (0, 0), "destino": (7, 7)},
+]
+
+
+class _Receptor:
+    """Extremo de un socketpair atendido por un `BucleRed` propio."""
+
+    def __init__(self):
+        self.mensajes = []
+        self.cerrada = threading.Event()
+        self._cambio = threading.Condition()
+        self.local, self.remoto = socket.socketpair()
+        self.bucle = BucleRed()
+        self.conexion = Conexion(self.local, self._al_recibir, self.cerrada.set, bucle=self.bucle)
+
+    def _al_recibir(self, mensaje):
+        with self._cambio:
+            self.mensajes.append(mensaje)
+            self._cambio.notify_all()
+
+    def esperar(self, cantidad, tiempo=5.0):
+        with self._cambio:
+            self._cambio.wait_for(lambda: len(self.mensajes) >= cantidad, tiempo)
+        return self.mensajes
+
+    def cerrar(self):
+        self.conexion.cerrar()
+        self.remoto.close()
+
+
+@pytest.fixture
+def receptor():
+    r = _Receptor()
+    yield r
+    r.cerrar()
+
+
+def _normalizar(mensaje):
+    """Las casillas se decodifican como tuplas y el JSON las devuelve como listas."""
+    return {k: tuple(v) if isinstance(v, list) else v for k, v in mensaje.items()}
+
+
+def test_movimientos_en_binario():
+    assert len(Conexion.codificar(MENSAJES[0])) == 7
+    assert len(Conexion.codificar(MENSAJES[1])) == 11
+    # Un movimiento con campos extra no cabe en la trama binaria y va como JSON
+    assert len(Conexion.codificar({**MENSAJES[0], "reloj": 1})) > 11
+
+
+def test_orden_de_bytes_de_las_tramas():
+    # e2e4: 12 | 28 << 6 = 0x070c; longitud, secuencia y palabra en big-endian
+    assert Conexion.codificar(MENSAJES[0]) == bytes.fromhex("00000003" "01" "070c")
+    sec = {**MENSAJES[0], "sec": 0x01020304}
+    assert Conexion.codificar(sec) == bytes.fromhex("00000007" "02" "01020304" "070c")
+
+
+def test_tramas_juntas_en_una_escritura(receptor):
+    receptor.remoto.sendall(b"".join(Conexion.codificar(m) for m in MENSAJES))
+    assert [_normalizar(m) for m in receptor.esperar(len(MENSAJES))] == MENSAJES
+
+
+def test_tramas_byte_a_byte(receptor):
+    datos = b"".join(Conexion.codificar(m) for m in MENSAJES)
+    for i in range(len(datos)):
+        receptor.remoto.send(datos[i:i + 1])
+        # Dar tiempo a que el bucle lea cada byte por separado
+        time.sleep(0.001)
+    assert [_normalizar(m) for m in receptor.esperar(len(MENSAJES))] == MENSAJES
+
+
+def test_trama_mayor_que_el_bufer(receptor):
+    grande = {"tipo": "pgn", "texto": "x" * (3 * TAMANO_BUFER_ENTRADA)}
+    datos = Conexion.codificar(MENSAJES[0]) + Conexion.codificar(grande) + Conexion.codificar(MENSAJES[2])
+    mitad = len(datos) // 2
+    receptor.remoto.sendall(datos[:mitad])
+    time.sleep(0.05)
+    receptor.remoto.sendall(datos[mitad:])
+    mensajes = receptor.esperar(3)
+    assert [_normalizar(m) for m in mensajes] == [MENSAJES[0], grande, MENSAJES[2]]
+
+
+def test_trama_invalida_cierra_la_conexion(receptor):
+    receptor.remoto.sendall(b"\0\0\0\0\0")
+    assert receptor.cerrada.wait(5.0)
+    assert not receptor.conexion.abierta
+
+
+def test_envio_entre_conexiones():
+    a, b = socket.socketpair()
+    bucle = BucleRed()
+    recibidos = []
+    listo = threading.Event()
+
+    def al_recibir(mensaje):
+        recibidos.append(mensaje)
+        if len(recibidos) == len(MENSAJES):
+            listo.set()
+
+    emisor = Conexion(a, lambda m: None, bucle=bucle)
+    receptora = Conexion(b, al_recibir, bucle=bucle)
+    emisor.enviar(MENSAJES[0])
+    emisor.enviar_lote(MENSAJES[1:])
+    assert listo.wait(5.0)
+    assert [_normalizar(m) for m in recibidos] == MENSAJES
+    emisor.cerrar()
+    receptora.cerrar()
+
+
+class _Cliente:
+    """Cliente mínimo de `ServidorAjedrez` que anota los mensajes recibidos."""
+
+    def __init__(self, puerto):
+        self.mensajes = []
+        self.bucle = BucleRed()
+        self.conexion = Conexion(socket.create_connection(("127.0.0.1", puerto)), self.mensajes.append,
+                                 bucle=self.bucle)
+
+    def esperar(self, tipo, tiempo=5.0):
+        limite = time.monotonic() + tiempo
+        while time.monotonic() < limite:
+            for i, mensaje in enumerate(self.mensajes):
+                if mensaje.get("tipo") == tipo:
+                    return i, mensaje
+            time.sleep(0.01)
+        return None, None
+
+
+@pytest.fixture
+def servidor(monkeypatch):
+    monkeypatch.setattr(lan, "PLAZO_PRESENTACION", 0.2)
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        puerto = sock.getsockname()[1]
+    servidor = ServidorAjedrez(puerto=puerto)
+    assert servidor.iniciar()
+    yield servidor
+    servidor.cerrar()
+
+
+def test_servidor_rechaza_jugada_fuera_de_turno(servidor):
+    cliente = _Cliente(servidor.puerto)
+    try:
+        assert cliente.esperar("bienvenida")[1] is not None
+        # Empiezan las blancas (el servidor): la jugada del cliente no cuenta
+        cliente.conexion.enviar({"tipo": "movimiento", "origen": (4, 6), "destino": (4, 4), "sec": 1})
+        indice, rechazo = cliente.esperar("rechazo")
+        assert rechazo is not None
+        assert cliente.mensajes[indice + 1]["tipo"] == "reloj"
+        assert servidor.jugadas == []
+    finally:
+        cliente.conexion.cerrar()
+
+
+def test_servidor_cierra_conexiones_que_no_se_presentan(servidor):
+    cliente = _Cliente(servidor.puerto)
+    assert cliente.esperar("bienvenida")[1] is not None
+    cliente.conexion.cerrar()
+    limite = time.monotonic() + 5.0
+    while servidor.conectado and time.monotonic() < limite:
+        time.sleep(0.01)
+    assert not servidor.conectado and servidor.en_partida
+
+    with socket.create_connection(("127.0.0.1", servidor.puerto)) as mudo:
+        mudo.settimeout(5.0)
+        # Sin "reanudar" el servidor la cierra al vencer el plazo
+        assert mudo.recv(1) == b""
+    # `al_cerrar` corre justo después de cerrar el socket
+    limite = time.monotonic() + 5.0
+    while servidor._candidatas and time.monotonic() < limite:
+        time.sleep(0.01)
+    assert not servidor._candidatas
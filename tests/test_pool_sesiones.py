@@ -0,0 +1,105 @@
+"""Pruebas de `apis.PoolSesiones` contra un servidor HTTP local."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from apis import PoolSesiones
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    # HTTP/1.1: el servidor mantiene la conexión abierta entre peticiones
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        servidor = self.server
+        with servidor.cerrojo:
+            servidor.conexiones.add(self.client_address)
+            servidor.activas += 1
+            servidor.max_activas = max(servidor.max_activas, servidor.activas)
+        try:
+            if self.path == "/lento":
+                time.sleep(1.0)
+            elif self.path == "/espera":
+                time.sleep(0.1)
+            cuerpo = b'{"ok": true}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with servidor.cerrojo:
+                servidor.activas -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servidor():
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), _Manejador)
+    servidor.daemon_threads = True
+    servidor.cerrojo = threading.Lock()
+    servidor.conexiones = set()
+    servidor.activas = 0
+    servidor.max_activas = 0
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    servidor.url = f"http://127.0.0.1:{servidor.server_address[1]}"
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def test_reutiliza_la_conexion(servidor):
+    pool = PoolSesiones()
+    for _ in range(5):
+        assert pool.get(servidor.url + "/").json() == {"ok": True}
+    # Las cinco peticiones viajan por la misma conexión keep-alive
+    assert len(servidor.conexiones) == 1
+    pool.cerrar()
+
+
+def test_limite_de_conexiones_por_host(servidor):
+    pool = PoolSesiones(conexiones_por_host=2)
+    with ThreadPoolExecutor(max_workers=8) as ejecutor:
+        codigos = list(ejecutor.map(lambda _: pool.get(servidor.url + "/espera").status_code, range(16)))
+    assert codigos == [200] * 16
+    assert servidor.max_activas <= 2
+    assert len(servidor.conexiones) <= 2
+    pool.cerrar()
+
+
+def test_timeout_de_lectura(servidor):
+    pool = PoolSesiones(timeout=(1.0, 0.2), reintentos=0)
+    inicio = time.monotonic()
+    with pytest.raises(requests.exceptions.RequestException):
+        pool.get(servidor.url + "/lento")
+    assert time.monotonic() - inicio < 0.9
+    pool.cerrar()
+
+
+def test_cerrar_cierra_las_sesiones_de_todos_los_hilos(servidor):
+    pool = PoolSesiones()
+    sesiones = []
+
+    def pedir():
+        pool.get(servidor.url + "/")
+        sesiones.append(pool.sesion())
+
+    hilos = [threading.Thread(target=pedir) for _ in range(3)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    cerradas = []
+    for sesion in sesiones:
+        sesion.close = lambda s=sesion: cerradas.append(s)
+    pool.cerrar()
+    assert sorted(map(id, cerradas)) == sorted(map(id, sesiones))
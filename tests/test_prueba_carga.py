@@ -0,0 +1,43 @@
+"""Pruebas de la prueba de carga LAN (prueba_carga.py)."""
+import socket
+
+from codificacion_partidas import codificar_san
+from prueba_carga import _consumo_entre, _percentil, prueba_carga
+
+
+def test_percentil_por_rango_mas_cercano():
+    datos = [10.0, 20.0, 30.0, 40.0, 50.0, 60.0]
+    assert _percentil(datos, 50) == 30.0
+    assert _percentil(datos, 99) == 60.0
+    assert _percentil(datos, 100) == 60.0
+    assert _percentil(datos, 0) == 10.0
+    assert _percentil(list(range(1, 101)), 99) == 99
+    assert _percentil([7.0], 50) == 7.0
+    assert _percentil([], 50) == 0.0
+
+
+def test_consumo_entre_muestras():
+    assert _consumo_entre((10.0, 1.0), (12.0, 2.0)) == 50.0
+    assert _consumo_entre((10.0, 1.0), (11.0, 3.0)) == 200.0
+    # Sin tiempo transcurrido no hay medida
+    assert _consumo_entre((10.0, 1.0), (10.0, 2.0)) is None
+
+
+def _puerto_libre():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_prueba_carga_pequena_sin_errores():
+    partidas = [
+        codificar_san("1. e4 e5 2. Nf3 Nc6 3. Bb5 a6 4. Ba4 Nf6 5. O-O Be7"),
+        codificar_san("1. d4 d5 2. c4 e6 3. Nc3 Nf6 4. Bg5 Be7"),
+    ]
+    resumen = prueba_carga(partidas, clientes=4, procesos=1, puerto=_puerto_libre(), tiempo_maximo=30.0)
+    assert resumen["completado"]
+    assert resumen["errores_conexion"] == 0
+    assert resumen["rechazadas"] == 0
+    assert resumen["rechazos_en_clientes"] == 0
+    assert resumen["jugadas_medidas"] > 0
+    assert resumen["latencia_p99_ms"] >= resumen["latencia_p50_ms"]
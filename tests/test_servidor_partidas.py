@@ -0,0 +1,68 @@
+"""Pruebas del servidor de partidas simultáneas con clientes reales y simulados."""
+import socket
+import threading
+import time
+
+from lan import BucleRed, ClienteAjedrez
+from modelos import Color
+from servidor_partidas import ServidorPartidas, prueba_estres
+
+
+def _puertos_libres():
+    """Puerto de juego libre cuyo siguiente (espectadores) también lo está."""
+    while True:
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            puerto = sock.getsockname()[1]
+        try:
+            with socket.socket() as sock:
+                sock.bind(("127.0.0.1", puerto + 1))
+            return puerto
+        except OSError:
+            continue
+
+
+def _esperar(condicion, tiempo=5.0):
+    limite = time.monotonic() + tiempo
+    while not condicion():
+        if time.monotonic() > limite:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_prueba_estres_sin_errores():
+    resumen = prueba_estres(clientes=20, max_plies=40, puerto=_puertos_libres(), tiempo_maximo=30.0)
+    assert resumen["completado"]
+    assert resumen["jugadas"] > 0
+    assert resumen["rechazadas"] == 0
+    assert resumen["rechazos_en_clientes"] == 0
+    assert resumen["jugadas_invalidas_en_clientes"] == 0
+
+
+def test_cliente_retira_la_jugada_rechazada():
+    servidor = ServidorPartidas(puerto=_puertos_libres(), bucle=BucleRed(), anunciar=False)
+    assert servidor.iniciar()
+    clientes = [ClienteAjedrez(), ClienteAjedrez()]
+    try:
+        for cliente in clientes:
+            assert cliente.conectar("127.0.0.1", servidor.puerto)
+        assert _esperar(lambda: all(c.color is not None for c in clientes))
+        blancas = next(c for c in clientes if c.color == Color.BLANCO)
+        # El servidor de partidas no admite reanudar
+        assert all(c.id_partida is None for c in clientes)
+
+        rechazos = []
+        avisado = threading.Event()
+        blancas.establecer_callback_rechazo(lambda motivo, jugadas: (rechazos.append(jugadas), avisado.set()))
+        blancas.enviar_movimiento((4, 1), (4, 3))
+        assert _esperar(lambda: servidor.estadisticas["jugadas"] == 1)
+        # Mover otra vez fuera de turno: el servidor la rechaza
+        blancas.enviar_movimiento((3, 1), (3, 3))
+        assert avisado.wait(5.0)
+        assert rechazos == [[((4, 1), (4, 3))]]
+        assert blancas.jugadas == [((4, 1), (4, 3))]
+    finally:
+        for cliente in clientes:
+            cliente.cerrar()
+        servidor.cerrar()
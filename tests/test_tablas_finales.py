@@ -0,0 +1,54 @@
+"""Pruebas de la elección de jugada de `TablasFinales` con tablas simuladas."""
+import chess
+
+from tablas_finales import TablasFinales
+
+# Rey y torre con un peón contra rey: sin mate en una, con jugadas de peón y de pieza
+FEN = "8/8/8/4k3/8/8/4P3/4K2R w - - 0 1"
+
+
+class _TablasFalsas:
+    """Sustituye a `chess.syzygy.Tablebase`: el resultado depende de la última jugada."""
+
+    def __init__(self, wdl, dtz_peon, dtz_pieza):
+        self.wdl = wdl
+        self.dtz_peon = dtz_peon
+        self.dtz_pieza = dtz_pieza
+
+    def get_wdl(self, board):
+        return self.wdl
+
+    def get_dtz(self, board):
+        jugada = board.peek()
+        if board.piece_type_at(jugada.to_square) == chess.PAWN:
+            return self.dtz_peon
+        return self.dtz_pieza
+
+
+def _tablas(falsas):
+    tablas = TablasFinales("no-existe")
+    tablas.tablas = falsas
+    tablas.max_piezas = 5
+    return tablas
+
+
+def test_gana_con_la_jugada_que_pone_a_cero_el_contador():
+    # Las jugadas de pieza tienen menor DTZ tras jugarlas, pero no progresan
+    tablas = _tablas(_TablasFalsas(wdl=-2, dtz_peon=-9, dtz_pieza=-1))
+    jugada = chess.Move.from_uci(tablas.mejor_jugada(FEN))
+    assert chess.Board(FEN).piece_type_at(jugada.from_square) == chess.PAWN
+
+
+def test_entre_jugadas_que_ponen_a_cero_gana_la_de_menor_dtz():
+    class _PorJugada(_TablasFalsas):
+        def get_dtz(self, board):
+            return {"e2e3": -5, "e2e4": -2}.get(board.peek().uci(), -1)
+
+    tablas = _tablas(_PorJugada(wdl=-2, dtz_peon=None, dtz_pieza=None))
+    assert tablas.mejor_jugada(FEN) == "e2e4"
+
+
+def test_pierde_evitando_poner_a_cero_el_contador():
+    tablas = _tablas(_TablasFalsas(wdl=2, dtz_peon=20, dtz_pieza=3))
+    jugada = chess.Move.from_uci(tablas.mejor_jugada(FEN))
+    assert chess.Board(FEN).piece_type_at(jugada.from_square) != chess.PAWN
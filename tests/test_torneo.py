@@ -0,0 +1,48 @@
+"""Pruebas del SPRT y de la estimación de Elo de torneo.py."""
+import pytest
+
+from torneo import SPRT, estimar_elo
+
+
+def test_sin_partidas_no_decide():
+    sprt = SPRT()
+    assert sprt.llr(0, 0, 0) == 0.0
+    assert sprt.estado(0, 0, 0) is None
+
+
+def test_pocas_partidas_no_deciden():
+    assert SPRT().estado(3, 4, 3) is None
+
+
+def test_marcador_de_un_solo_lado_acepta_h1():
+    assert SPRT(elo0=0, elo1=10).estado(40, 0, 0) == "H1"
+
+
+def test_todo_derrotas_acepta_h0():
+    assert SPRT(elo0=0, elo1=10).estado(0, 0, 40) == "H0"
+
+
+def test_ventaja_clara_acepta_h1():
+    assert SPRT(elo0=0, elo1=10).estado(600, 250, 150) == "H1"
+
+
+def test_empate_largo_acepta_h0():
+    assert SPRT(elo0=0, elo1=10).estado(4000, 2000, 4000) == "H0"
+
+
+def test_llr_crece_con_las_victorias():
+    sprt = SPRT()
+    valores = [sprt.llr(v, 20, 20) for v in range(0, 60, 10)]
+    assert valores == sorted(valores)
+
+
+def test_limites_segun_alfa_y_beta():
+    sprt = SPRT(alfa=0.05, beta=0.05)
+    assert sprt.limite_inferior == pytest.approx(-2.944, abs=1e-3)
+    assert sprt.limite_superior == pytest.approx(2.944, abs=1e-3)
+
+
+def test_estimar_elo_simetrico():
+    elo, _ = estimar_elo(30, 40, 30)
+    assert elo == pytest.approx(0.0)
+    assert estimar_elo(60, 20, 20)[0] > 0 > estimar_elo(20, 20, 60)[0]
@@ -0,0 +1,463 @@
+"""Torneos automáticos motor contra motor (sin interfaz gráfica).
+
+Responsabilidades:
+- Jugar N partidas en paralelo repartidas entre procesos de trabajo
+- Alternar colores sobre una batería de aperturas (FEN/EPD, jugadas o PGN)
+- Aplicar controles de tiempo (base + incremento) con derrota por tiempo
+- Escribir las partidas en PGN y estimar la diferencia de Elo
+- Detener el torneo por SPRT cuando el resultado es concluyente
+
+Uso:
+    python torneo.py interno:profundidad=3 interno:profundidad=2 --partidas 200
+    python torneo.py interno stockfish --base 10 --incremento 0.1 --pgn torneo.pgn
+"""
+from typing import Optional, List, Dict, Tuple
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing import util
+import argparse
+import math
+import os
+import shutil
+import time
+
+try:
+    import chess
+    import chess.engine
+    import chess.pgn
+except Exception:
+    chess = None
+
+from motor_interno import MotorInterno
+
+
+class ControlTiempo:
+    """Control de tiempo Fischer: `base` segundos más `incremento` por jugada."""
+
+    def __init__(self, base: float = 60.0, incremento: float = 0.5):
+        self.base = base
+        self.incremento = incremento
+
+    def __repr__(self) -> str:
+        return f"{self.base:g}+{self.incremento:g}"
+
+
+class Jugador:
+    """Participante del torneo: motor interno o motor UCI externo.
+
+    La especificación es un texto del tipo `interno:profundidad=2` o
+    `uci:/ruta/al/motor`; un nombre suelto (`stockfish`, `lc0`) se resuelve
+    como motor UCI instalado.
+    """
+
+    def __init__(self, especificacion: str):
+        self.especificacion = especificacion
+        self.nombre = especificacion
+        self.motor_interno: Optional[MotorInterno] = None
+        self.engine = None
+
+        tipo, _, resto = especificacion.partition(":")
+        if tipo == "interno":
+            opciones = _parsear_opciones(resto)
+            self.motor_interno = MotorInterno(**opciones)
+        else:
+            ruta = resto if tipo == "uci" else _resolver_motor(especificacion)
+            if not ruta:
+                raise ValueError(f"No se encontró el motor '{especificacion}'")
+            self.engine = chess.engine.SimpleEngine.popen_uci(ruta)
+
+    def jugar(self, board, reloj_blancas: float, reloj_negras: float, incremento: float):
+        """Devuelve la jugada elegida para la posición actual."""
+        if self.motor_interno:
+            uci = self.motor_interno.mejor_jugada(board.fen())
+            return chess.Move.from_uci(uci) if uci else None
+        limite = chess.engine.Limit(
+            white_clock=reloj_blancas, black_clock=reloj_negras,
+            white_inc=incremento, black_inc=incremento,
+        )
+        return self.engine.play(board, limite).move
+
+    def nueva_partida(self):
+        """Reinicia el estado que el motor interno conserva entre jugadas."""
+        if self.motor_interno:
+            self.motor_interno.nueva_partida()
+
+    def cerrar(self):
+        try:
+            if self.engine:
+                self.engine.quit()
+        except Exception:
+            pass
+        self.engine = None
+
+
+def _parsear_opciones(texto: str) -> Dict:
+    """Convierte 'a=1,b=false' en {'a': 1, 'b': False}."""
+    opciones = {}
+    for par in filter(None, texto.split(",")):
+        clave, _, valor = par.partition("=")
+        if valor.lower() in ("true", "false"):
+            opciones[clave] = valor.lower() == "true"
+        else:
+            try:
+                opciones[clave] = int(valor)
+            except ValueError:
+                try:
+                    opciones[clave] = float(valor)
+                except ValueError:
+                    opciones[clave] = valor
+    return opciones
+
+
+def _resolver_motor(nombre: str) -> Optional[str]:
+    """Busca un motor UCI por ruta o nombre (PATH y carpetas del proyecto)."""
+    if os.path.isfile(nombre):
+        return nombre
+    ruta = shutil.which(nombre)
+    if ruta:
+        return ruta
+    # Reutiliza la búsqueda de reglas.py (./bin, ./engines, ./stockfish)
+    from reglas import _ruta_motor_por_defecto
+    return _ruta_motor_por_defecto(nombre)
+
+
+def cargar_aperturas(ruta: Optional[str]) -> List[Tuple[Optional[str], List[str]]]:
+    """Lee una batería de aperturas como lista de (fen_inicial, jugadas_uci).
+
+    Formatos admitidos:
+    - .pgn: se toma la línea principal de cada partida
+    - .epd/.fen: una posición por línea
+    - cualquier otro: una apertura por línea con jugadas UCI o SAN separadas por espacios
+    """
+    if not ruta:
+        return [(None, [])]
+    aperturas: List[Tuple[Optional[str], List[str]]] = []
+    if ruta.lower().endswith(".pgn"):
+        with open(ruta, encoding="utf-8", errors="ignore") as f:
+            while True:
+                partida = chess.pgn.read_game(f)
+                if partida is None:
+                    break
+                fen = partida.headers.get("FEN")
+                aperturas.append((fen, [m.uci() for m in partida.mainline_moves()]))
+        return aperturas or [(None, [])]
+
+    with open(ruta, encoding="utf-8") as f:
+        for linea in f:
+            linea = linea.split("#", 1)[0].strip()
+            if not linea:
+                continue
+            if ruta.lower().endswith((".epd", ".fen")):
+                board = chess.Board()
+                if ruta.lower().endswith(".epd"):
+                    board.set_epd(linea)
+                else:
+                    board.set_fen(linea)
+                aperturas.append((board.fen(), []))
+            else:
+                board = chess.Board()
+                jugadas = []
+                for token in linea.split():
+                    try:
+                        move = chess.Move.from_uci(token)
+                        if move not in board.legal_moves:
+                            raise ValueError(token)
+                    except ValueError:
+                        move = board.parse_san(token)
+                    board.push(move)
+                    jugadas.append(move.uci())
+                aperturas.append((None, jugadas))
+    return aperturas or [(None, [])]
+
+
+# Jugadores creados en cada proceso de trabajo (un motor por proceso y color, no por partida)
+_jugadores_proceso: Dict[Tuple[str, bool], Jugador] = {}
+
+
+def _obtener_jugador(especificacion: str, bando: bool) -> Jugador:
+    """Motor del proceso para `especificacion` jugando con `bando`.
+
+    Cada color tiene su propia instancia: en una partida de un motor contra
+    sí mismo los dos bandos no comparten estado.
+    """
+    jugador = _jugadores_proceso.get((especificacion, bando))
+    if jugador is None:
+        jugador = Jugador(especificacion)
+        _jugadores_proceso[(especificacion, bando)] = jugador
+    return jugador
+
+
+def jugar_partida(
+    ronda: int,
+    blancas: str,
+    negras: str,
+    apertura: Tuple[Optional[str], List[str]],
+    control: ControlTiempo,
+    max_plies: int = 400,
+) -> Dict:
+    """Juega una partida completa en el proceso actual y devuelve su resultado.
+
+    Returns:
+        Diccionario con 'ronda', 'blancas', 'negras', 'resultado' ('1-0',
+        '0-1', '1/2-1/2'), 'motivo' y 'pgn'
+    """
+    fen, jugadas = apertura
+    board = chess.Board(fen) if fen else chess.Board()
+    for uci in jugadas:
+        board.push_uci(uci)
+
+    jugadores = {
+        chess.WHITE: _obtener_jugador(blancas, chess.WHITE),
+        chess.BLACK: _obtener_jugador(negras, chess.BLACK),
+    }
+    for jugador in jugadores.values():
+        jugador.nueva_partida()
+    relojes = {chess.WHITE: control.base, chess.BLACK: control.base}
+    resultado = None
+    motivo = ""
+
+    while resultado is None:
+        if board.is_game_over(claim_draw=True):
+            resultado = board.result(claim_draw=True)
+            motivo = board.outcome(claim_draw=True).termination.name.lower()
+            break
+        if len(board.move_stack) >= max_plies:
+            resultado, motivo = "1/2-1/2", "adjudicada"
+            break
+
+        bando = board.turn
+        inicio = time.perf_counter()
+        try:
+            move = jugadores[bando].jugar(board, relojes[chess.WHITE], relojes[chess.BLACK], control.incremento)
+        except Exception as e:
+            move = None
+            motivo = f"error: {e}"
+        relojes[bando] -= time.perf_counter() - inicio
+
+        if move is None or move not in board.legal_moves:
+            resultado = "0-1" if bando == chess.WHITE else "1-0"
+            motivo = motivo or "jugada ilegal"
+        elif relojes[bando] < 0:
+            resultado = "0-1" if bando == chess.WHITE else "1-0"
+            motivo = "tiempo"
+        else:
+            board.push(move)
+            relojes[bando] += control.incremento
+
+    partida = chess.pgn.Game.from_board(board)
+    partida.headers["Event"] = "Torneo Ajedrez"
+    partida.headers["Round"] = str(ronda)
+    partida.headers["White"] = blancas
+    partida.headers["Black"] = negras
+    partida.headers["Result"] = resultado
+    partida.headers["TimeControl"] = f"{control.base:g}+{control.incremento:g}"
+    partida.headers["Termination"] = motivo
+    return {
+        "ronda": ronda,
+        "blancas": blancas,
+        "negras": negras,
+        "resultado": resultado,
+        "motivo": motivo,
+        "pgn": str(partida),
+    }
+
+
+def estimar_elo(victorias: int, tablas: int, derrotas: int) -> Tuple[float, float]:
+    """Devuelve (diferencia de Elo, margen al 95%) a partir de V/T/D."""
+    n = victorias + tablas + derrotas
+    if n == 0:
+        return 0.0, 0.0
+    puntuacion = (victorias + tablas / 2) / n
+    varianza = (
+        victorias * (1 - puntuacion) ** 2
+        + tablas * (0.5 - puntuacion) ** 2
+        + derrotas * puntuacion ** 2
+    ) / n
+
+    def a_elo(p: float) -> float:
+        p = min(max(p, 1e-6), 1 - 1e-6)
+        return -400 * math.log10(1 / p - 1)
+
+    margen = 1.96 * math.sqrt(varianza / n)
+    elo = a_elo(puntuacion)
+    return elo, (a_elo(puntuacion + margen) - a_elo(puntuacion - margen)) / 2
+
+
+class SPRT:
+    """Test secuencial de razón de verosimilitud (aproximación trinomial).
+
+    Contrasta H0: diferencia = elo0 frente a H1: diferencia = elo1 con errores
+    alfa y beta; `estado()` devuelve 'H0', 'H1' o None mientras no se decide.
+    """
+
+    def __init__(self, elo0: float = 0.0, elo1: float = 10.0, alfa: float = 0.05, beta: float = 0.05):
+        self.elo0 = elo0
+        self.elo1 = elo1
+        self.limite_inferior = math.log(beta / (1 - alfa))
+        self.limite_superior = math.log((1 - beta) / alfa)
+
+    def llr(self, victorias: int, tablas: int, derrotas: int) -> float:
+        """Log de la razón de verosimilitud tras n partidas.
+
+        La puntuación y la varianza se estiman sumando media partida a cada
+        resultado, de modo que un marcador de un solo lado (40-0) da una
+        varianza pequeña pero no nula y el test puede pararse pronto.
+        """
+        n = victorias + tablas + derrotas
+        if n == 0:
+            return 0.0
+        v, t, d = victorias + 0.5, tablas + 0.5, derrotas + 0.5
+        total = v + t + d
+        puntuacion = (v + t / 2) / total
+        varianza = (
+            v * (1 - puntuacion) ** 2
+            + t * (0.5 - puntuacion) ** 2
+            + d * puntuacion ** 2
+        ) / total
+        s0 = 1 / (1 + 10 ** (-self.elo0 / 400))
+        s1 = 1 / (1 + 10 ** (-self.elo1 / 400))
+        return n * (s1 - s0) * (2 * puntuacion - s0 - s1) / (2 * varianza)
+
+    def estado(self, victorias: int, tablas: int, derrotas: int) -> Optional[str]:
+        llr = self.llr(victorias, tablas, derrotas)
+        if llr >= self.limite_superior:
+            return "H1"
+        if llr <= self.limite_inferior:
+            return "H0"
+        return None
+
+
+def _cerrar_jugadores_proceso():
+    for jugador in _jugadores_proceso.values():
+        jugador.cerrar()
+    _jugadores_proceso.clear()
+
+
+def _iniciar_proceso():
+    """Inicializador de cada proceso de trabajo: cierra sus motores UCI al salir."""
+    util.Finalize(None, _cerrar_jugadores_proceso, exitpriority=10)
+
+
+def ejecutar_torneo(
+    jugador_a: str,
+    jugador_b: str,
+    partidas: int = 100,
+    concurrencia: Optional[int] = None,
+    control: Optional[ControlTiempo] = None,
+    aperturas: Optional[List[Tuple[Optional[str], List[str]]]] = None,
+    ruta_pgn: Optional[str] = None,
+    sprt: Optional[SPRT] = None,
+    max_plies: int = 400,
+) -> Dict:
+    """Juega un encuentro A contra B y devuelve el marcador desde el lado de A.
+
+    Cada apertura se juega dos veces con colores invertidos. Las partidas se
+    reparten en `concurrencia` procesos (por defecto, todos los núcleos).
+    """
+    control = control or ControlTiempo()
+    aperturas = aperturas or [(None, [])]
+    concurrencia = concurrencia or os.cpu_count() or 1
+
+    tareas = []
+    # Color de A en cada ronda (no se deduce de las especificaciones: pueden ser iguales)
+    a_con_blancas: Dict[int, bool] = {}
+    for ronda in range(partidas):
+        apertura = aperturas[(ronda // 2) % len(aperturas)]
+        a_con_blancas[ronda + 1] = ronda % 2 == 0
+        if ronda % 2 == 0:
+            tareas.append((ronda + 1, jugador_a, jugador_b, apertura, control, max_plies))
+        else:
+            tareas.append((ronda + 1, jugador_b, jugador_a, apertura, control, max_plies))
+
+    victorias = tablas = derrotas = 0
+    decision = None
+    archivo_pgn = open(ruta_pgn, "w", encoding="utf-8") if ruta_pgn else None
+    try:
+        with ProcessPoolExecutor(max_workers=concurrencia, initializer=_iniciar_proceso) as ejecutor:
+            pendientes = set()
+            siguiente = 0
+            while siguiente < len(tareas) or pendientes:
+                # Ventana acotada para poder parar sin encolar todo el torneo
+                while siguiente < len(tareas) and len(pendientes) < concurrencia * 2 and decision is None:
+                    pendientes.add(ejecutor.submit(jugar_partida, *tareas[siguiente]))
+                    siguiente += 1
+                if not pendientes:
+                    break
+                terminadas, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+                for futuro in terminadas:
+                    partida = futuro.result()
+                    if archivo_pgn:
+                        archivo_pgn.write(partida["pgn"] + "\n\n")
+                        archivo_pgn.flush()
+                    if partida["resultado"] == "1/2-1/2":
+                        tablas += 1
+                    elif (partida["resultado"] == "1-0") == a_con_blancas[partida["ronda"]]:
+                        victorias += 1
+                    else:
+                        derrotas += 1
+                    elo, margen = estimar_elo(victorias, tablas, derrotas)
+                    print(
+                        f"Partida {partida['ronda']}: {partida['blancas']} - {partida['negras']} "
+                        f"{partida['resultado']} ({partida['motivo']}) | "
+                        f"+{victorias} ={tablas} -{derrotas} | Elo {elo:+.1f} ± {margen:.1f}"
+                    )
+                    if sprt and decision is None:
+                        decision = sprt.estado(victorias, tablas, derrotas)
+                        if decision:
+                            print(f"SPRT concluyente: se acepta {decision}")
+                if decision:
+                    siguiente = len(tareas)
+    finally:
+        if archivo_pgn:
+            archivo_pgn.close()
+
+    elo, margen = estimar_elo(victorias, tablas, derrotas)
+    return {
+        "victorias": victorias,
+        "tablas": tablas,
+        "derrotas": derrotas,
+        "elo": elo,
+        "margen": margen,
+        "sprt": decision,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Torneo motor contra motor sin interfaz gráfica")
+    parser.add_argument("jugador_a", help="Especificación del jugador A (ej: interno:profundidad=3)")
+    parser.add_argument("jugador_b", help="Especificación del jugador B (ej: stockfish o uci:/ruta)")
+    parser.add_argument("--partidas", type=int, default=100)
+    parser.add_argument("--concurrencia", type=int, default=None, help="Procesos (por defecto, núcleos)")
+    parser.add_argument("--base", type=float, default=60.0, help="Tiempo base en segundos")
+    parser.add_argument("--incremento", type=float, default=0.5, help="Incremento por jugada en segundos")
+    parser.add_argument("--aperturas", default=None, help="Archivo .pgn, .epd/.fen o de jugadas")
+    parser.add_argument("--pgn", default=None, help="Archivo PGN de salida")
+    parser.add_argument("--max-plies", type=int, default=400, help="Plies antes de adjudicar tablas")
+    parser.add_argument("--sprt", nargs=2, type=float, metavar=("ELO0", "ELO1"), default=None)
+    parser.add_argument("--alfa", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    args = parser.parse_args()
+
+    if chess is None:
+        print("python-chess no está instalado")
+        return
+
+    resumen = ejecutar_torneo(
+        args.jugador_a,
+        args.jugador_b,
+        partidas=args.partidas,
+        concurrencia=args.concurrencia,
+        control=ControlTiempo(args.base, args.incremento),
+        aperturas=cargar_aperturas(args.aperturas),
+        ruta_pgn=args.pgn,
+        sprt=SPRT(args.sprt[0], args.sprt[1], args.alfa, args.beta) if args.sprt else None,
+        max_plies=args.max_plies,
+    )
+    print(
+        f"\nResultado {args.jugador_a} vs {args.jugador_b}: "
+        f"+{resumen['victorias']} ={resumen['tablas']} -{resumen['derrotas']} | "
+        f"Elo {resumen['elo']:+.1f} ± {resumen['margen']:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
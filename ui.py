@@ -2,7 +2,9 @@
 
 Responsabilidades:
 - Menu: navegación por teclado para seleccionar el modo de juego
+- MenuServidores: lista de servidores LAN que se actualiza en vivo
 - InterfazUsuario: render del tablero, manejo de eventos y temporizadores
+- Puente entre los hilos de red y el bucle de pygame (EVENTO_RED)
 """
 import os
 import pygame
@@ -10,6 +12,16 @@ from typing import List, Optional, Tuple, Dict
 from modelos import Color, EstadoJuego, GestorRecursos
 from ajedrez_clasico import Tablero
 
+# Evento propio con el que la red entrega mensajes al bucle de la interfaz.
+# La cola de eventos de SDL conserva el orden y admite `post` desde otros hilos.
+EVENTO_RED = pygame.event.custom_type()
+
+
+def publicar_evento_red(**datos):
+    """Encola un mensaje de red para el bucle de pygame (seguro desde cualquier hilo)."""
+    pygame.event.post(pygame.event.Event(EVENTO_RED, datos))
+
+
 class Menu:
     def __init__(self, opciones: List[str]):
         """Inicializa el menú con una lista de opciones.
@@ -68,6 +80,94 @@ class Menu:
             pygame.display.flip()
             clock.tick(60)
 
+class MenuServidores(Menu):
+    """Menú "Unirse a Servidor" que se rellena en vivo con el descubrimiento en segundo plano.
+
+    Muestra al instante los servidores que ya conoce `descubrimiento`
+    (p. ej. `lan.servicio_descubrimiento`) y se redibuja cuando aparecen,
+    cambian de carga o caducan. `loop()` devuelve la opción elegida como
+    `Menu`; `direcciones` traduce cada opción de servidor a (ip, puerto).
+    """
+
+    OPCION_MANUAL = "Introducir IP manualmente"
+    OPCION_VOLVER = "Volver"
+
+    def __init__(self, descubrimiento):
+        super().__init__([])
+        self.descubrimiento = descubrimiento
+        self.direcciones: Dict[str, Tuple[str, int]] = {}
+        self._actualizar_opciones()
+
+    @staticmethod
+    def _etiqueta(ip: str, puerto: int, carga: Optional[Dict]) -> str:
+        etiqueta = f"{ip}:{puerto}"
+        if not carga:
+            return etiqueta
+        if "partidas" in carga:
+            return f"{etiqueta} ({carga['partidas']} partidas)"
+        return f"{etiqueta} ({'libre' if carga.get('libre') else 'ocupado'})"
+
+    def _actualizar_opciones(self):
+        # Mientras no hay servidores la selección no es significativa: el primero que llegue queda elegido
+        elegida = self.opciones[self.seleccion] if self.direcciones else None
+        self.direcciones = {
+            self._etiqueta(ip, puerto, info.get('carga')): (ip, puerto)
+            for (ip, puerto), info in sorted(self.descubrimiento.servidores().items())
+        }
+        self.opciones = list(self.direcciones) + [self.OPCION_MANUAL, self.OPCION_VOLVER]
+        # Mantener la selección sobre el mismo servidor aunque cambie la lista
+        if elegida in self.opciones:
+            self.seleccion = self.opciones.index(elegida)
+        elif elegida is None:
+            self.seleccion = 0
+        else:
+            self.seleccion = min(self.seleccion, len(self.opciones) - 1)
+
+    def loop(self) -> Optional[str]:
+        """Como `Menu.loop`, pero duerme hasta que hay teclas o cambios en la tabla de servidores."""
+        avisar = lambda: publicar_evento_red(tipo="servidores")
+        self.descubrimiento.suscribir(avisar)
+        # Confirmar la lista al abrir el menú en lugar de esperar a los anuncios
+        self.descubrimiento.consultar()
+        try:
+            while True:
+                self._actualizar_opciones()
+                self._dibujar()
+                # Sin eventos, redibujar cada segundo por si un servidor caducó sin aviso
+                for event in [pygame.event.wait(1000)] + pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        return None
+                    if event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_UP:
+                            self.seleccion = (self.seleccion - 1) % len(self.opciones)
+                            if self._sonido_ficha:
+                                self._sonido_ficha.play()
+                        if event.key == pygame.K_DOWN:
+                            self.seleccion = (self.seleccion + 1) % len(self.opciones)
+                            if self._sonido_ficha:
+                                self._sonido_ficha.play()
+                        if event.key == pygame.K_RETURN:
+                            if self._sonido_ficha:
+                                self._sonido_ficha.play()
+                            return self.opciones[self.seleccion]
+        finally:
+            self.descubrimiento.desuscribir(avisar)
+
+    def _dibujar(self):
+        if self._fondo_menu:
+            self.pantalla.blit(self._fondo_menu, (0, 0))
+        else:
+            self.pantalla.fill((30, 30, 30))
+        if not self.direcciones:
+            aviso = self.fuente.render("Buscando servidores...", True, (180, 180, 180))
+            self.pantalla.blit(aviso, (60, 10))
+        for idx, texto in enumerate(self.opciones):
+            color = (255, 255, 255) if idx == self.seleccion else (180, 180, 180)
+            superficie = self.fuente.render(texto, True, color)
+            self.pantalla.blit(superficie, (60, 60 + idx * 50))
+        pygame.display.flip()
+
+
 class InterfazUsuario:
     def __init__(self):
         """Crea la UI principal y recursos necesarios para dibujar el tablero.
@@ -99,8 +199,18 @@ class InterfazUsuario:
             Color.NEGRO: float(self.tiempo_inicial_seg)
         }
         self.timers_activos = True
+        # Reloj externo (p. ej. lan.RelojPartida) que manda sobre los tiempos en partidas en red
+        self.reloj_red = None
+        # Texto de calidad de conexión para el panel inferior (None = no se muestra)
+        self.texto_red: Optional[str] = None
         # Mensaje de estado adicional para modos especiales (LAN, espera, etc.)
         self.mensaje_estado: Optional[str] = None
+
+    def reiniciar_tablero(self, jugadas: List[Tuple[Tuple[int, int], Tuple[int, int]]] = ()):
+        """Vuelve a la posición inicial y reproduce `jugadas` (origen, destino) en orden."""
+        self.tablero = Tablero(self.gestor_recursos)
+        for origen, destino in jugadas:
+            self.tablero.realizar_movimiento(tuple(origen), tuple(destino))
          
     def manejar_eventos(self) -> Tuple[bool, Optional[Tuple[int, int]]]:
         """Procesa eventos de Pygame y traduce clics a coordenadas de casilla."""
@@ -117,11 +227,54 @@ class InterfazUsuario:
             print(f"Error en manejar_eventos: {e}")
             return True, None
         
+    def esperar_eventos(self, espera_ms: int) -> Tuple[bool, List[Tuple[int, int]], List[Dict]]:
+        """Bloquea hasta que haya eventos (o pasen `espera_ms`) y los procesa todos.
+
+        A diferencia de `manejar_eventos`, no descarta nada: devuelve todos los
+        clics y todos los mensajes de red (EVENTO_RED) en orden de llegada.
+
+        Returns:
+            (continuar, clics, mensajes_red)
+        """
+        clics: List[Tuple[int, int]] = []
+        mensajes: List[Dict] = []
+        try:
+            primero = pygame.event.wait(max(1, espera_ms))
+            eventos = pygame.event.get()
+            if primero.type != pygame.NOEVENT:
+                eventos.insert(0, primero)
+            for evento in eventos:
+                if evento.type == pygame.QUIT:
+                    return False, clics, mensajes
+                elif evento.type == pygame.MOUSEBUTTONDOWN:
+                    clics.append((evento.pos[0] // self.cuadrado_tamano, evento.pos[1] // self.cuadrado_tamano))
+                elif evento.type == EVENTO_RED:
+                    mensajes.append(evento.dict)
+        except Exception as e:
+            print(f"Error en esperar_eventos: {e}")
+        return True, clics, mensajes
+
+    def ms_hasta_siguiente_segundo(self) -> int:
+        """Milisegundos hasta que cambie el segundo mostrado en el reloj que corre."""
+        if not self.timers_activos:
+            return 1000
+        if self.reloj_red is None and self.tablero.estado != EstadoJuego.JUGANDO:
+            return 1000
+        # El reloj se muestra redondeado: el texto cambia al cruzar cada x.5 s
+        return int(((self.tiempos[self.tablero.turno] - 0.5) % 1.0) * 1000) + 1
+
     def actualizar_tiempos(self, dt: float):
-        """Actualiza temporizadores por turno; marca fin si un jugador agota tiempo."""
+        """Actualiza temporizadores por turno; marca fin si un jugador agota tiempo.
+
+        Con `reloj_red` los tiempos se leen de ese reloj y la bandera la decide
+        el servidor, no esta interfaz.
+        """
         try:
             if not self.timers_activos:
                 return
+            if self.reloj_red is not None:
+                self.tiempos.update(self.reloj_red.restantes())
+                return
             if self.tablero.estado != EstadoJuego.JUGANDO:
                 return
             turno_actual = self.tablero.turno
@@ -183,6 +336,10 @@ class InterfazUsuario:
         y_timers = 628
         self.pantalla.blit(texto_b, (20, y_timers))
         self.pantalla.blit(texto_n, (350, y_timers))
+        if self.texto_red:
+            texto_red = self.fuente.render(self.texto_red, True, self.colores['texto'])
+            # Centrado entre los dos relojes
+            self.pantalla.blit(texto_red, (self.ancho // 2 - texto_red.get_width() // 2 - 15, y_timers))
     
     def reproducir_sonido_movimiento(self):
         """Reproduce el sonido de movimiento de ficha si está disponible."""